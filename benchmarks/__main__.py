@@ -0,0 +1,83 @@
+import argparse
+import sys
+
+from benchmarks.scenarios import SCENARIOS
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Seed, load test and compare"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="create a synthetic database")
+    seed_parser.add_argument("--db", default="bench.db")
+    seed_parser.add_argument("--classrooms", type=int, default=50)
+    seed_parser.add_argument(
+        "--homeworks", type=int, default=2000, help="average per classroom"
+    )
+    seed_parser.add_argument("--seed", type=int, default=1)
+
+    run_parser = commands.add_parser("run", help="run load scenarios in process")
+    run_parser.add_argument("--db", default="bench.db")
+    run_parser.add_argument("--output", default="report.json")
+    run_parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="repeat to run several, all by default",
+    )
+    run_parser.add_argument("--requests", type=int, default=1000)
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--warmup", type=int, default=50)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument(
+        "--response-cache",
+        default="none",
+        choices=["none", "memory", "local"],
+        help="off by default so repeated reads still reach the database",
+    )
+
+    compare_parser = commands.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument(
+        "--fail-above", type=float, default=None, help="regression percentage"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        from benchmarks.seed import run_seed
+
+        manifest = run_seed(args.db, args.classrooms, args.homeworks, args.seed)
+        print(
+            f"seeded {len(manifest['classrooms'])} classrooms, "
+            f"{sum(classroom['homeworks'] for classroom in manifest['classrooms'])} "
+            f"homeworks into {args.db}"
+        )
+
+    elif args.command == "run":
+        from benchmarks.runner import run
+
+        run(
+            args.db,
+            args.output,
+            args.scenario or list(SCENARIOS),
+            args.requests,
+            args.concurrency,
+            args.warmup,
+            args.seed,
+            args.response_cache,
+        )
+        print(f"report written to {args.output}")
+
+    elif args.command == "compare":
+        from benchmarks.compare import compare
+
+        if not compare(args.base, args.head, args.fail_above):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
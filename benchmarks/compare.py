@@ -0,0 +1,55 @@
+import json
+
+METRICS = ("p50_ms", "p99_ms", "requests_per_second")
+
+
+def load(path: str):
+    with open(path, encoding="utf8") as report_file:
+        return json.load(report_file)
+
+
+def change(before, after):
+    if not before or after is None:
+        return None
+
+    return (after - before) / before * 100
+
+
+def compare(base_path: str, head_path: str, fail_above: float = None):
+    base, head = load(base_path), load(head_path)
+
+    print(f"base {base['meta'].get('commit')}  head {head['meta'].get('commit')}")
+    print(f"{'scenario':<16}" + "".join(f"{metric:>28}" for metric in METRICS))
+
+    regressions = []
+    for name, head_result in head["scenarios"].items():
+        base_result = base["scenarios"].get(name)
+
+        if base_result is None:
+            print(f"{name:<16} (not in base)")
+            continue
+
+        cells = []
+        for metric in METRICS:
+            delta = change(base_result[metric], head_result[metric])
+            cells.append(
+                f"{base_result[metric]:>10} -> {head_result[metric]:>10}"
+                + (f" {delta:+6.1f}%" if delta is not None else "        ")
+            )
+
+        print(f"{name:<16}" + "".join(f"{cell:>28}" for cell in cells))
+
+        # slower p50 or lower throughput beyond the threshold fails the run
+        p50_change = change(base_result["p50_ms"], head_result["p50_ms"])
+        throughput_change = change(
+            base_result["requests_per_second"], head_result["requests_per_second"]
+        )
+        if fail_above is not None and (
+            (p50_change or 0) > fail_above or -(throughput_change or 0) > fail_above
+        ):
+            regressions.append(name)
+
+    if regressions:
+        print(f"regressed by more than {fail_above}%: {', '.join(regressions)}")
+
+    return not regressions
@@ -0,0 +1,173 @@
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import List
+
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.seed import manifest_path
+
+
+def percentile(sorted_values: List[float], fraction: float):
+    if not sorted_values:
+        return None
+
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int):
+    latencies = sorted(latencies)
+
+    def milliseconds(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "mean_ms": milliseconds(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": milliseconds(percentile(latencies, 0.50)),
+        "p90_ms": milliseconds(percentile(latencies, 0.90)),
+        "p99_ms": milliseconds(percentile(latencies, 0.99)),
+        "max_ms": milliseconds(latencies[-1] if latencies else None),
+    }
+
+
+def is_error(response):
+    if response.status_code >= 400:
+        return True
+
+    # errors are still sent as 200 with the code in the body by default
+    try:
+        return response.json().get("response_code", 200) >= 400
+    except ValueError:
+        return False
+
+
+async def run_scenario(client, requests, concurrency: int, warmup: int):
+    for path, body in requests[:warmup]:
+        await client.post(path, json=body)
+
+    pending = iter(requests[warmup:])
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+
+        for path, body in pending:
+            started = time.perf_counter()
+            response = await client.post(path, json=body)
+            latencies.append(time.perf_counter() - started)
+
+            if is_error(response):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def run_scenarios(manifest, names, requests, concurrency, warmup, random_seed):
+    import httpx
+
+    from homework_api.main import app, shutdown, startup
+
+    # ASGITransport does not send lifespan events
+    await startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            results = {}
+            for name in names:
+                # the same seed gives the same requests on every run
+                rng = random.Random(f"{random_seed}-{name}")
+                scenario_requests = [
+                    SCENARIOS[name](rng, manifest) for _ in range(requests + warmup)
+                ]
+
+                results[name] = await run_scenario(
+                    client, scenario_requests, concurrency, warmup
+                )
+                print(f"{name:<16} {json.dumps(results[name])}")
+
+            return results
+    finally:
+        await shutdown()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    path: str,
+    output: str,
+    names: List[str],
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    random_seed: int,
+    response_cache: str,
+):
+    with open(manifest_path(path), encoding="utf8") as manifest_file:
+        manifest = json.load(manifest_file)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # every run starts from an identical copy, the write scenarios
+        # never touch the seeded database
+        copy_path = os.path.join(directory, "bench.db")
+        shutil.copyfile(path, copy_path)
+
+        os.environ["HOMEWORK_API_DATABASE_URL"] = f"sqlite:///{copy_path}"
+        os.environ["HOMEWORK_API_RESPONSE_CACHE_BACKEND"] = response_cache
+
+        results = asyncio.run(
+            run_scenarios(manifest, names, requests, concurrency, warmup, random_seed)
+        )
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": os.path.basename(path),
+            "classrooms": len(manifest["classrooms"]),
+            "homeworks": sum(
+                classroom["homeworks"] for classroom in manifest["classrooms"]
+            ),
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "seed": random_seed,
+            "response_cache": response_cache,
+        },
+        "scenarios": results,
+    }
+
+    with open(output, "w", encoding="utf8") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    return report
@@ -0,0 +1,111 @@
+import datetime
+import random
+from typing import Callable, Dict, Tuple
+
+from benchmarks.seed import SCHOOL_YEAR_DAYS, SCHOOL_YEAR_START, SUBJECTS
+
+# scenario -> function building one (path, json body) from the seeded manifest,
+# reads come first so the write scenarios do not change what they see
+Scenario = Callable[[random.Random, dict], Tuple[str, dict]]
+
+
+def pick_classroom(rng: random.Random, manifest: dict):
+    return rng.choice(manifest["classrooms"])
+
+
+def random_date(rng: random.Random):
+    return SCHOOL_YEAR_START + datetime.timedelta(days=rng.randrange(SCHOOL_YEAR_DAYS))
+
+
+def list_shallow(rng, manifest):
+    classroom = pick_classroom(rng, manifest)
+
+    return "/homework/list", {
+        "classroom_secret": classroom["classroom_secret"],
+        "count": 10,
+        "page": rng.randint(1, 3),
+    }
+
+
+def list_deep(rng, manifest):
+    classroom = pick_classroom(rng, manifest)
+    max_page = max(1, classroom["homeworks"] // 50)
+
+    return "/homework/list", {
+        "classroom_secret": classroom["classroom_secret"],
+        "count": 50,
+        "page": rng.randint(max(1, max_page // 2), max_page),
+    }
+
+
+def list_filtered(rng, manifest):
+    classroom = pick_classroom(rng, manifest)
+    assigned_after_date = random_date(rng)
+
+    return "/homework/list", {
+        "classroom_secret": classroom["classroom_secret"],
+        "count": 20,
+        "assigned_after_date": assigned_after_date.isoformat(),
+        "assigned_before_date": (
+            assigned_after_date + datetime.timedelta(days=30)
+        ).isoformat(),
+    }
+
+
+def get(rng, manifest):
+    classroom = pick_classroom(rng, manifest)
+
+    return "/homework/get", {
+        "classroom_secret": classroom["classroom_secret"],
+        "homework_id": str(
+            rng.randint(classroom["first_homework_id"], classroom["last_homework_id"])
+        ),
+    }
+
+
+def statistics(rng, manifest):
+    classroom = pick_classroom(rng, manifest)
+
+    return "/homework/statistics", {
+        "classroom_secret": classroom["classroom_secret"],
+        "assigned_after_date": SCHOOL_YEAR_START.isoformat(),
+        "assigned_before_date": (
+            SCHOOL_YEAR_START + datetime.timedelta(days=SCHOOL_YEAR_DAYS)
+        ).isoformat(),
+        "bucket": rng.choice(["day", "week", "month"]),
+    }
+
+
+def add(rng, manifest):
+    classroom = pick_classroom(rng, manifest)
+    subject = rng.choice(list(SUBJECTS))
+    assigned_date = random_date(rng)
+
+    return "/homework/add", {
+        "classroom_secret": classroom["classroom_secret"],
+        "classroom_password": manifest["password"],
+        "subject": subject,
+        "teacher": rng.choice(SUBJECTS[subject][1]),
+        "title": f"{subject} benchmark",
+        "description": "added by the benchmark",
+        "assigned_date": assigned_date.isoformat(),
+        "due_date": (assigned_date + datetime.timedelta(days=7)).isoformat(),
+    }
+
+
+def classroom_new(rng, manifest):
+    return "/classroom/new", {
+        "classroom_name": f"{rng.randint(1, 6)}/{rng.randint(1, 99)}",
+        "classroom_password": manifest["password"],
+    }
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "list_shallow": list_shallow,
+    "list_deep": list_deep,
+    "list_filtered": list_filtered,
+    "get": get,
+    "statistics": statistics,
+    "add": add,
+    "classroom_new": classroom_new,
+}
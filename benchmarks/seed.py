@@ -0,0 +1,158 @@
+import asyncio
+import datetime
+import json
+import os
+import random
+
+SUBJECTS = {
+    # subject -> (weight, teachers)
+    "Mathematics": (6, ["Somchai", "Nattaya"]),
+    "Thai": (5, ["Pranee"]),
+    "English": (5, ["Anna", "David"]),
+    "Science": (4, ["Kittipong", "Suda"]),
+    "Social Studies": (3, ["Wichai"]),
+    "Physical Education": (1, ["Arthit"]),
+    "Art": (1, ["Malee"]),
+    "Computer": (2, ["Thanakorn"]),
+}
+
+TITLE_WORDS = [
+    "worksheet",
+    "exercises",
+    "report",
+    "reading",
+    "essay",
+    "project",
+    "quiz review",
+    "lab write-up",
+    "vocabulary",
+    "chapter summary",
+]
+
+DESCRIPTION_WORDS = [
+    "page",
+    "questions",
+    "show all working",
+    "hand in on paper",
+    "submit online",
+    "group work",
+    "at least one page",
+    "use the textbook",
+    "read the chapter first",
+    "bring to class",
+]
+
+SCHOOL_YEAR_START = datetime.date(2024, 5, 15)
+SCHOOL_YEAR_DAYS = 300
+
+PASSWORD = "benchmark1"
+
+
+def school_days(rng: random.Random, count: int):
+    # homework is assigned on weekdays, a bit more often early in the week
+    days = []
+    while len(days) < count:
+        day = SCHOOL_YEAR_START + datetime.timedelta(
+            days=rng.randrange(SCHOOL_YEAR_DAYS)
+        )
+
+        if day.weekday() < 5 and rng.random() < (1.0 - day.weekday() * 0.1):
+            days.append(day)
+
+    return days
+
+
+def make_homeworks(rng: random.Random, count: int):
+    subjects = list(SUBJECTS)
+    weights = [SUBJECTS[subject][0] for subject in subjects]
+
+    homeworks = []
+    for assigned_date in sorted(school_days(rng, count)):
+        subject = rng.choices(subjects, weights)[0]
+        due_date = assigned_date + datetime.timedelta(days=rng.choice([1, 2, 3, 7, 14]))
+
+        homeworks.append(
+            {
+                "subject": subject,
+                "teacher": rng.choice(SUBJECTS[subject][1]),
+                "title": f"{subject} {rng.choice(TITLE_WORDS)} {rng.randint(1, 40)}",
+                "description": ", ".join(
+                    rng.sample(DESCRIPTION_WORDS, rng.randint(0, 3))
+                ),
+                "assigned_date": assigned_date.isoformat(),
+                "due_date": due_date.isoformat(),
+            }
+        )
+
+    return homeworks
+
+
+async def seed(path: str, classrooms: int, homeworks: int, random_seed: int):
+    # the database url is read once at import, so it is set before the first
+    # import of homework_api
+    os.environ["HOMEWORK_API_DATABASE_URL"] = f"sqlite:///{path}"
+
+    from homework_api import auth, db_operations
+    from homework_api.database import classroom_conn, run_migrations
+
+    rng = random.Random(random_seed)
+
+    await classroom_conn.connect()
+    try:
+        await db_operations.create_table(classroom_conn)
+        await run_migrations(classroom_conn)
+
+        # one scrypt hash shared by every classroom keeps seeding fast
+        encrypted_password = auth.hash_password_sync(PASSWORD)
+
+        manifest = {"password": PASSWORD, "classrooms": []}
+        for index in range(classrooms):
+            classroom_secret = f"{rng.getrandbits(256):064x}"
+            classroom_id = await db_operations.add_classroom(
+                classroom_conn,
+                classroom_secret,
+                encrypted_password,
+                f"{index % 6 + 1}/{index // 6 + 1}",
+            )
+
+            # classrooms differ in size around the requested average
+            classroom_homeworks = make_homeworks(
+                rng, max(1, int(rng.gauss(homeworks, homeworks / 4)))
+            )
+
+            homework_ids = []
+            for start in range(0, len(classroom_homeworks), 5000):
+                homework_ids += await db_operations.add_homeworks(
+                    classroom_conn,
+                    classroom_id,
+                    classroom_homeworks[start : start + 5000],
+                )
+
+            # ids of one classroom are contiguous, seeding is sequential
+            manifest["classrooms"].append(
+                {
+                    "classroom_id": classroom_id,
+                    "classroom_secret": classroom_secret,
+                    "homeworks": len(homework_ids),
+                    "first_homework_id": homework_ids[0],
+                    "last_homework_id": homework_ids[-1],
+                }
+            )
+    finally:
+        await classroom_conn.disconnect()
+
+    with open(manifest_path(path), "w", encoding="utf8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    return manifest
+
+
+def manifest_path(path: str):
+    return f"{path}.json"
+
+
+def run_seed(path: str, classrooms: int, homeworks: int, random_seed: int):
+    if os.path.exists(path):
+        raise SystemExit(f"{path} already exists, remove it or pick another path")
+
+    return asyncio.run(seed(path, classrooms, homeworks, random_seed))
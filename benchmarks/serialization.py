@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import tempfile
+import timeit
+
+from homework_api import db_operations, serialization
+from homework_api.database import run_migrations
+from homework_api.database.database_manager import DB
+
+HOMEWORK = {
+    "subject": "Mathematics",
+    "teacher": "Somchai",
+    "title": "Quadratic equations worksheet",
+    "description": "Exercises 1-20 on page 42, show all working",
+    "assigned_date": "2024-01-15",
+    "due_date": "2024-01-22",
+}
+
+
+async def fetch_page(count: int):
+    # real records from the driver, key lookups on them are part of the cost
+    with tempfile.TemporaryDirectory() as directory:
+        db = DB(f"sqlite:///{os.path.join(directory, 'serialization.db')}")
+        await db.connect()
+        try:
+            await db_operations.create_table(db)
+            await run_migrations(db)
+            await db_operations.add_homeworks(db, 1, [HOMEWORK] * count)
+
+            return await db_operations.get_homeworks(
+                db,
+                1,
+                db_operations.getHomeworksCriteria(count=count, offset=0),
+            )
+        finally:
+            await db.disconnect()
+
+
+def payload(homeworks_formatted):
+    return {
+        "response_code": 200,
+        "response": {
+            "context": {
+                "homeworks": homeworks_formatted,
+                "page": 1,
+                "max_page": 1,
+                "next_cursor": None,
+            },
+            "error": None,
+            "message": "Homeworks retrieved successfully",
+        },
+    }
+
+
+# /homework/list as it was before, keyed row mapping and stdlib json
+def serialize_before(homeworks):
+    return json.dumps(
+        payload(
+            [
+                {
+                    "homework_id": homework["HomeworkID"],
+                    "subject": homework["Subject"],
+                    "teacher": homework["Teacher"],
+                    "title": homework["Title"],
+                    "description": homework["Description"],
+                    "assigned_date": homework["AssignedDate"],
+                    "due_date": homework["DueDate"],
+                }
+                for homework in homeworks
+            ]
+        ),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def serialize_after(homeworks):
+    return serialization.dumps(
+        payload(
+            [
+                dict(
+                    zip(
+                        db_operations.HOMEWORK_FIELDS,
+                        db_operations.homework_values(homework),
+                    )
+                )
+                for homework in homeworks
+            ]
+        )
+    )
+
+
+def bench(name, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{name:<32} {seconds / number * 1e6:8.2f} us")
+
+    return seconds / number
+
+
+if __name__ == "__main__":
+    number = 2000
+    homeworks = asyncio.run(fetch_page(50))
+
+    assert serialize_before(homeworks) == serialize_after(homeworks)
+
+    print(f"per 50 row page (orjson {'on' if serialization.orjson else 'off'})")
+    before = bench("before", lambda: serialize_before(homeworks), number)
+    after = bench("after", lambda: serialize_after(homeworks), number)
+    print(f"{before / after:.1f}x faster")
@@ -0,0 +1,92 @@
+import timeit
+from datetime import datetime
+from typing import Union
+
+from markupsafe import Markup
+from pydantic import BaseModel
+
+from homework_api import basemodels, utils
+
+BODY = {
+    "classroom_secret": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+    "classroom_password": "hunter22",
+    "subject": "Mathematics",
+    "teacher": "Somchai",
+    "title": "Quadratic equations worksheet",
+    "description": "Exercises 1-20 on page 42, show all working",
+    "assigned_date": "2024-01-15",
+    "due_date": "2024-01-22",
+}
+
+DATES = [BODY["assigned_date"], BODY["due_date"], None, None]
+
+
+# addHomework as it was before the cleansing moved into the models
+class addHomeworkPlain(BaseModel):
+    classroom_secret: str
+    classroom_password: str
+    subject: str
+    teacher: Union[str, None] = None
+    title: str
+    description: Union[str, None] = None
+    assigned_date: Union[str, None] = None
+    due_date: str
+
+
+def cleanse_api_body_markup(values):
+    return {
+        key: Markup(value).striptags() if isinstance(value, str) else value
+        for key, value in values.items()
+    }
+
+
+def check_valid_dates_strptime(dates):
+    valids = []
+    for date in dates:
+        if date is None:
+            valids.append(True)
+            continue
+
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+            valids.append(True)
+        except ValueError:
+            valids.append(False)
+
+    return all(valids)
+
+
+def request_before():
+    body = addHomeworkPlain.model_validate(BODY)
+    cleaned_body = cleanse_api_body_markup(body.model_dump())
+    check_valid_dates_strptime(
+        [cleaned_body["assigned_date"], cleaned_body["due_date"]]
+    )
+
+
+def request_after():
+    body = basemodels.addHomework.model_validate(BODY)
+    cleaned_body = body.model_dump()
+    utils.check_valid_dates([cleaned_body["assigned_date"], cleaned_body["due_date"]])
+
+
+def bench(name, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{name:<32} {seconds / number * 1e6:8.2f} us")
+
+    return seconds / number
+
+
+if __name__ == "__main__":
+    number = 20000
+
+    print("per call")
+    bench("cleanse (markup)", lambda: cleanse_api_body_markup(BODY), number)
+    bench("cleanse (fast path)", lambda: utils.cleanse_api_body(BODY), number)
+    bench("dates (strptime)", lambda: check_valid_dates_strptime(DATES), number)
+    bench("dates (pattern)", lambda: utils.check_valid_dates(DATES), number)
+
+    print("per /homework/add request body")
+    before = bench("before", request_before, number)
+    after = bench("after", request_after, number)
+    print(f"saving {(before - after) * 1e6:.2f} us per request")
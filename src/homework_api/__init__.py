@@ -1,6 +1,14 @@
+from .auth import *
+from .batcher import *
 from .basemodels import *
+from .cache import *
+from .config import *
 from .database import *
 from .db_operations import *
 from .error_response import *
+from .importer import *
+from .metrics import *
+from .response_cache import *
 from .routers import *
+from .serialization import *
 from .utils import *
@@ -0,0 +1,252 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from homework_api import config, db_operations
+from homework_api.cache import LRUCache
+
+# classroom secret -> classroom row (ClassroomID, ClassroomName, ClassroomPassword)
+classroom_cache = LRUCache(config.CLASSROOM_CACHE_SIZE, config.CLASSROOM_CACHE_TTL)
+
+# (classroom secret, credential key) -> classroom row, only after a match
+credential_cache = LRUCache(config.CREDENTIAL_CACHE_SIZE, config.CREDENTIAL_CACHE_TTL)
+
+# passwords are only kept as an hmac under a key that never leaves this
+# process, so the cache does not hold recent passwords in plain text
+CREDENTIAL_KEY = secrets.token_bytes(32)
+
+
+# scrypt holds the thread for tens of milliseconds, so it never runs on the
+# event loop and never on more than a few threads at once
+password_executor = ThreadPoolExecutor(
+    max_workers=config.PASSWORD_HASH_WORKERS, thread_name_prefix="password"
+)
+
+
+def scrypt(classroom_password: str, salt: bytes, n: int, r: int, p: int):
+    return hashlib.scrypt(
+        classroom_password.encode("utf8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=256 * n * r * p,
+        dklen=32,
+    )
+
+
+def hash_password_sync(classroom_password: str):
+    n, r, p = (
+        config.PASSWORD_SCRYPT_N,
+        config.PASSWORD_SCRYPT_R,
+        config.PASSWORD_SCRYPT_P,
+    )
+    salt = secrets.token_bytes(16)
+
+    # scrypt$n$r$p$salt$hash, the parameters travel with the hash
+    return "$".join(
+        [
+            "scrypt",
+            str(n),
+            str(r),
+            str(p),
+            salt.hex(),
+            scrypt(classroom_password, salt, n, r, p).hex(),
+        ]
+    )
+
+
+def verify_password_sync(encrypted_password: str, classroom_password: str):
+    # returns (matches, needs rehash)
+    if not encrypted_password.startswith("scrypt$"):
+        # legacy unsalted sha256 hex digest
+        matches = hmac.compare_digest(
+            encrypted_password,
+            hashlib.sha256(classroom_password.encode("utf8")).hexdigest(),
+        )
+
+        return matches, matches
+
+    _, n, r, p, salt, password_hash = encrypted_password.split("$")
+    n, r, p = int(n), int(r), int(p)
+
+    matches = hmac.compare_digest(
+        bytes.fromhex(password_hash),
+        scrypt(classroom_password, bytes.fromhex(salt), n, r, p),
+    )
+
+    needs_rehash = (n, r, p) != (
+        config.PASSWORD_SCRYPT_N,
+        config.PASSWORD_SCRYPT_R,
+        config.PASSWORD_SCRYPT_P,
+    )
+
+    return matches, matches and needs_rehash
+
+
+async def hash_password(classroom_password: str):
+    return await asyncio.get_running_loop().run_in_executor(
+        password_executor, hash_password_sync, classroom_password
+    )
+
+
+async def verify_password(encrypted_password: str, classroom_password: str):
+    return await asyncio.get_running_loop().run_in_executor(
+        password_executor, verify_password_sync, encrypted_password, classroom_password
+    )
+
+
+def new_classroom_secret():
+    # classroom secret (username that use to login)
+    return secrets.token_hex(32)
+
+
+def credential_key(classroom_secret, classroom_password):
+    return (
+        classroom_secret,
+        hmac.new(
+            CREDENTIAL_KEY, classroom_password.encode("utf8"), hashlib.sha256
+        ).digest(),
+    )
+
+
+def cache_classroom(classroom_secret, classroom_id, classroom_name, encrypted_password):
+    classroom = {
+        "ClassroomID": classroom_id,
+        "ClassroomName": classroom_name,
+        "ClassroomPassword": encrypted_password,
+    }
+
+    classroom_cache.set(classroom_secret, classroom)
+
+    return classroom
+
+
+def invalidate_classroom(classroom_secret):
+    classroom_cache.invalidate(classroom_secret)
+    credential_cache.invalidate_where(lambda key: key[0] == classroom_secret)
+
+
+async def get_classroom(db, classroom_secret):
+    if classroom_secret is None:
+        return None
+
+    classroom = classroom_cache.get(classroom_secret)
+
+    if classroom is not None:
+        return classroom
+
+    classroom_check = await db_operations.get_classroom(db, classroom_secret)
+
+    # misses are not cached, a classroom created right after must be visible
+    if classroom_check is None:
+        return None
+
+    return cache_classroom(
+        classroom_secret,
+        classroom_check["ClassroomID"],
+        classroom_check["ClassroomName"],
+        classroom_check["ClassroomPassword"],
+    )
+
+
+async def verify_classroom(db, classroom_secret, classroom_password):
+    if classroom_secret is None or classroom_password is None:
+        return None
+
+    classroom = credential_cache.get(
+        credential_key(classroom_secret, classroom_password)
+    )
+
+    if classroom is not None:
+        return classroom
+
+    classroom = await get_classroom(db, classroom_secret)
+
+    if classroom is None:
+        return None
+
+    matches, needs_rehash = await verify_password(
+        classroom["ClassroomPassword"], classroom_password
+    )
+
+    if not matches:
+        return None
+
+    # legacy sha256 and outdated scrypt hashes are upgraded on the first
+    # successful login, nobody has to reset their password
+    if needs_rehash:
+        encrypted_password = await hash_password(classroom_password)
+
+        await db_operations.update_classroom_password(
+            db, classroom["ClassroomID"], encrypted_password
+        )
+
+        invalidate_classroom(classroom_secret)
+
+        classroom = cache_classroom(
+            classroom_secret,
+            classroom["ClassroomID"],
+            classroom["ClassroomName"],
+            encrypted_password,
+        )
+
+    credential_cache.set(
+        credential_key(classroom_secret, classroom_password), classroom
+    )
+
+    return classroom
+
+
+def sign_token(payload: str):
+    signature = hmac.new(
+        config.SESSION_SECRET, payload.encode("utf8"), hashlib.sha256
+    ).digest()
+
+    return base64.urlsafe_b64encode(signature).rstrip(b"=").decode("ascii")
+
+
+def issue_token(classroom_id: int):
+    # <classroom id>.<expires at>.<signature>, stateless so checking it needs
+    # no database and no shared store
+    expires_at = int(time.time() + config.SESSION_TTL)
+    payload = f"{classroom_id}.{expires_at}"
+
+    return f"{payload}.{sign_token(payload)}", expires_at
+
+
+def verify_token(token: str):
+    # compare_digest refuses str with non ascii characters, so both sides are
+    # compared as bytes and a signature that is not ascii is simply invalid
+    try:
+        classroom_id, expires_at, signature = token.split(".")
+        classroom_id, expires_at = int(classroom_id), int(expires_at)
+        signature = signature.encode("ascii")
+    except ValueError:
+        return None
+
+    expected_signature = sign_token(f"{classroom_id}.{expires_at}").encode("ascii")
+
+    if not hmac.compare_digest(signature, expected_signature):
+        return None
+
+    if expires_at < time.time():
+        return None
+
+    return {"ClassroomID": classroom_id}
+
+
+def get_bearer_token(authorization):
+    if authorization is None:
+        return None
+
+    scheme, _, token = authorization.partition(" ")
+
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+
+    return token.strip()
@@ -1,16 +1,45 @@
-from typing import Union
+from typing import Any, List, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationInfo, field_validator
 
+from homework_api import utils
 
-class newClassroom(BaseModel):
+
+class cleansedModel(BaseModel):
+    # every string field is cleansed once while the request is parsed
+    @field_validator("*")
+    @classmethod
+    def cleanse_strings(cls, value):
+        return utils.cleanse_string(value) if isinstance(value, str) else value
+
+    # every *_date field, both the ones written and the ones filtered on
+    @field_validator("*")
+    @classmethod
+    def normalize_dates(cls, value, info: ValidationInfo):
+        if isinstance(value, str) and info.field_name.endswith("_date"):
+            return utils.normalize_date(value)
+
+        return value
+
+
+class newClassroom(cleansedModel):
     classroom_name: str
     classroom_password: str
 
 
-class addHomework(BaseModel):
+class loginClassroom(cleansedModel):
     classroom_secret: str
     classroom_password: str
+
+
+class newClassroomsBulk(cleansedModel):
+    classrooms: List[newClassroom]
+
+
+class addHomework(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    classroom_password: Union[str, None] = None
+    token: Union[str, None] = None
     subject: str
     teacher: Union[str, None] = None
     title: str
@@ -19,29 +48,122 @@ class addHomework(BaseModel):
     due_date: str
 
 
-class removeHomework(BaseModel):
-    classroom_secret: str
-    classroom_password: str
+class bulkHomework(cleansedModel):
+    subject: str
+    teacher: Union[str, None] = None
+    title: str
+    description: Union[str, None] = None
+    assigned_date: Union[str, None] = None
+    due_date: str
+
+
+class addHomeworksBulk(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    classroom_password: Union[str, None] = None
+    token: Union[str, None] = None
+    homeworks: List[bulkHomework]
+
+
+class importReport(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    classroom_password: Union[str, None] = None
+    token: Union[str, None] = None
+    report_token: str
+
+
+class removeHomework(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    classroom_password: Union[str, None] = None
+    token: Union[str, None] = None
     homework_id: int
 
 
-class listHomeworks(BaseModel):
-    classroom_secret: str
+class removeHomeworksBulk(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    classroom_password: Union[str, None] = None
+    token: Union[str, None] = None
+    homework_ids: Union[List[int], None] = None
+    subject: Union[str, None] = None
+    assigned_before_date: Union[str, None] = None
+    assigned_after_date: Union[str, None] = None
+    due_before_date: Union[str, None] = None
+    due_after_date: Union[str, None] = None
+
+
+class updateHomeworksBulk(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    classroom_password: Union[str, None] = None
+    token: Union[str, None] = None
+    homework_ids: Union[List[int], None] = None
+    subject: Union[str, None] = None
+    assigned_before_date: Union[str, None] = None
+    assigned_after_date: Union[str, None] = None
+    due_before_date: Union[str, None] = None
+    due_after_date: Union[str, None] = None
+    new_subject: Union[str, None] = None
+    new_teacher: Union[str, None] = None
+    new_due_date: Union[str, None] = None
+
+
+class listHomeworks(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    token: Union[str, None] = None
     count: Union[int, None] = None
     page: Union[int, None] = None
+    cursor: Union[str, None] = None
+    include_total: Union[bool, None] = None
     assigned_before_date: Union[str, None] = None
     assigned_after_date: Union[str, None] = None
     due_before_date: Union[str, None] = None
     due_after_date: Union[str, None] = None
 
 
-class getHomework(BaseModel):
-    classroom_secret: str
+class searchHomeworks(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    token: Union[str, None] = None
+    query: str
+    count: Union[int, None] = None
+    page: Union[int, None] = None
+    assigned_before_date: Union[str, None] = None
+    assigned_after_date: Union[str, None] = None
+    due_before_date: Union[str, None] = None
+    due_after_date: Union[str, None] = None
+
+
+class exportHomeworks(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    token: Union[str, None] = None
+    format: Union[str, None] = None
+    assigned_before_date: Union[str, None] = None
+    assigned_after_date: Union[str, None] = None
+    due_before_date: Union[str, None] = None
+    due_after_date: Union[str, None] = None
+
+
+class getHomework(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    token: Union[str, None] = None
     homework_id: str
 
 
-class statisticsHomework(BaseModel):
-    classroom_secret: str
+class statisticsHomework(cleansedModel):
+    classroom_secret: Union[str, None] = None
+    token: Union[str, None] = None
     assigned_before_date: str
     assigned_after_date: str
     subject: Union[str, None] = None
+    bucket: Union[str, None] = None
+    group_by: Union[str, None] = None
+
+
+# response shape for the docs only, handlers return rendered responses so
+# fastapi never validates large payloads against them
+class apiResponseBody(BaseModel):
+    context: Any = None
+    error: Union[str, None] = None
+    message: str
+
+
+class apiResponse(BaseModel):
+    response_code: int
+    response: apiResponseBody
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from typing import Optional
+
+from homework_api import config, db_operations, metrics
+from homework_api.database import classroom_conn
+
+
+class HomeworkBatcher:
+    # write behind queue for single homework inserts, each caller waits on a
+    # future that resolves to its HomeworkID once its batch is committed
+    def __init__(self, db, max_size: int, max_delay: float, queue_size: int):
+        self.db = db
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.batch_ready: Optional[asyncio.Event] = None
+        self.task: Optional[asyncio.Task] = None
+        self.stopping = False
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    async def start(self):
+        # the queue belongs to the running loop, so it is made here
+        self.queue = asyncio.Queue(self.queue_size)
+        self.batch_ready = asyncio.Event()
+        self.stopping = False
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+
+        # None is queued behind everything else, so every homework accepted
+        # before shutdown is still written, without waiting out the delay
+        self.stopping = True
+        self.batch_ready.set()
+        await self.queue.put(None)
+        await self.task
+
+        self.task = None
+
+    async def add(self, classroom_id: int, homework: dict):
+        future = asyncio.get_running_loop().create_future()
+
+        try:
+            self.queue.put_nowait((classroom_id, homework, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            metrics.add_batch_rejected.inc()
+            raise
+
+        if self.queue.qsize() >= self.max_size - 1:
+            self.batch_ready.set()
+
+        # a caller that goes away still gets its homework written
+        return await asyncio.shield(future)
+
+    async def run(self):
+        while True:
+            entry = await self.queue.get()
+            if entry is None:
+                return
+
+            # give other requests a few milliseconds to join, unless enough
+            # are already waiting to fill the batch or the batcher is stopping
+            if self.queue.qsize() < self.max_size - 1 and not self.stopping:
+                self.batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self.batch_ready.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            # items are only taken without waiting, so none are lost to a timeout
+            batch = [entry]
+            while len(batch) < self.max_size and not self.queue.empty():
+                entry = self.queue.get_nowait()
+
+                if entry is None:
+                    await self.flush(batch)
+                    return
+
+                batch.append(entry)
+
+            await self.flush(batch)
+
+    async def flush(self, batch):
+        started = time.perf_counter()
+
+        metrics.add_batch_size.observe(len(batch))
+        for _, _, _, queued_at in batch:
+            metrics.add_batch_wait.observe(started - queued_at)
+
+        await self.write(batch)
+
+    async def write(self, batch):
+        try:
+            homework_ids = await db_operations.add_homeworks_batch(
+                self.db,
+                [(classroom_id, homework) for classroom_id, homework, _, _ in batch],
+            )
+        except Exception as error:
+            if len(batch) > 1:
+                # one bad row should not fail everyone else in the batch
+                for entry in batch:
+                    await self.write([entry])
+                return
+
+            _, _, future, _ = batch[0]
+            if not future.done():
+                future.set_exception(error)
+            return
+
+        for (_, _, future, _), homework_id in zip(batch, homework_ids):
+            if not future.done():
+                future.set_result(homework_id)
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "queue_size": self.queue_size,
+        }
+
+
+homework_batcher = HomeworkBatcher(
+    classroom_conn,
+    config.ADD_BATCH_SIZE,
+    config.ADD_BATCH_DELAY,
+    config.ADD_BATCH_QUEUE_SIZE,
+)
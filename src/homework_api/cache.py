@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        assert max_size > 0, "cache max_size should be positive"
+
+        self.max_size = max_size
+        self.ttl = ttl
+
+        # key -> (expires_at, value), oldest first
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None):
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]):
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -1,3 +1,14 @@
+from homework_api import config, metrics
+
 from .database_manager import DB
+from .migrations import run_migrations
+from .pragmas import get_pragmas
 
-classroom_conn = DB("sqlite:///database.db")
+classroom_conn = DB(
+    config.DATABASE_URL,
+    read_pool_size=config.DB_READ_POOL_SIZE,
+    pragmas=get_pragmas(config.SQLITE_PROFILE, config.SQLITE_PRAGMAS),
+    min_size=config.DB_POOL_MIN_SIZE,
+    max_size=config.DB_POOL_MAX_SIZE,
+    query_observer=metrics.observe_query,
+)
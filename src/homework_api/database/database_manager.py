@@ -1,36 +1,280 @@
-from typing import Optional
+import asyncio
+import logging
+import sys
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
 
-from databases import Database
+from databases import Database, DatabaseURL
+from databases.core import Connection
+
+logger = logging.getLogger("uvicorn.error")
 
 
 class DB:
-    def __init__(self, db_path: str, force_rollback: bool = False):
-        self.database = Database(db_path, force_rollback=force_rollback)
+    def __init__(
+        self,
+        db_path: str,
+        force_rollback: bool = False,
+        read_pool_size: int = 0,
+        pragmas: Optional[dict] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        query_observer: Optional[Callable[[str, str, float], None]] = None,
+    ):
+        # pool sizes are understood by the server backends (asyncpg, aiomysql),
+        # the sqlite backend would pass them on to sqlite3.connect
+        pool_options = (
+            {
+                key: value
+                for key, value in {"min_size": min_size, "max_size": max_size}.items()
+                if value is not None
+            }
+            if DatabaseURL(db_path).dialect != "sqlite"
+            else {}
+        )
+
+        self.database = Database(db_path, force_rollback=force_rollback, **pool_options)
         self.connected = False
 
+        # file backed sqlite runs on connections held by DB itself, other
+        # urls use the pooling of the databases backend
+        self.pooled = (
+            self.database.url.dialect == "sqlite"
+            and self.database.url.database not in ("", ":memory:")
+            and not force_rollback
+        )
+        self.read_pool_size = read_pool_size if self.pooled else 0
+        self.pragmas = pragmas or {}
+
+        # called with (calling function, method, seconds) after every query
+        self.query_observer = query_observer
+
+        self.writer: Optional[Connection] = None
+        self.readers: Optional[asyncio.Queue] = None
+        self.writer_lock: Optional[asyncio.Lock] = None
+
+        # set while the current task is inside .transaction()
+        self.in_transaction = ContextVar(f"in_transaction_{id(self)}", default=False)
+
+        self.read_waiting = 0
+        self.read_acquisitions = 0
+        self.read_wait_total = 0.0
+        self.read_wait_max = 0.0
+        self.write_waiting = 0
+        self.write_acquisitions = 0
+        self.write_wait_total = 0.0
+        self.write_wait_max = 0.0
+
+    @property
+    def dialect(self):
+        return self.database.url.dialect
+
     async def connect(self):
         assert not self.connected, "database should be connect first via .connect()"
 
         await self.database.connect()
+
+        if self.pooled:
+            self.writer_lock = asyncio.Lock()
+            self.writer = await self.open_connection()
+
+            self.readers = asyncio.Queue()
+            for _ in range(self.read_pool_size):
+                reader = await self.open_connection()
+                await reader.execute("PRAGMA query_only = ON")
+                self.readers.put_nowait(reader)
+
+            logger.info(
+                "sqlite pragmas: %s",
+                ", ".join(
+                    f"{name}={value}"
+                    for name, value in (await self.get_pragmas()).items()
+                ),
+            )
+
         self.connected = True
 
     async def disconnect(self):
         assert self.connected, "database should be connect first via .connect()"
 
+        if self.pooled:
+            while not self.readers.empty():
+                await self.readers.get_nowait().__aexit__()
+
+            await self.writer.__aexit__()
+            self.writer = None
+            self.readers = None
+
         await self.database.disconnect()
         self.connected = False
 
+    async def open_connection(self):
+        # a connection held open for the lifetime of the pool
+        connection = Connection(self.database, self.database._backend)
+        await connection.__aenter__()
+
+        for name, value in self.pragmas.items():
+            await connection.execute(f"PRAGMA {name} = {value}")
+
+        return connection
+
+    async def get_pragmas(self):
+        # effective values as reported by sqlite, not the requested ones
+        effective = {}
+        for name in self.pragmas:
+            row = await self.writer.fetch_one(f"PRAGMA {name}")
+            effective[name] = row[0] if row is not None else None
+
+        return effective
+
+    @asynccontextmanager
+    async def reader(self):
+        # without readers every read shares the writer
+        if not self.read_pool_size:
+            async with self.write_lock():
+                yield self.writer
+            return
+
+        started = time.perf_counter()
+        self.read_waiting += 1
+        try:
+            reader = await self.readers.get()
+        finally:
+            self.read_waiting -= 1
+
+        waited = time.perf_counter() - started
+        self.read_acquisitions += 1
+        self.read_wait_total += waited
+        self.read_wait_max = max(self.read_wait_max, waited)
+
+        try:
+            yield reader
+        finally:
+            self.readers.put_nowait(reader)
+
+    @asynccontextmanager
+    async def write_lock(self):
+        started = time.perf_counter()
+        self.write_waiting += 1
+        try:
+            await self.writer_lock.acquire()
+        finally:
+            self.write_waiting -= 1
+
+        waited = time.perf_counter() - started
+        self.write_acquisitions += 1
+        self.write_wait_total += waited
+        self.write_wait_max = max(self.write_wait_max, waited)
+
+        try:
+            yield
+        finally:
+            self.writer_lock.release()
+
+    @asynccontextmanager
+    async def observe(self, method, caller):
+        if self.query_observer is None:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.query_observer(caller, method, time.perf_counter() - started)
+
     async def execute(self, query, values: Optional[dict] = None):
         assert self.connected, "database should be connect first via .connect()"
 
-        return await self.database.execute(query=query, values=values)
+        # labelled by the calling function, usually one of db_operations
+        async with self.observe("execute", sys._getframe(1).f_code.co_name):
+            if not self.pooled:
+                return await self.database.execute(query=query, values=values)
+
+            if self.in_transaction.get():
+                return await self.writer.execute(query=query, values=values)
+
+            async with self.write_lock():
+                return await self.writer.execute(query=query, values=values)
+
+    async def execute_many(self, query, values: List[dict]):
+        assert self.connected, "database should be connect first via .connect()"
+
+        async with self.observe("execute_many", sys._getframe(1).f_code.co_name):
+            if not self.pooled:
+                return await self.database.execute_many(query=query, values=values)
+
+            # sqlite understands :name parameters itself, going straight to the
+            # driver skips compiling the statement once per row
+            if self.in_transaction.get():
+                await self.writer.raw_connection.executemany(query, values)
+                return
+
+            async with self.write_lock():
+                await self.writer.raw_connection.executemany(query, values)
 
     async def fetch_one(self, query, values: Optional[dict] = None):
         assert self.connected, "database should be connect first via .connect()"
 
-        return await self.database.fetch_one(query=query, values=values)
+        async with self.observe("fetch_one", sys._getframe(1).f_code.co_name):
+            if not self.pooled:
+                return await self.database.fetch_one(query=query, values=values)
+
+            # reads inside a transaction must see its uncommitted writes
+            if self.in_transaction.get():
+                return await self.writer.fetch_one(query=query, values=values)
+
+            async with self.reader() as reader:
+                return await reader.fetch_one(query=query, values=values)
 
     async def fetch_all(self, query, values: Optional[dict] = None):
         assert self.connected, "database should be connect first via .connect()"
 
-        return await self.database.fetch_all(query=query, values=values)
+        async with self.observe("fetch_all", sys._getframe(1).f_code.co_name):
+            if not self.pooled:
+                return await self.database.fetch_all(query=query, values=values)
+
+            if self.in_transaction.get():
+                return await self.writer.fetch_all(query=query, values=values)
+
+            async with self.reader() as reader:
+                return await reader.fetch_all(query=query, values=values)
+
+    @asynccontextmanager
+    async def transaction(self):
+        assert self.connected, "database should be connect first via .connect()"
+
+        if not self.pooled:
+            async with self.database.transaction():
+                yield
+            return
+
+        # nested transactions become savepoints on the writer already held
+        if self.in_transaction.get():
+            async with self.writer.transaction():
+                yield
+            return
+
+        async with self.write_lock():
+            token = self.in_transaction.set(True)
+            try:
+                async with self.writer.transaction():
+                    yield
+            finally:
+                self.in_transaction.reset(token)
+
+    def pool_stats(self):
+        return {
+            "read_pool_size": self.read_pool_size,
+            "read_idle": self.readers.qsize() if self.readers is not None else 0,
+            "read_waiting": self.read_waiting,
+            "read_acquisitions": self.read_acquisitions,
+            "read_wait_seconds_total": self.read_wait_total,
+            "read_wait_seconds_max": self.read_wait_max,
+            "write_waiting": self.write_waiting,
+            "write_acquisitions": self.write_acquisitions,
+            "write_wait_seconds_total": self.write_wait_total,
+            "write_wait_seconds_max": self.write_wait_max,
+        }
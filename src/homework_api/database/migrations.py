@@ -0,0 +1,241 @@
+import logging
+import secrets
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+
+async def reissue_duplicate_secrets(db):
+    # secrets used to be sha256(name + time) and two classrooms created in the
+    # same instant shared one, the oldest keeps it and the others get new ones
+    rows = await db.fetch_all(
+        """
+        SELECT ClassroomID AS "ClassroomID"
+        FROM classrooms
+        WHERE ClassroomID NOT IN (
+            SELECT MIN(ClassroomID) FROM classrooms GROUP BY ClassroomSecret
+        )
+        ORDER BY ClassroomID
+        """
+    )
+
+    for row in rows:
+        await db.execute(
+            "UPDATE classrooms SET ClassroomSecret = :secret WHERE ClassroomID = :classroom_id",
+            {"secret": secrets.token_hex(32), "classroom_id": row["ClassroomID"]},
+        )
+
+    if rows:
+        logger.warning(
+            "classroom secrets were shared by more than one classroom, new "
+            "secrets were issued to ClassroomID %s",
+            ", ".join(str(row["ClassroomID"]) for row in rows),
+        )
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    statements: List[str]
+    # other dialects skip the statements but still record the version
+    dialects: Optional[List[str]] = None
+    # runs in the same transaction, before the statements
+    before: Optional[Callable[..., Awaitable[None]]] = None
+
+
+# append only, never edit a migration that has already been released
+MIGRATIONS = [
+    Migration(
+        version=1,
+        description="add lookup indexes for classrooms and homeworks",
+        statements=[
+            """CREATE UNIQUE INDEX IF NOT EXISTS idx_classrooms_secret
+               ON classrooms (ClassroomSecret)""",
+            """CREATE INDEX IF NOT EXISTS idx_homeworks_classroom_homework
+               ON homeworks (ClassroomID, HomeworkID DESC)""",
+            """CREATE INDEX IF NOT EXISTS idx_homeworks_classroom_assigned
+               ON homeworks (ClassroomID, AssignedDate)""",
+            """CREATE INDEX IF NOT EXISTS idx_homeworks_classroom_due
+               ON homeworks (ClassroomID, DueDate)""",
+            """CREATE INDEX IF NOT EXISTS idx_homeworks_classroom_subject
+               ON homeworks (ClassroomID, Subject, HomeworkID)""",
+        ],
+        before=reissue_duplicate_secrets,
+    ),
+    Migration(
+        version=2,
+        description="add a version counter to classrooms for conditional reads",
+        statements=[
+            """ALTER TABLE classrooms
+               ADD COLUMN Version INTEGER NOT NULL DEFAULT 0""",
+        ],
+    ),
+    Migration(
+        version=3,
+        description="add per-day homework counters for statistics",
+        statements=[
+            """CREATE TABLE IF NOT EXISTS homework_daily_stats (
+                           ClassroomID INTEGER NOT NULL,
+                           Subject TEXT NOT NULL,
+                           AssignedDate TEXT NOT NULL,
+                           HomeworkCount INTEGER NOT NULL DEFAULT 0,
+                           PRIMARY KEY (ClassroomID, Subject, AssignedDate)
+                           )""",
+            """INSERT INTO homework_daily_stats(
+                   ClassroomID, Subject, AssignedDate, HomeworkCount
+               )
+               SELECT ClassroomID, Subject, AssignedDate, COUNT(*)
+               FROM homeworks
+               GROUP BY ClassroomID, Subject, AssignedDate""",
+        ],
+    ),
+    Migration(
+        version=4,
+        description="index homeworks written before full text search existed",
+        statements=[
+            """INSERT INTO homeworks_fts(homeworks_fts) VALUES ('rebuild')""",
+        ],
+        dialects=["sqlite"],
+    ),
+    Migration(
+        version=5,
+        description="zero pad dates stored without leading zeros",
+        # stored dates matched YYYY-M-D, only the month and day can be short,
+        # the counters are rebuilt since padding merges some of their days
+        statements=[
+            """UPDATE homeworks SET AssignedDate = CASE
+                   WHEN AssignedDate LIKE '____-_-_' THEN substr(AssignedDate, 1, 5)
+                       || '0' || substr(AssignedDate, 6, 1)
+                       || '-0' || substr(AssignedDate, 8, 1)
+                   WHEN AssignedDate LIKE '____-_-__' THEN substr(AssignedDate, 1, 5)
+                       || '0' || substr(AssignedDate, 6, 4)
+                   ELSE substr(AssignedDate, 1, 8) || '0' || substr(AssignedDate, 9, 1)
+               END
+               WHERE AssignedDate LIKE '____-_-_'
+               OR AssignedDate LIKE '____-_-__'
+               OR AssignedDate LIKE '____-__-_'""",
+            """UPDATE homeworks SET DueDate = CASE
+                   WHEN DueDate LIKE '____-_-_' THEN substr(DueDate, 1, 5)
+                       || '0' || substr(DueDate, 6, 1)
+                       || '-0' || substr(DueDate, 8, 1)
+                   WHEN DueDate LIKE '____-_-__' THEN substr(DueDate, 1, 5)
+                       || '0' || substr(DueDate, 6, 4)
+                   ELSE substr(DueDate, 1, 8) || '0' || substr(DueDate, 9, 1)
+               END
+               WHERE DueDate LIKE '____-_-_'
+               OR DueDate LIKE '____-_-__'
+               OR DueDate LIKE '____-__-_'""",
+            """DELETE FROM homework_daily_stats""",
+            """INSERT INTO homework_daily_stats(
+                   ClassroomID, Subject, AssignedDate, HomeworkCount
+               )
+               SELECT ClassroomID, Subject, AssignedDate, COUNT(*)
+               FROM homeworks
+               GROUP BY ClassroomID, Subject, AssignedDate""",
+        ],
+    ),
+    Migration(
+        version=6,
+        description="index the classroom of every homework for search",
+        # fts5 tables cannot gain a column, the index and its triggers are
+        # made again with ClassroomID and refilled from homeworks
+        statements=[
+            """DROP TRIGGER IF EXISTS homeworks_fts_insert""",
+            """DROP TRIGGER IF EXISTS homeworks_fts_delete""",
+            """DROP TRIGGER IF EXISTS homeworks_fts_update""",
+            """DROP TABLE IF EXISTS homeworks_fts""",
+            """CREATE VIRTUAL TABLE homeworks_fts USING fts5(
+                           Title,
+                           Description,
+                           Subject,
+                           Teacher,
+                           ClassroomID,
+                           content='homeworks',
+                           content_rowid='HomeworkID',
+                           prefix='2 3'
+                           )""",
+            """CREATE TRIGGER homeworks_fts_insert AFTER INSERT ON homeworks
+               BEGIN
+                   INSERT INTO homeworks_fts(rowid, Title, Description, Subject, Teacher, ClassroomID)
+                   VALUES (new.HomeworkID, new.Title, new.Description, new.Subject, new.Teacher, new.ClassroomID);
+               END""",
+            """CREATE TRIGGER homeworks_fts_delete AFTER DELETE ON homeworks
+               BEGIN
+                   INSERT INTO homeworks_fts(homeworks_fts, rowid, Title, Description, Subject, Teacher, ClassroomID)
+                   VALUES ('delete', old.HomeworkID, old.Title, old.Description, old.Subject, old.Teacher, old.ClassroomID);
+               END""",
+            """CREATE TRIGGER homeworks_fts_update
+               AFTER UPDATE OF Title, Description, Subject, Teacher, ClassroomID ON homeworks
+               BEGIN
+                   INSERT INTO homeworks_fts(homeworks_fts, rowid, Title, Description, Subject, Teacher, ClassroomID)
+                   VALUES ('delete', old.HomeworkID, old.Title, old.Description, old.Subject, old.Teacher, old.ClassroomID);
+                   INSERT INTO homeworks_fts(rowid, Title, Description, Subject, Teacher, ClassroomID)
+                   VALUES (new.HomeworkID, new.Title, new.Description, new.Subject, new.Teacher, new.ClassroomID);
+               END""",
+            """INSERT INTO homeworks_fts(homeworks_fts) VALUES ('rebuild')""",
+        ],
+        dialects=["sqlite"],
+    ),
+]
+
+
+async def create_migrations_table(db):
+    await db.execute(
+        """CREATE TABLE IF NOT EXISTS schema_migrations (
+                           Version INTEGER PRIMARY KEY,
+                           Description TEXT NOT NULL,
+                           AppliedAt TEXT NOT NULL
+                           )"""
+    )
+
+
+async def get_applied_versions(db):
+    rows = await db.fetch_all('SELECT Version AS "Version" FROM schema_migrations')
+
+    return {row["Version"] for row in rows}
+
+
+async def run_migrations(db, migrations: List[Migration] = MIGRATIONS):
+    await create_migrations_table(db)
+
+    applied_versions = await get_applied_versions(db)
+
+    applied = []
+    for migration in sorted(migrations, key=lambda migration: migration.version):
+        if migration.version in applied_versions:
+            continue
+
+        # each migration is applied together with its version row or not at all
+        async with db.transaction():
+            if migration.dialects is None or db.dialect in migration.dialects:
+                if migration.before is not None:
+                    await migration.before(db)
+
+                for statement in migration.statements:
+                    await db.execute(statement)
+
+            await db.execute(
+                """
+                INSERT INTO schema_migrations(
+                    Version, 
+                    Description, 
+                    AppliedAt
+                ) VALUES (
+                    :version, 
+                    :description, 
+                    :applied_at
+                )
+                """,
+                {
+                    "version": migration.version,
+                    "description": migration.description,
+                    "applied_at": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+
+        applied.append(migration.version)
+
+    return applied
@@ -0,0 +1,70 @@
+import re
+from typing import Dict, Optional, Union
+
+PragmaValue = Union[int, str]
+
+# applied in this order on every sqlite connection the pool opens
+PRAGMA_PROFILES: Dict[str, Dict[str, PragmaValue]] = {
+    # every commit is fsynced, nothing is mapped into memory
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -16384,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    # WAL with NORMAL only fsyncs at checkpoints, a power loss can drop the
+    # last commits but never corrupts the database
+    "balanced": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # leaves durability to the os, for throwaway and benchmark databases
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "mmap_size": 1073741824,
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+}
+
+PRAGMA_PATTERN = re.compile(r"[A-Za-z_]+")
+PRAGMA_VALUE_PATTERN = re.compile(r"-?[A-Za-z0-9_]+")
+
+
+def parse_pragma_overrides(overrides: Optional[str]):
+    # "synchronous=FULL,cache_size=-4000"
+    pragmas = {}
+
+    for override in (overrides or "").split(","):
+        if not override.strip():
+            continue
+
+        name, _, value = override.partition("=")
+        name, value = name.strip(), value.strip()
+
+        if not PRAGMA_PATTERN.fullmatch(name) or not PRAGMA_VALUE_PATTERN.fullmatch(
+            value
+        ):
+            raise ValueError(f"invalid sqlite pragma override: {override!r}")
+
+        pragmas[name] = int(value) if value.lstrip("-").isdigit() else value
+
+    return pragmas
+
+
+def get_pragmas(profile: str, overrides: Optional[str] = None):
+    if profile not in PRAGMA_PROFILES:
+        raise ValueError(
+            f"unknown sqlite profile {profile!r}, "
+            f"expected one of {', '.join(PRAGMA_PROFILES)}"
+        )
+
+    return {**PRAGMA_PROFILES[profile], **parse_pragma_overrides(overrides)}
@@ -1,5 +1,7 @@
+import operator
+from collections import Counter
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
 
 @dataclass
@@ -10,6 +12,8 @@ class getHomeworksCriteria:
     assigned_after_date: Optional[str] = None
     due_before_date: Optional[str] = None
     due_after_date: Optional[str] = None
+    before_homework_id: Optional[int] = None
+    include_total: bool = False
 
 
 @dataclass
@@ -20,10 +24,82 @@ class getHomeworksCountCriteria:
     due_after_date: Optional[str] = None
 
 
+@dataclass
+class searchHomeworksCriteria:
+    query: str
+    count: int
+    offset: int
+    assigned_before_date: Optional[str] = None
+    assigned_after_date: Optional[str] = None
+    due_before_date: Optional[str] = None
+    due_after_date: Optional[str] = None
+
+
+@dataclass
+class homeworksFilter:
+    homework_ids: Optional[List[int]] = None
+    subject: Optional[str] = None
+    assigned_before_date: Optional[str] = None
+    assigned_after_date: Optional[str] = None
+    due_before_date: Optional[str] = None
+    due_after_date: Optional[str] = None
+
+
+# column types that differ between the supported dialects, dates are kept as
+# ISO strings everywhere so they compare the same way on every backend
+DIALECT_TYPES = {
+    "sqlite": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "date": "DATE",
+    },
+    "postgresql": {
+        "id": "INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY",
+        "date": "TEXT",
+    },
+}
+
+# unquoted identifiers are folded to lower case by postgres, so result
+# columns are aliased to keep the same keys on every backend
+HOMEWORK_COLUMNS = """
+    HomeworkID AS "HomeworkID", 
+    ClassroomID AS "ClassroomID", 
+    Subject AS "Subject", 
+    Teacher AS "Teacher", 
+    Title AS "Title", 
+    Description AS "Description", 
+    AssignedDate AS "AssignedDate", 
+    DueDate AS "DueDate"
+"""
+
+# api names of the HOMEWORK_COLUMNS sent to clients and their positions,
+# reading rows by position skips the per key lookup of the records
+HOMEWORK_FIELDS = (
+    "homework_id",
+    "subject",
+    "teacher",
+    "title",
+    "description",
+    "assigned_date",
+    "due_date",
+)
+homework_values = operator.itemgetter(0, 2, 3, 4, 5, 6, 7)
+
+# the classroom version read by the same statement as the rows it tags, so a
+# cache miss needs no separate query for its etag
+VERSION_COLUMN = """
+    (
+        SELECT Version FROM classrooms 
+        WHERE ClassroomID = :classroom_id
+    ) AS "Version"
+"""
+
+
 async def create_table(db):
+    types = DIALECT_TYPES.get(db.dialect, DIALECT_TYPES["postgresql"])
+
     await db.execute(
-        """CREATE TABLE IF NOT EXISTS classrooms (
-                           ClassroomID INTEGER PRIMARY KEY AUTOINCREMENT,
+        f"""CREATE TABLE IF NOT EXISTS classrooms (
+                           ClassroomID {types["id"]},
                            ClassroomSecret TEXT NOT NULL,
                            ClassroomPassword TEXT NOT NULL,
                            ClassroomName TEXT NOT NULL
@@ -31,21 +107,65 @@ async def create_table(db):
     )
 
     await db.execute(
-        """CREATE TABLE IF NOT EXISTS homeworks (
-                           HomeworkID INTEGER PRIMARY KEY AUTOINCREMENT,
+        f"""CREATE TABLE IF NOT EXISTS homeworks (
+                           HomeworkID {types["id"]},
                            ClassroomID INTEGER NOT NULL,
                            Subject TEXT NOT NULL,
                            Teacher TEXT NOT NULL,
                            Title TEXT NOT NULL,
                            Description TEXT NOT NULL,
-                           AssignedDate DATE NOT NULL,
-                           DueDate DATE NOT NULL
+                           AssignedDate {types["date"]} NOT NULL,
+                           DueDate {types["date"]} NOT NULL
                            )"""
     )
 
-
-async def add_classroom(db, classroom_secret, encrypted_password, classroom_name):
-    return await db.execute(
+    if db.dialect == "sqlite":
+        await create_search_index(db)
+
+
+# the full text index only stores the tokens, the text itself is read back
+# from homeworks, the triggers keep both in step on every write
+SEARCH_INDEX_STATEMENTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS homeworks_fts USING fts5(
+                           Title,
+                           Description,
+                           Subject,
+                           Teacher,
+                           ClassroomID,
+                           content='homeworks',
+                           content_rowid='HomeworkID',
+                           prefix='2 3'
+                           )""",
+    """CREATE TRIGGER IF NOT EXISTS homeworks_fts_insert AFTER INSERT ON homeworks
+       BEGIN
+           INSERT INTO homeworks_fts(rowid, Title, Description, Subject, Teacher, ClassroomID)
+           VALUES (new.HomeworkID, new.Title, new.Description, new.Subject, new.Teacher, new.ClassroomID);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS homeworks_fts_delete AFTER DELETE ON homeworks
+       BEGIN
+           INSERT INTO homeworks_fts(homeworks_fts, rowid, Title, Description, Subject, Teacher, ClassroomID)
+           VALUES ('delete', old.HomeworkID, old.Title, old.Description, old.Subject, old.Teacher, old.ClassroomID);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS homeworks_fts_update
+       AFTER UPDATE OF Title, Description, Subject, Teacher, ClassroomID ON homeworks
+       BEGIN
+           INSERT INTO homeworks_fts(homeworks_fts, rowid, Title, Description, Subject, Teacher, ClassroomID)
+           VALUES ('delete', old.HomeworkID, old.Title, old.Description, old.Subject, old.Teacher, old.ClassroomID);
+           INSERT INTO homeworks_fts(rowid, Title, Description, Subject, Teacher, ClassroomID)
+           VALUES (new.HomeworkID, new.Title, new.Description, new.Subject, new.Teacher, new.ClassroomID);
+       END""",
+]
+
+
+async def create_search_index(db):
+    for statement in SEARCH_INDEX_STATEMENTS:
+        await db.execute(statement)
+
+
+async def insert_classroom(db, classroom_secret, encrypted_password, classroom_name):
+    # the unique index on ClassroomSecret decides, a taken secret inserts
+    # nothing and returns None so the caller can draw a new one
+    classroom_check = await db.fetch_one(
         """
         INSERT INTO classrooms(
             ClassroomSecret, 
@@ -56,6 +176,8 @@ async def add_classroom(db, classroom_secret, encrypted_password, classroom_name
             :password, 
             :name
         )
+        ON CONFLICT (ClassroomSecret) DO NOTHING
+        RETURNING ClassroomID AS "ClassroomID"
         """,
         {
             "secret": classroom_secret,
@@ -64,23 +186,48 @@ async def add_classroom(db, classroom_secret, encrypted_password, classroom_name
         },
     )
 
+    return classroom_check["ClassroomID"] if classroom_check is not None else None
+
+
+async def add_classroom(db, classroom_secret, encrypted_password, classroom_name):
+    async with db.transaction():
+        return await insert_classroom(
+            db, classroom_secret, encrypted_password, classroom_name
+        )
 
-async def get_classroom_password(db, classroom_secret, encrypted_password):
-    return await db.fetch_one(
-        """
-        SELECT ClassroomID, ClassroomName 
-        FROM classrooms 
-        WHERE ClassroomSecret = :secret 
-        AND ClassroomPassword = :password
-        """,
-        {"secret": classroom_secret, "password": encrypted_password},
-    )
 
+async def add_classrooms(db, classrooms):
+    async with db.transaction():
+        return [
+            await insert_classroom(
+                db,
+                classroom["classroom_secret"],
+                classroom["encrypted_password"],
+                classroom["classroom_name"],
+            )
+            for classroom in classrooms
+        ]
 
-async def get_classroom_no_password(db, classroom_secret):
+
+async def update_classroom_password(db, classroom_id, encrypted_password):
+    async with db.transaction():
+        return await db.execute(
+            """
+            UPDATE classrooms 
+            SET ClassroomPassword = :password 
+            WHERE ClassroomID = :classroom_id
+            """,
+            {"password": encrypted_password, "classroom_id": classroom_id},
+        )
+
+
+async def get_classroom(db, classroom_secret):
     return await db.fetch_one(
         """
-        SELECT ClassroomID, ClassroomName 
+        SELECT 
+            ClassroomID AS "ClassroomID", 
+            ClassroomName AS "ClassroomName", 
+            ClassroomPassword AS "ClassroomPassword" 
         FROM classrooms 
         WHERE ClassroomSecret = :secret
         """,
@@ -91,7 +238,7 @@ async def get_classroom_no_password(db, classroom_secret):
 async def get_teacher(db, classroom_id, subject):
     return await db.fetch_one(
         """
-        SELECT Teacher 
+        SELECT Teacher AS "Teacher" 
         FROM homeworks 
         WHERE ClassroomID = :classroom_id 
         AND Subject = :subject
@@ -103,10 +250,33 @@ async def get_teacher(db, classroom_id, subject):
     )
 
 
+async def get_teachers(db, classroom_id, subjects):
+    # latest teacher of each subject in one grouped query
+    subject_params = {
+        f"subject_{index}": subject for index, subject in enumerate(subjects)
+    }
+
+    return await db.fetch_all(
+        f"""
+        SELECT homeworks.Subject AS "Subject", homeworks.Teacher AS "Teacher" 
+        FROM homeworks 
+        JOIN (
+            SELECT MAX(HomeworkID) AS LatestHomeworkID 
+            FROM homeworks 
+            WHERE ClassroomID = :classroom_id 
+            AND Subject IN ({', '.join(f':{key}' for key in subject_params)})
+            GROUP BY Subject
+        ) AS latest_homeworks 
+        ON homeworks.HomeworkID = latest_homeworks.LatestHomeworkID
+        """,
+        {"classroom_id": classroom_id, **subject_params},
+    )
+
+
 async def get_homework(db, classroom_id, homework_id):
     return await db.fetch_one(
-        """
-        SELECT * 
+        f"""
+        SELECT {HOMEWORK_COLUMNS}, {VERSION_COLUMN} 
         FROM homeworks 
         WHERE HomeworkID = :homework_id 
         AND ClassroomID = :classroom_id
@@ -115,11 +285,7 @@ async def get_homework(db, classroom_id, homework_id):
     )
 
 
-async def get_homeworks(
-    db,
-    classroom_id,
-    criteria: getHomeworksCriteria,
-):
+def build_date_conditions(criteria):
     conditions = []
 
     if criteria.assigned_before_date:
@@ -134,10 +300,67 @@ async def get_homeworks(
     if criteria.due_after_date:
         conditions.append("DueDate >= :due_after_date")
 
+    return conditions
+
+
+def build_filter_conditions(criteria: homeworksFilter):
+    conditions = build_date_conditions(criteria)
+    query_dict = {
+        key: value
+        for key, value in criteria.__dict__.items()
+        if value is not None and key != "homework_ids"
+    }
+
+    if criteria.subject:
+        conditions.append("Subject = :subject")
+
+    if criteria.homework_ids is not None:
+        homework_id_params = {
+            f"homework_id_{index}": homework_id
+            for index, homework_id in enumerate(criteria.homework_ids)
+        }
+        query_dict.update(homework_id_params)
+
+        # an empty id list matches nothing rather than everything
+        conditions.append(
+            f"HomeworkID IN ({', '.join(f':{key}' for key in homework_id_params)})"
+            if homework_id_params
+            else "1 = 0"
+        )
+
+    return conditions, query_dict
+
+
+async def get_homeworks(
+    db,
+    classroom_id,
+    criteria: getHomeworksCriteria,
+):
+    conditions = build_date_conditions(criteria)
+
+    joined_filter = " AND ".join(conditions) if conditions else ""
+
+    # keyset pagination, seek past the last homework of the previous page
+    if criteria.before_homework_id is not None:
+        conditions.append("HomeworkID < :before_homework_id")
+
     joined_conditions = " AND ".join(conditions) if conditions else ""
 
+    # the total is counted over the filters alone, not the seek, so it stays
+    # the total of the whole list; as a scalar subquery it is one index count
+    # and the outer query still walks the index and stops at the limit
+    total_column = ""
+    if criteria.include_total:
+        total_column = f"""
+                , (
+                    SELECT COUNT(*) FROM homeworks 
+                    WHERE ClassroomID = :classroom_id 
+                    {'AND' if joined_filter else ''} {joined_filter}
+                ) AS "TotalCount"
+                """
+
     query = f"""
-            SELECT * FROM homeworks 
+            SELECT {HOMEWORK_COLUMNS}, {VERSION_COLUMN}{total_column} FROM homeworks 
             WHERE ClassroomID = :classroom_id 
             {'AND' if joined_conditions else ''} {joined_conditions}
             ORDER BY HomeworkID DESC
@@ -152,7 +375,7 @@ async def get_homeworks(
     }
 
     for key, value in criteria.__dict__.items():
-        if value is not None and key not in ["count", "offset"]:
+        if value is not None and key not in ["count", "offset", "include_total"]:
             query_dict[key] = value
 
     return await db.fetch_all(query, query_dict)
@@ -163,24 +386,12 @@ async def get_homeworks_count(
     classroom_id,
     criteria: getHomeworksCountCriteria,
 ):
-    conditions = []
-
-    if criteria.assigned_before_date:
-        conditions.append("AssignedDate <= :assigned_before_date")
-
-    if criteria.assigned_after_date:
-        conditions.append("AssignedDate >= :assigned_after_date")
-
-    if criteria.due_before_date:
-        conditions.append("DueDate <= :due_before_date")
-
-    if criteria.due_after_date:
-        conditions.append("DueDate >= :due_after_date")
+    conditions = build_date_conditions(criteria)
 
     joined_conditions = " AND ".join(conditions) if conditions else ""
 
     query = f"""
-            SELECT COUNT(HomeworkID) FROM homeworks 
+            SELECT COUNT(HomeworkID) AS "HomeworkCount" FROM homeworks 
             WHERE ClassroomID = :classroom_id 
             {'AND' if joined_conditions else ''} {joined_conditions}
             """
@@ -196,61 +407,530 @@ async def get_homeworks_count(
     return await db.fetch_one(query, query_dict)
 
 
-async def add_homework(
-    db, classroom_id, subject, teacher, title, description, assigned_date, due_date
-):
+def build_search_terms(query):
+    # every word is quoted so fts5 operators in the input stay plain text,
+    # and matched as a prefix
+    terms = [term.replace('"', '""') for term in query.split()]
+
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def build_search_match(classroom_id, query):
+    # the classroom id is indexed as a token of its own, matching it inside
+    # fts5 keeps other classrooms out before anything is ranked or joined;
+    # the words are only looked for in the text columns
+    return (
+        f'ClassroomID : "{int(classroom_id)}" '
+        f"AND {{Title Description Subject Teacher}} : ({build_search_terms(query)})"
+    )
+
+
+async def search_homeworks(db, classroom_id, criteria: searchHomeworksCriteria):
+    conditions = build_date_conditions(criteria)
+
+    query_dict = {
+        "classroom_id": classroom_id,
+        "count": criteria.count,
+        "offset": criteria.offset,
+    }
+
+    for key, value in criteria.__dict__.items():
+        if value is not None and key not in query_dict and key != "query":
+            query_dict[key] = value
+
+    if db.dialect == "sqlite":
+        query_dict["match"] = build_search_match(classroom_id, criteria.query)
+
+        joined_conditions = " AND ".join(conditions) if conditions else ""
+
+        # bm25 ranks better matches lower, title hits weigh double and the
+        # classroom token, shared by every match, weighs nothing
+        query = f"""
+                SELECT {HOMEWORK_COLUMNS}, {VERSION_COLUMN} FROM homeworks 
+                JOIN (
+                    SELECT rowid AS MatchID, bm25(homeworks_fts, 2.0, 1.0, 1.0, 1.0, 0.0) AS MatchRank 
+                    FROM homeworks_fts 
+                    WHERE homeworks_fts MATCH :match
+                ) AS matches ON matches.MatchID = homeworks.HomeworkID 
+                WHERE ClassroomID = :classroom_id 
+                {'AND' if joined_conditions else ''} {joined_conditions}
+                ORDER BY MatchRank, HomeworkID DESC
+                LIMIT :count
+                OFFSET :offset
+                """
+
+        return await db.fetch_all(query, query_dict)
+
+    # other backends have no fts5, every word has to appear in one of the
+    # searched columns
+    for index, term in enumerate(criteria.query.split()):
+        escaped_term = (
+            term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        query_dict[f"term_{index}"] = f"%{escaped_term}%"
+
+        conditions.append(
+            "("
+            + " OR ".join(
+                f"{column} ILIKE :term_{index} ESCAPE '\\'"
+                for column in ("Title", "Description", "Subject", "Teacher")
+            )
+            + ")"
+        )
+
+    joined_conditions = " AND ".join(conditions) if conditions else ""
+
+    query = f"""
+            SELECT {HOMEWORK_COLUMNS}, {VERSION_COLUMN} FROM homeworks 
+            WHERE ClassroomID = :classroom_id 
+            {'AND' if joined_conditions else ''} {joined_conditions}
+            ORDER BY HomeworkID DESC
+            LIMIT :count
+            OFFSET :offset
+            """
+
+    return await db.fetch_all(query, query_dict)
+
+
+async def get_classroom_version(db, classroom_id):
+    return await db.fetch_one(
+        """
+        SELECT Version AS "Version" 
+        FROM classrooms 
+        WHERE ClassroomID = :classroom_id
+        """,
+        {"classroom_id": classroom_id},
+    )
+
+
+async def bump_classroom_version(db, classroom_id):
     return await db.execute(
         """
-        INSERT INTO homeworks(
+        UPDATE classrooms 
+        SET Version = Version + 1 
+        WHERE ClassroomID = :classroom_id
+        """,
+        {"classroom_id": classroom_id},
+    )
+
+
+async def adjust_daily_stats(db, classroom_id, days, delta):
+    # days is one (subject, assigned date) pair per homework written, the
+    # counters are adjusted in whatever transaction the caller holds
+    counts = Counter(days)
+
+    if not counts:
+        return
+
+    await db.execute_many(
+        """
+        INSERT INTO homework_daily_stats(
             ClassroomID, 
             Subject, 
-            Teacher, 
-            Title, 
-            Description, 
             AssignedDate, 
-            DueDate
+            HomeworkCount
         ) VALUES (
             :classroom_id, 
             :subject, 
-            :teacher, 
-            :title, 
-            :description, 
             :assigned_date, 
-            :due_date
+            :homework_count
         )
+        ON CONFLICT (ClassroomID, Subject, AssignedDate) 
+        DO UPDATE SET HomeworkCount = 
+            homework_daily_stats.HomeworkCount + excluded.HomeworkCount
         """,
+        [
+            {
+                "classroom_id": classroom_id,
+                "subject": subject,
+                "assigned_date": assigned_date,
+                "homework_count": count * delta,
+            }
+            for (subject, assigned_date), count in counts.items()
+        ],
+    )
+
+    if delta < 0:
+        await db.execute(
+            """
+            DELETE FROM homework_daily_stats 
+            WHERE ClassroomID = :classroom_id 
+            AND HomeworkCount <= 0
+            """,
+            {"classroom_id": classroom_id},
+        )
+
+
+async def rebuild_daily_stats(db, classroom_id=None):
+    query_dict = {}
+    condition = ""
+
+    if classroom_id is not None:
+        query_dict["classroom_id"] = classroom_id
+        condition = "WHERE ClassroomID = :classroom_id"
+
+    async with db.transaction():
+        await db.execute(
+            f"DELETE FROM homework_daily_stats {condition}",
+            query_dict,
+        )
+
+        await db.execute(
+            f"""
+            INSERT INTO homework_daily_stats(
+                ClassroomID, 
+                Subject, 
+                AssignedDate, 
+                HomeworkCount
+            ) 
+            SELECT ClassroomID, Subject, AssignedDate, COUNT(*) 
+            FROM homeworks 
+            {condition}
+            GROUP BY ClassroomID, Subject, AssignedDate
+            """,
+            query_dict,
+        )
+
+        # etags and cached responses were made from the old counters, the
+        # classrooms returned here still need their response cache invalidated
+        return await db.fetch_all(
+            f"""
+            UPDATE classrooms SET Version = Version + 1 {condition} 
+            RETURNING ClassroomID AS "ClassroomID"
+            """,
+            query_dict,
+        )
+
+
+INSERT_HOMEWORK = """
+    INSERT INTO homeworks(
+        ClassroomID, 
+        Subject, 
+        Teacher, 
+        Title, 
+        Description, 
+        AssignedDate, 
+        DueDate
+    ) VALUES (
+        :classroom_id, 
+        :subject, 
+        :teacher, 
+        :title, 
+        :description, 
+        :assigned_date, 
+        :due_date
+    )
+"""
+
+# one row per position of the arrays, seven parameters however many rows
+INSERT_HOMEWORKS = """
+    INSERT INTO homeworks(
+        ClassroomID, 
+        Subject, 
+        Teacher, 
+        Title, 
+        Description, 
+        AssignedDate, 
+        DueDate
+    ) 
+    SELECT 
+        :classroom_id, 
+        Subject, 
+        Teacher, 
+        Title, 
+        Description, 
+        AssignedDate, 
+        DueDate
+    FROM unnest(
+        CAST(:subjects AS TEXT[]), 
+        CAST(:teachers AS TEXT[]), 
+        CAST(:titles AS TEXT[]), 
+        CAST(:descriptions AS TEXT[]), 
+        CAST(:assigned_dates AS TEXT[]), 
+        CAST(:due_dates AS TEXT[])
+    ) AS rows(Subject, Teacher, Title, Description, AssignedDate, DueDate)
+    RETURNING HomeworkID AS "HomeworkID"
+"""
+
+
+async def add_homework(
+    db, classroom_id, subject, teacher, title, description, assigned_date, due_date
+):
+    async with db.transaction():
+        homework_id = await db.execute(
+            f"{INSERT_HOMEWORK} RETURNING HomeworkID",
+            {
+                "classroom_id": classroom_id,
+                "subject": subject,
+                "teacher": teacher,
+                "title": title,
+                "description": description,
+                "assigned_date": assigned_date,
+                "due_date": due_date,
+            },
+        )
+
+        await adjust_daily_stats(db, classroom_id, [(subject, assigned_date)], 1)
+
+        await bump_classroom_version(db, classroom_id)
+
+    return homework_id
+
+
+async def add_homeworks(db, classroom_id, homeworks):
+    values = [
         {
             "classroom_id": classroom_id,
-            "subject": subject,
-            "teacher": teacher,
-            "title": title,
-            "description": description,
-            "assigned_date": assigned_date,
-            "due_date": due_date,
-        },
-    )
+            "subject": homework["subject"],
+            "teacher": homework["teacher"],
+            "title": homework["title"],
+            "description": homework["description"],
+            "assigned_date": homework["assigned_date"],
+            "due_date": homework["due_date"],
+        }
+        for homework in homeworks
+    ]
+
+    async with db.transaction():
+        if db.dialect == "sqlite":
+            await db.execute_many(INSERT_HOMEWORK, values)
+
+            # sqlite only: the first insert takes the database write lock and
+            # holds it until commit, nobody else can insert in between, so the
+            # newest rows of the classroom are exactly the ones above, in order
+            inserted = await db.fetch_all(
+                """
+                SELECT HomeworkID AS "HomeworkID" 
+                FROM homeworks 
+                WHERE ClassroomID = :classroom_id 
+                ORDER BY HomeworkID DESC 
+                LIMIT :count
+                """,
+                {"classroom_id": classroom_id, "count": len(homeworks)},
+            )
+            homework_ids = [row["HomeworkID"] for row in reversed(inserted)]
+        else:
+            # server databases let other transactions insert (and commit) in
+            # between, so the ids come back from the insert itself
+            inserted = await db.fetch_all(
+                INSERT_HOMEWORKS,
+                {
+                    "classroom_id": classroom_id,
+                    "subjects": [value["subject"] for value in values],
+                    "teachers": [value["teacher"] for value in values],
+                    "titles": [value["title"] for value in values],
+                    "descriptions": [value["description"] for value in values],
+                    "assigned_dates": [value["assigned_date"] for value in values],
+                    "due_dates": [value["due_date"] for value in values],
+                },
+            )
+
+            # the statement draws its ids from the sequence in the order of its
+            # rows, so sorted ids line up with the homeworks
+            homework_ids = sorted(row["HomeworkID"] for row in inserted)
+
+        await adjust_daily_stats(
+            db,
+            classroom_id,
+            [
+                (homework["subject"], homework["assigned_date"])
+                for homework in homeworks
+            ],
+            1,
+        )
+
+        await bump_classroom_version(db, classroom_id)
+
+    return homework_ids
+
+
+async def add_homeworks_batch(db, homeworks):
+    # (classroom id, homework) pairs of any classrooms in one transaction,
+    # the ids come back in the same order as the pairs
+    classroom_homeworks = {}
+    for index, (classroom_id, homework) in enumerate(homeworks):
+        classroom_homeworks.setdefault(classroom_id, []).append((index, homework))
+
+    homework_ids = [None] * len(homeworks)
+    async with db.transaction():
+        for classroom_id, indexed_homeworks in classroom_homeworks.items():
+            inserted_ids = await add_homeworks(
+                db, classroom_id, [homework for _, homework in indexed_homeworks]
+            )
+
+            for (index, _), homework_id in zip(indexed_homeworks, inserted_ids):
+                homework_ids[index] = homework_id
+
+    return homework_ids
 
 
 async def remove_homework(db, classroom_id, homework_id):
-    return await db.execute(
-        """
-        DELETE FROM homeworks 
-        WHERE HomeworkID = :homework_id 
-        AND ClassroomID = :classroom_id
-        """,
-        {"homework_id": homework_id, "classroom_id": classroom_id},
-    )
+    async with db.transaction():
+        deleted = await db.fetch_one(
+            """
+            DELETE FROM homeworks 
+            WHERE HomeworkID = :homework_id 
+            AND ClassroomID = :classroom_id
+            RETURNING Subject AS "Subject", AssignedDate AS "AssignedDate"
+            """,
+            {"homework_id": homework_id, "classroom_id": classroom_id},
+        )
+
+        if deleted is not None:
+            await adjust_daily_stats(
+                db,
+                classroom_id,
+                [(deleted["Subject"], deleted["AssignedDate"])],
+                -1,
+            )
+
+        await bump_classroom_version(db, classroom_id)
+
+    return deleted
+
+
+async def remove_homeworks(db, classroom_id, criteria: homeworksFilter):
+    conditions, query_dict = build_filter_conditions(criteria)
+
+    async with db.transaction():
+        deleted = await db.fetch_all(
+            f"""
+            DELETE FROM homeworks 
+            WHERE ClassroomID = :classroom_id 
+            AND {' AND '.join(conditions)}
+            RETURNING 
+                HomeworkID AS "HomeworkID", 
+                Subject AS "Subject", 
+                AssignedDate AS "AssignedDate"
+            """,
+            {"classroom_id": classroom_id, **query_dict},
+        )
+
+        if deleted:
+            await adjust_daily_stats(
+                db,
+                classroom_id,
+                [(row["Subject"], row["AssignedDate"]) for row in deleted],
+                -1,
+            )
+
+            await bump_classroom_version(db, classroom_id)
+
+    return sorted(row["HomeworkID"] for row in deleted)
+
+
+async def update_homeworks(db, classroom_id, criteria: homeworksFilter, changes):
+    conditions, query_dict = build_filter_conditions(criteria)
+
+    # changes maps column names to new values, column names never come
+    # from the request
+    assignments = ", ".join(f"{column} = :new_{column}" for column in changes)
+    change_dict = {f"new_{column}": value for column, value in changes.items()}
+
+    async with db.transaction():
+        # returning only sees the new values, so the days a subject change
+        # moves homeworks out of are read first
+        previous = []
+        if "Subject" in changes:
+            previous = await db.fetch_all(
+                f"""
+                SELECT Subject AS "Subject", AssignedDate AS "AssignedDate" 
+                FROM homeworks 
+                WHERE ClassroomID = :classroom_id 
+                AND {' AND '.join(conditions)}
+                """,
+                {"classroom_id": classroom_id, **query_dict},
+            )
+
+        updated = await db.fetch_all(
+            f"""
+            UPDATE homeworks 
+            SET {assignments} 
+            WHERE ClassroomID = :classroom_id 
+            AND {' AND '.join(conditions)}
+            RETURNING 
+                HomeworkID AS "HomeworkID", 
+                Subject AS "Subject", 
+                AssignedDate AS "AssignedDate"
+            """,
+            {"classroom_id": classroom_id, **query_dict, **change_dict},
+        )
+
+        if previous:
+            await adjust_daily_stats(
+                db,
+                classroom_id,
+                [(row["Subject"], row["AssignedDate"]) for row in previous],
+                -1,
+            )
+
+            await adjust_daily_stats(
+                db,
+                classroom_id,
+                [(row["Subject"], row["AssignedDate"]) for row in updated],
+                1,
+            )
+
+        if updated:
+            await bump_classroom_version(db, classroom_id)
+
+    return sorted(row["HomeworkID"] for row in updated)
+
+
+# expressions that turn AssignedDate into its bucket key, weeks are keyed by
+# the date of their monday
+STATISTICS_BUCKETS = {
+    "sqlite": {
+        "day": "AssignedDate",
+        "week": "date(AssignedDate, 'weekday 0', '-6 days')",
+        "month": "substr(AssignedDate, 1, 7)",
+    },
+    "postgresql": {
+        "day": "AssignedDate",
+        "week": "to_char(date_trunc('week', AssignedDate::date), 'YYYY-MM-DD')",
+        "month": "substr(AssignedDate, 1, 7)",
+    },
+}
+
+STATISTICS_GROUPS = {
+    "subject": "Subject",
+    "teacher": "Teacher",
+}
 
 
 async def get_statistics(
-    db, classroom_id, assigned_before_date, assigned_after_date, subject=None
+    db,
+    classroom_id,
+    assigned_before_date,
+    assigned_after_date,
+    subject=None,
+    bucket="day",
+    group_by=None,
 ):
+    buckets = STATISTICS_BUCKETS.get(db.dialect, STATISTICS_BUCKETS["postgresql"])
+    bucket_expression = buckets[bucket]
+    group_column = STATISTICS_GROUPS[group_by] if group_by else None
+
+    # the daily counters answer everything but the teacher breakdown, which
+    # still has to scan homeworks
+    if group_by == "teacher":
+        source, count_expression = "homeworks", "COUNT(*)"
+    else:
+        source, count_expression = "homework_daily_stats", "SUM(HomeworkCount)"
+
     query = f"""
-            SELECT AssignedDate FROM homeworks 
+            SELECT 
+                {bucket_expression} AS "Bucket", 
+                {f'{group_column} AS "Group",' if group_column else ''} 
+                {count_expression} AS "HomeworkCount", 
+                {VERSION_COLUMN} 
+            FROM {source} 
             WHERE ClassroomID = :classroom_id 
             AND AssignedDate <= :assigned_before_date
             AND AssignedDate >= :assigned_after_date
             {'AND Subject = :subject' if subject else ''}
+            GROUP BY {bucket_expression}{f', {group_column}' if group_column else ''}
+            ORDER BY {bucket_expression}
             """
 
     query_dict = {
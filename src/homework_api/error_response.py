@@ -1,5 +1,7 @@
 from enum import Enum
 
+from homework_api import serialization
+
 
 class ErrorResponse(Enum):
     CLASSROOM_INVALID = {
@@ -42,6 +44,14 @@ class ErrorResponse(Enum):
         },
     }
 
+    TOKEN_INVALID = {
+        "response_code": 401,
+        "response": {
+            "error": "TOKEN_INVALID",
+            "message": "Session token is invalid or expired",
+        },
+    }
+
     NO_TEACHER = {
         "response_code": 400,
         "response": {
@@ -66,6 +76,102 @@ class ErrorResponse(Enum):
         },
     }
 
+    CURSOR_INVALID = {
+        "response_code": 400,
+        "response": {
+            "error": "CURSOR_INVALID",
+            "message": "Cursor is invalid or does not match the filters",
+        },
+    }
+
+    TOO_MANY_HOMEWORKS = {
+        "response_code": 400,
+        "response": {
+            "error": "TOO_MANY_HOMEWORKS",
+            "message": "Bulk requests must contain 1-10000 homeworks",
+        },
+    }
+
+    TOO_MANY_CLASSROOMS = {
+        "response_code": 400,
+        "response": {
+            "error": "TOO_MANY_CLASSROOMS",
+            "message": "Bulk requests must contain 1-1000 classrooms",
+        },
+    }
+
+    FILTER_REQUIRED = {
+        "response_code": 400,
+        "response": {
+            "error": "FILTER_REQUIRED",
+            "message": "Homework ids, subject or a date filter must be specified",
+        },
+    }
+
+    NO_CHANGES = {
+        "response_code": 400,
+        "response": {
+            "error": "NO_CHANGES",
+            "message": "At least one field to update must be specified",
+        },
+    }
+
+    QUERY_INVALID = {
+        "response_code": 400,
+        "response": {
+            "error": "QUERY_INVALID",
+            "message": "Search query must not be empty",
+        },
+    }
+
+    EXPORT_FORMAT_INVALID = {
+        "response_code": 400,
+        "response": {
+            "error": "EXPORT_FORMAT_INVALID",
+            "message": "Export format must be ndjson or csv",
+        },
+    }
+
+    IMPORT_FORMAT_INVALID = {
+        "response_code": 400,
+        "response": {
+            "error": "IMPORT_FORMAT_INVALID",
+            "message": "Import file must be csv or ndjson",
+        },
+    }
+
+    ROW_INVALID = {
+        "response_code": 400,
+        "response": {
+            "error": "ROW_INVALID",
+            "message": "Row is not a valid homework",
+        },
+    }
+
+    REPORT_NOT_FOUND = {
+        "response_code": 404,
+        "response": {
+            "error": "REPORT_NOT_FOUND",
+            "message": "Import report not found or expired",
+        },
+    }
+
+    STATISTICS_INVALID = {
+        "response_code": 400,
+        "response": {
+            "error": "STATISTICS_INVALID",
+            "message": "Bucket must be day, week or month and group_by subject or teacher",
+        },
+    }
+
+    SERVER_BUSY = {
+        "response_code": 503,
+        "response": {
+            "error": "SERVER_BUSY",
+            "message": "Too many homeworks are waiting to be saved, try again shortly",
+        },
+    }
+
     NO_STATISTICS = {
         "response_code": 400,
         "response": {
@@ -73,3 +179,38 @@ class ErrorResponse(Enum):
             "message": "No statistics available",
         },
     }
+
+    NO_HOMEWORKS_CREATED = {
+        "response_code": 400,
+        "response": {
+            "error": "NO_HOMEWORKS_CREATED",
+            "message": "None of the homeworks could be created",
+        },
+    }
+
+    NO_CLASSROOMS_CREATED = {
+        "response_code": 400,
+        "response": {
+            "error": "NO_CLASSROOMS_CREATED",
+            "message": "None of the classrooms could be created",
+        },
+    }
+
+    def with_context(self, context):
+        # the error with a context, e.g. the per row errors of a bulk request
+        return serialization.api_response(
+            {
+                "response_code": self.value["response_code"],
+                "response": {**self.value["response"], "context": context},
+            }
+        )
+
+    @property
+    def response(self):
+        return serialization.json_response(
+            ERROR_CONTENTS[self], serialization.http_status(self.value["response_code"])
+        )
+
+
+# every error body is serialized once, responses reuse the same bytes
+ERROR_CONTENTS = {member: serialization.dumps(member.value) for member in ErrorResponse}
@@ -0,0 +1,115 @@
+import csv
+import io
+import itertools
+import json
+import tempfile
+import threading
+
+from homework_api import config
+from homework_api.cache import LRUCache
+
+IMPORT_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+
+def detect_format(import_format, filename):
+    if import_format is not None:
+        return import_format if import_format in ("csv", "ndjson") else None
+
+    for extension, extension_format in IMPORT_FORMATS.items():
+        if (filename or "").lower().endswith(extension):
+            return extension_format
+
+    return None
+
+
+def iter_records(file, import_format):
+    # yields (row number, record, error) without ever holding more than one
+    # line of the upload, empty csv cells count as missing fields
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+
+    if import_format == "csv":
+        reader = csv.DictReader(text)
+
+        # a header that cannot be parsed leaves nothing to map the rows onto
+        try:
+            reader.fieldnames
+        except csv.Error:
+            yield 1, None, "ROW_INVALID"
+            return
+
+        row_number = 0
+        while True:
+            row_number += 1
+
+            # e.g. a field over csv.field_size_limit(), the reader drops the
+            # rest of that line and carries on with the next one
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                yield row_number, None, "ROW_INVALID"
+                continue
+
+            yield row_number, {
+                key: value for key, value in row.items() if key and value
+            }, None
+
+    row_number = 0
+    for line in text:
+        if not line.strip():
+            continue
+
+        row_number += 1
+
+        try:
+            yield row_number, json.loads(line), None
+        except ValueError:
+            yield row_number, None, "ROW_INVALID"
+
+
+def read_chunk(records, size):
+    # parsing is blocking file io, callers run this in a thread
+    return list(itertools.islice(records, size))
+
+
+class ImportReport:
+    def __init__(self):
+        # small reports stay in memory, large ones roll over to disk
+        self.file = tempfile.SpooledTemporaryFile(
+            max_size=config.IMPORT_REPORT_SPOOL_SIZE,
+            mode="w+",
+            encoding="utf-8",
+            newline="",
+        )
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["row", "error"])
+        self.failed = 0
+
+        # downloads may run concurrently in the threadpool
+        self.lock = threading.Lock()
+
+    def add(self, row_number, error):
+        self.writer.writerow([row_number, error])
+        self.failed += 1
+
+    def iter_chunks(self, size=64 * 1024):
+        position = 0
+        while True:
+            with self.lock:
+                self.file.seek(position)
+                chunk = self.file.read(size)
+                position = self.file.tell()
+
+            if not chunk:
+                return
+
+            yield chunk
+
+
+# token -> (classroom id, report), expired reports are dropped with the cache
+import_reports = LRUCache(config.IMPORT_REPORT_CACHE_SIZE, config.IMPORT_REPORT_TTL)
@@ -1,13 +1,40 @@
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import Response
 
-from homework_api.database import classroom_conn
+from homework_api import auth, config, importer, metrics, serialization
+from homework_api.batcher import homework_batcher
+from homework_api.database import classroom_conn, run_migrations
 from homework_api.db_operations import create_table
+from homework_api.response_cache import response_cache
 from homework_api.routers import classroom, homework
 
-app = FastAPI()
+logger = logging.getLogger("uvicorn.error")
+
+# dict results are encoded with orjson when it is installed
+app = FastAPI(default_response_class=serialization.CompactJSONResponse)
+
+app.add_middleware(metrics.MetricsMiddleware)
 
 database = classroom_conn
 
+# read on every scrape, nothing is copied in between
+metrics.register_stats("homework_api_db_pool", "database", "main", database.pool_stats)
+metrics.register_stats(
+    "homework_api_cache", "cache", "classroom", auth.classroom_cache.stats
+)
+metrics.register_stats(
+    "homework_api_cache", "cache", "credential", auth.credential_cache.stats
+)
+metrics.register_stats("homework_api_cache", "cache", "response", response_cache.stats)
+metrics.register_stats(
+    "homework_api_cache", "cache", "import_report", importer.import_reports.stats
+)
+metrics.register_stats(
+    "homework_api_add_batcher", "batcher", "homework", homework_batcher.stats
+)
+
 
 @app.on_event("startup")
 async def startup():
@@ -16,9 +43,25 @@ async def startup():
     # create tables if not exists
     await create_table(database)
 
+    # bring indexes and later schema changes up to date
+    await run_migrations(database)
+
+    if homework_batcher.enabled:
+        await homework_batcher.start()
+
+    if config.SESSION_SECRET_IS_RANDOM:
+        logger.warning(
+            "HOMEWORK_API_SESSION_SECRET is not set, session tokens are signed "
+            "with a random key of this process and fail on other workers and "
+            "after a restart"
+        )
+
 
 @app.on_event("shutdown")
 async def shutdown():
+    # queued homeworks are written before the database goes away
+    await homework_batcher.stop()
+
     await database.disconnect()
 
 
@@ -29,3 +72,13 @@ app.include_router(homework.router)
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
+
+
+@app.get("/stats")
+async def stats():
+    return {"database": database.pool_stats()}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,262 @@
+import bisect
+import math
+import time
+from typing import Callable, Dict, List, Tuple
+
+from starlette.routing import Match
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple[str, ...]):
+    if not names:
+        return ""
+
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in values
+    )
+
+    return (
+        "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+    )
+
+
+class CounterMetric:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+        # unlabelled metrics are exported from the start
+        if not labels:
+            self.values[()] = 0
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self, kind: str = "counter"):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {kind}"]
+
+        for labels, value in sorted(self.values.items()):
+            lines.append(
+                f"{self.name}{format_labels(self.labels, labels)} "
+                f"{format_value(value)}"
+            )
+
+        return lines
+
+
+class GaugeMetric(CounterMetric):
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        return super().render("gauge")
+
+
+class HistogramMetric:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = HTTP_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets) + (math.inf,)
+
+        # labels -> [per bucket counts, sum, count]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        entry = self.values.get(labels)
+
+        if entry is None:
+            entry = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+
+        # only the first bucket that fits is counted, render adds them up
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            # buckets are stored per range and exposed cumulatively
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = format_labels(
+                    self.labels + ("le",), labels + (format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+
+            label_text = format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_text} {format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+
+        return lines
+
+
+http_request_duration = HistogramMetric(
+    "homework_api_http_request_duration_seconds",
+    "Time from request start until the response is fully sent.",
+    ("method", "route"),
+)
+
+http_requests = CounterMetric(
+    "homework_api_http_requests_total",
+    "Responses sent, by status code.",
+    ("method", "route", "status"),
+)
+
+http_requests_in_flight = GaugeMetric(
+    "homework_api_http_requests_in_flight",
+    "Requests currently being handled.",
+)
+
+db_query_duration = HistogramMetric(
+    "homework_api_db_query_duration_seconds",
+    "Database calls including the wait for a connection, by calling function.",
+    ("function", "method"),
+    QUERY_BUCKETS,
+)
+
+add_batch_size = HistogramMetric(
+    "homework_api_add_batch_size",
+    "Homeworks committed together by the /homework/add batcher.",
+    buckets=BATCH_BUCKETS,
+)
+
+add_batch_wait = HistogramMetric(
+    "homework_api_add_batch_wait_seconds",
+    "Time a homework waited in the batcher queue before its batch was written.",
+    buckets=QUERY_BUCKETS,
+)
+
+add_batch_rejected = CounterMetric(
+    "homework_api_add_batch_rejected_total",
+    "Homeworks turned away because the batcher queue was full.",
+)
+
+REGISTRY = [
+    http_request_duration,
+    http_requests,
+    http_requests_in_flight,
+    db_query_duration,
+    add_batch_size,
+    add_batch_wait,
+    add_batch_rejected,
+]
+
+# name -> (label name, {label value: stats callable}), e.g. pool and cache
+# counters that already live elsewhere and are only read when scraped
+stats_collectors: Dict[str, Tuple[str, Dict[str, Callable[[], dict]]]] = {}
+
+
+def register_stats(name: str, label: str, value: str, stats: Callable[[], dict]):
+    stats_collectors.setdefault(name, (label, {}))[1][value] = stats
+
+
+def observe_query(function: str, method: str, seconds: float):
+    db_query_duration.observe(seconds, function, method)
+
+
+def render_stats():
+    lines: List[str] = []
+
+    for name, (label, sources) in stats_collectors.items():
+        samples: Dict[str, List[str]] = {}
+
+        for value, stats in sources.items():
+            for key, stat in stats().items():
+                if not isinstance(stat, (int, float)) or isinstance(stat, bool):
+                    continue
+
+                samples.setdefault(key, []).append(
+                    f"{name}_{key}{format_labels((label,), (value,))} "
+                    f"{format_value(stat)}"
+                )
+
+        for key, key_samples in samples.items():
+            lines.append(f"# TYPE {name}_{key} gauge")
+            lines.extend(key_samples)
+
+    return lines
+
+
+def render():
+    lines: List[str] = []
+
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+
+    lines.extend(render_stats())
+
+    return "\n".join(lines) + "\n"
+
+
+def get_route_path(scope):
+    # route templates keep the label set small, unknown paths share one label
+    route = scope.get("route")
+
+    if route is not None:
+        return route.path
+
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+
+        if match == Match.FULL:
+            return route.path
+
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+
+            route_path = get_route_path(scope)
+            http_request_duration.observe(
+                time.perf_counter() - started, scope["method"], route_path
+            )
+            http_requests.inc(scope["method"], route_path, str(status_code))
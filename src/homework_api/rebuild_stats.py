@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+
+from homework_api import config
+from homework_api.database import classroom_conn, run_migrations
+from homework_api.db_operations import create_table, rebuild_daily_stats
+from homework_api.response_cache import response_cache
+
+
+async def rebuild_statistics(db, classroom_id=None):
+    rebuilt = await rebuild_daily_stats(db, classroom_id)
+
+    # a shared cache is invalidated here, a per process one lives inside the
+    # servers and keeps the old statistics until they restart or it expires
+    for row in rebuilt:
+        await response_cache.invalidate(row["ClassroomID"])
+
+    return len(rebuilt)
+
+
+async def rebuild(classroom_id=None):
+    await classroom_conn.connect()
+
+    try:
+        await create_table(classroom_conn)
+        await run_migrations(classroom_conn)
+
+        return await rebuild_statistics(classroom_conn, classroom_id)
+    finally:
+        await classroom_conn.disconnect()
+
+
+def run():
+    parser = argparse.ArgumentParser(
+        description="Recount homework_daily_stats from the homeworks table"
+    )
+    parser.add_argument(
+        "--classroom-id",
+        type=int,
+        default=None,
+        help="only rebuild the counters of this classroom",
+    )
+    args = parser.parse_args()
+
+    classroom_count = asyncio.run(rebuild(args.classroom_id))
+
+    print(f"Rebuilt the daily statistics of {classroom_count} classrooms")
+
+    if config.RESPONSE_CACHE_BACKEND in ("memory", "local"):
+        print(
+            f"The {config.RESPONSE_CACHE_BACKEND} response cache is per process, "
+            "restart running servers to drop cached statistics now, otherwise "
+            f"they expire within {config.RESPONSE_CACHE_TTL:g} seconds"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,187 @@
+import time
+from typing import Any, Dict, Optional
+
+from homework_api import config, serialization, utils
+from homework_api.cache import LRUCache
+
+
+def serialize_response(payload: Dict[str, Any]):
+    # same encoding as the default response class, so hits and misses match
+    return serialization.dumps(payload)
+
+
+class MemoryBackend:
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.entries = LRUCache(max_size, ttl)
+        self.generations = {}
+
+    async def get(self, key: str):
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes):
+        self.entries.set(key, value)
+
+    async def get_generation(self, classroom_id: int):
+        return self.generations.get(classroom_id, 0)
+
+    async def bump_generation(self, classroom_id: int):
+        self.generations[classroom_id] = self.generations.get(classroom_id, 0) + 1
+        return self.generations[classroom_id]
+
+    def stats(self):
+        return self.entries.stats()
+
+
+class KeyValueBackend:
+    # works with any client exposing async get / set(ex=) / incr,
+    # e.g. redis.asyncio.Redis, so several replicas can share one cache
+    def __init__(
+        self, client, ttl: Optional[float] = None, prefix: str = "homework_api"
+    ):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str):
+        value = await self.client.get(f"{self.prefix}:response:{key}")
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(
+            f"{self.prefix}:response:{key}",
+            value,
+            ex=int(self.ttl) if self.ttl is not None else None,
+        )
+
+    async def get_generation(self, classroom_id: int):
+        return int(
+            await self.client.get(f"{self.prefix}:generation:{classroom_id}") or 0
+        )
+
+    async def bump_generation(self, classroom_id: int):
+        return await self.client.incr(f"{self.prefix}:generation:{classroom_id}")
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class LocalKeyValueStore:
+    # in-process stand-in for a shared key value store
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key: str):
+        value, expires_at = self.values.get(key, (None, None))
+
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.values[key]
+            return None
+
+        return value
+
+    async def set(self, key: str, value, ex: Optional[int] = None):
+        self.values[key] = (value, time.monotonic() + ex if ex is not None else None)
+
+    async def incr(self, key: str):
+        value = int(await self.get(key) or 0) + 1
+        self.values[key] = (value, None)
+        return value
+
+
+class ResponseCache:
+    def __init__(self, backend=None):
+        # no backend means caching is disabled, responses are still rendered
+        self.backend = backend
+
+    @staticmethod
+    def make_key(
+        classroom_id: int, generation: int, endpoint: str, body: Dict[str, Any]
+    ):
+        digest = utils.hash_request_body(body)
+
+        return f"{classroom_id}:{generation}:{endpoint}:{digest}"
+
+    async def lookup(self, classroom_id: int, endpoint: str, body: Dict[str, Any]):
+        if self.backend is None:
+            return None, None
+
+        generation = await self.backend.get_generation(classroom_id)
+        key = self.make_key(classroom_id, generation, endpoint, body)
+
+        cached = await self.backend.get(key)
+        if cached is None:
+            return key, None
+
+        # entries are stored as b"<response code> <etag>\n<json body>", the
+        # status is derived on the way out so the flag can change at any time
+        header, _, content = cached.partition(b"\n")
+        response_code, _, etag = header.partition(b" ")
+
+        return key, self.make_response(
+            content, etag.decode("ascii") or None, int(response_code)
+        )
+
+    async def store(
+        self, key: Optional[str], payload: Dict[str, Any], etag: Optional[str] = None
+    ):
+        content = serialize_response(payload)
+
+        if self.backend is not None and key is not None:
+            await self.backend.set(
+                key,
+                f"{payload['response_code']} {etag or ''}".encode("ascii")
+                + b"\n"
+                + content,
+            )
+
+        return self.make_response(content, etag, payload["response_code"])
+
+    @staticmethod
+    def make_response(
+        content: bytes, etag: Optional[str] = None, response_code: int = 200
+    ):
+        return serialization.json_response(
+            content,
+            serialization.http_status(response_code),
+            {"ETag": etag} if etag is not None else None,
+        )
+
+    async def invalidate(self, classroom_id: int):
+        if self.backend is not None:
+            await self.backend.bump_generation(classroom_id)
+
+    def stats(self):
+        return self.backend.stats() if self.backend is not None else {}
+
+
+def make_backend(
+    name: str = config.RESPONSE_CACHE_BACKEND, url: str = config.RESPONSE_CACHE_URL
+):
+    if name == "memory":
+        return MemoryBackend(config.RESPONSE_CACHE_SIZE, config.RESPONSE_CACHE_TTL)
+
+    if name == "local":
+        return KeyValueBackend(LocalKeyValueStore(), config.RESPONSE_CACHE_TTL)
+
+    if name == "redis":
+        # optional, pip install homework-api[redis]
+        from redis.asyncio import Redis
+
+        return KeyValueBackend(Redis.from_url(url), config.RESPONSE_CACHE_TTL)
+
+    if name == "none":
+        return None
+
+    raise ValueError(f"unknown response cache backend: {name}")
+
+
+response_cache = ResponseCache(make_backend())
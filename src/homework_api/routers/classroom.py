@@ -1,59 +1,200 @@
-import hashlib
+import asyncio
 import re
-import time
 
 from fastapi import APIRouter
 
-from homework_api import basemodels, db_operations, utils
+from homework_api import auth, basemodels, config, db_operations, serialization
 from homework_api.database import classroom_conn
 from homework_api.error_response import ErrorResponse
 
 router = APIRouter(prefix="/classroom", tags=["classroom"])
 
+# classroom name is 3-10 characters and has num/num, password is 5+ a-Z 0-9
+CLASSROOM_NAME_LENGTH = re.compile(r".{3,10}")
+CLASSROOM_NAME_FORMAT = re.compile(r"[1-6]/[0-9]+")
+CLASSROOM_PASSWORD_FORMAT = re.compile(r"[a-zA-Z0-9]{5,}")
 
-@router.post("/new")
-async def new_classroom(body: basemodels.newClassroom):
-    cleaned_body = utils.cleanse_api_body(body.model_dump())
+# a 256 bit secret never collides in practice, the retries only keep a
+# collision from becoming an error
+SECRET_ATTEMPTS = 3
 
-    # check if classroom name and password is valid (3 < len < 10 and have num/num)
-    if (
-        re.fullmatch(r".{3,10}", cleaned_body["classroom_name"]) is None
-        or re.search(r"[1-6]/[0-9]+", cleaned_body["classroom_name"]) is None
-    ):
-        return ErrorResponse.CLASSROOM_INVALID.value
 
+def check_classroom(cleaned_body):
     if (
-        re.fullmatch(r".{5,}", cleaned_body["classroom_password"]) is None
-        or re.fullmatch(r"[a-zA-Z0-9]+", cleaned_body["classroom_password"]) is None
+        CLASSROOM_NAME_LENGTH.fullmatch(cleaned_body["classroom_name"]) is None
+        or CLASSROOM_NAME_FORMAT.search(cleaned_body["classroom_name"]) is None
     ):
-        return ErrorResponse.PASSWORD_INVALID.value
+        return ErrorResponse.CLASSROOM_INVALID
+
+    if CLASSROOM_PASSWORD_FORMAT.fullmatch(cleaned_body["classroom_password"]) is None:
+        return ErrorResponse.PASSWORD_INVALID
+
+    return None
+
+
+async def create_classrooms(cleaned_bodies):
+    # hashed on the password threads, as many at once as they allow
+    encrypted_passwords = await asyncio.gather(
+        *(
+            auth.hash_password(cleaned_body["classroom_password"])
+            for cleaned_body in cleaned_bodies
+        )
+    )
+
+    classrooms = [
+        {
+            "classroom_secret": None,
+            "encrypted_password": encrypted_password,
+            "classroom_name": cleaned_body["classroom_name"],
+        }
+        for cleaned_body, encrypted_password in zip(cleaned_bodies, encrypted_passwords)
+    ]
+
+    # insert into database, drawing new secrets for any that were taken
+    pending_classrooms = classrooms
+    for _ in range(SECRET_ATTEMPTS):
+        for classroom in pending_classrooms:
+            classroom["classroom_secret"] = auth.new_classroom_secret()
+
+        classroom_ids = await db_operations.add_classrooms(
+            classroom_conn, pending_classrooms
+        )
 
-    # classroom secret (username that use to login)
-    classroom_secret = hashlib.sha256(
-        (cleaned_body["classroom_name"] + str(time.time())).encode("utf8")
-    ).hexdigest()
+        for classroom, classroom_id in zip(pending_classrooms, classroom_ids):
+            classroom["classroom_id"] = classroom_id
 
-    # classroom password
-    encrypted_password = hashlib.sha256(
-        cleaned_body["classroom_password"].encode("utf8")
-    ).hexdigest()
+        pending_classrooms = [
+            classroom
+            for classroom in pending_classrooms
+            if classroom["classroom_id"] is None
+        ]
 
-    # insert into database
-    await db_operations.add_classroom(
+        if not pending_classrooms:
+            break
+    else:
+        raise RuntimeError("could not generate a unique classroom secret")
+
+    # the first requests of a new classroom should not have to hit the database
+    for classroom in classrooms:
+        auth.cache_classroom(
+            classroom["classroom_secret"],
+            classroom["classroom_id"],
+            classroom["classroom_name"],
+            classroom["encrypted_password"],
+        )
+
+    return classrooms
+
+
+@router.post("/new", response_model=basemodels.apiResponse)
+async def new_classroom(body: basemodels.newClassroom):
+    cleaned_body = body.model_dump()
+
+    # check if classroom name and password is valid
+    classroom_error = check_classroom(cleaned_body)
+
+    if classroom_error is not None:
+        return classroom_error.response
+
+    classrooms = await create_classrooms([cleaned_body])
+
+    # _RETURN
+    return serialization.api_response(
+        {
+            "response_code": 201,
+            "response": {
+                "context": {
+                    "classroom_secret": classrooms[0]["classroom_secret"],
+                },
+                "error": None,
+                "message": "Classroom created successfully",
+            },
+        }
+    )
+
+
+@router.post("/login", response_model=basemodels.apiResponse)
+async def login_classroom(body: basemodels.loginClassroom):
+    cleaned_body = body.model_dump()
+
+    # check if classroom secret and password is correct
+    classroom_check = await auth.verify_classroom(
         classroom_conn,
-        classroom_secret,
-        encrypted_password,
-        cleaned_body["classroom_name"],
+        cleaned_body["classroom_secret"],
+        cleaned_body["classroom_password"],
     )
 
+    if classroom_check is None:
+        return ErrorResponse.SECRET_OR_PASSWORD_INVALID.response
+
+    token, expires_at = auth.issue_token(classroom_check["ClassroomID"])
+
     # _RETURN
-    return {
-        "response_code": 201,
-        "response": {
-            "context": {
-                "classroom_secret": classroom_secret,
+    return serialization.api_response(
+        {
+            "response_code": 200,
+            "response": {
+                "context": {
+                    "token": token,
+                    "expires_at": expires_at,
+                },
+                "error": None,
+                "message": "Logged in successfully",
             },
-            "error": None,
-            "message": "Classroom created successfully",
-        },
+        }
+    )
+
+
+@router.post("/new_bulk", response_model=basemodels.apiResponse)
+async def new_classrooms_bulk(body: basemodels.newClassroomsBulk):
+    cleaned_bodies = [classroom.model_dump() for classroom in body.classrooms]
+
+    if not 0 < len(cleaned_bodies) <= config.BULK_MAX_CLASSROOMS:
+        return ErrorResponse.TOO_MANY_CLASSROOMS.response
+
+    results = []
+    valid_bodies = []
+    for index, cleaned_body in enumerate(cleaned_bodies):
+        classroom_error = check_classroom(cleaned_body)
+
+        results.append(
+            {
+                "index": index,
+                "classroom_secret": None,
+                "error": classroom_error.name if classroom_error else None,
+            }
+        )
+
+        if classroom_error is None:
+            valid_bodies.append((index, cleaned_body))
+
+    # create every valid classroom in one transaction
+    if valid_bodies:
+        classrooms = await create_classrooms(
+            [cleaned_body for _, cleaned_body in valid_bodies]
+        )
+
+        for (index, _), classroom in zip(valid_bodies, classrooms):
+            results[index]["classroom_secret"] = classroom["classroom_secret"]
+
+    context = {
+        "classrooms": results,
+        "created": len(valid_bodies),
+        "failed": len(results) - len(valid_bodies),
     }
+
+    # every classroom failed, the results still say why
+    if not valid_bodies:
+        return ErrorResponse.NO_CLASSROOMS_CREATED.with_context(context)
+
+    # _RETURN
+    return serialization.api_response(
+        {
+            "response_code": 201,
+            "response": {
+                "context": context,
+                "error": None,
+                "message": "Classrooms created successfully",
+            },
+        }
+    )
@@ -1,20 +1,136 @@
-import hashlib
+import asyncio
+import csv
+import io
 import math
+import secrets
 import time
-from collections import Counter
+from typing import Union
 
-from fastapi import APIRouter
+from fastapi import APIRouter, File, Form, Header, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
 
-from homework_api import basemodels, db_operations, utils
+from homework_api import (
+    auth,
+    basemodels,
+    config,
+    db_operations,
+    importer,
+    serialization,
+    utils,
+)
+from homework_api.batcher import homework_batcher
 from homework_api.database import classroom_conn
 from homework_api.error_response import ErrorResponse
+from homework_api.response_cache import response_cache
 
 router = APIRouter(prefix="/homework", tags=["homework"])
 
 
-@router.post("/add")
-async def add_homework(body: basemodels.addHomework):
-    cleaned_body = utils.cleanse_api_body(body.model_dump())
+async def authenticate(cleaned_body, authorization, with_password):
+    # a session token is checked by its signature alone, the body credentials
+    # stay as the fallback for clients without one
+    token = auth.get_bearer_token(authorization) or cleaned_body["token"]
+
+    if token is not None:
+        return auth.verify_token(token), ErrorResponse.TOKEN_INVALID
+
+    if with_password:
+        classroom_check = await auth.verify_classroom(
+            classroom_conn,
+            cleaned_body["classroom_secret"],
+            cleaned_body["classroom_password"],
+        )
+
+        return classroom_check, ErrorResponse.SECRET_OR_PASSWORD_INVALID
+
+    classroom_check = await auth.get_classroom(
+        classroom_conn, cleaned_body["classroom_secret"]
+    )
+
+    return classroom_check, ErrorResponse.SECRET_INVALID
+
+
+async def get_etag(classroom_id, endpoint, cleaned_body, rows=()):
+    # read queries carry the classroom version on every row, only an empty
+    # result (or a conditional request, before any rows) needs to ask for it
+    if rows:
+        version = rows[0]["Version"]
+    else:
+        classroom_version = await db_operations.get_classroom_version(
+            classroom_conn, classroom_id
+        )
+        version = classroom_version["Version"]
+
+    return utils.make_etag(classroom_id, version, endpoint, cleaned_body)
+
+
+def format_homework(homework):
+    return dict(
+        zip(db_operations.HOMEWORK_FIELDS, db_operations.homework_values(homework))
+    )
+
+
+EXPORT_FIELDS = list(db_operations.HOMEWORK_FIELDS)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def stream_homeworks(classroom_id, cleaned_body, export_format):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+
+    if export_format == "csv":
+        writer.writeheader()
+
+    # walk the whole filtered list newest first, one keyset chunk at a time,
+    # so only a single chunk is ever held in memory
+    before_homework_id = None
+    while True:
+        homeworks = await db_operations.get_homeworks(
+            classroom_conn,
+            classroom_id,
+            db_operations.getHomeworksCriteria(
+                count=config.EXPORT_CHUNK_SIZE,
+                offset=0,
+                assigned_before_date=cleaned_body["assigned_before_date"],
+                assigned_after_date=cleaned_body["assigned_after_date"],
+                due_before_date=cleaned_body["due_before_date"],
+                due_after_date=cleaned_body["due_after_date"],
+                before_homework_id=before_homework_id,
+            ),
+        )
+
+        for homework in homeworks:
+            if export_format == "csv":
+                writer.writerow(format_homework(homework))
+            else:
+                buffer.write(
+                    serialization.dumps(format_homework(homework)).decode("utf-8")
+                )
+                buffer.write("\n")
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+            buffer.seek(0)
+            buffer.truncate()
+
+        if len(homeworks) < config.EXPORT_CHUNK_SIZE:
+            break
+
+        before_homework_id = homeworks[-1]["HomeworkID"]
+
+
+@router.post("/add", response_model=basemodels.apiResponse)
+async def add_homework(
+    body: basemodels.addHomework, authorization: Union[str, None] = Header(None)
+):
+    cleaned_body = body.model_dump()
 
     cleaned_body["description"] = cleaned_body["description"] or ""
 
@@ -25,19 +141,15 @@ async def add_homework(body: basemodels.addHomework):
     if not utils.check_valid_dates(
         [cleaned_body["assigned_date"], cleaned_body["due_date"]]
     ):
-        return ErrorResponse.DATE_INVALID.value
-
-    encrypted_password = hashlib.sha256(
-        cleaned_body["classroom_password"].encode("utf8")
-    ).hexdigest()
+        return ErrorResponse.DATE_INVALID.response
 
-    # check if classroom secret and password is correct
-    classroom_check = await db_operations.get_classroom_password(
-        classroom_conn, cleaned_body["classroom_secret"], encrypted_password
+    # check if the session token or classroom secret and password is correct
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=True
     )
 
     if classroom_check is None:
-        return ErrorResponse.SECRET_OR_PASSWORD_INVALID.value
+        return auth_error.response
 
     classroom_id = classroom_check["ClassroomID"]
 
@@ -47,87 +159,553 @@ async def add_homework(body: basemodels.addHomework):
         )
 
         if teacher_check is None:
-            return ErrorResponse.NO_TEACHER.value
+            return ErrorResponse.NO_TEACHER.response
 
         cleaned_body["teacher"] = teacher_check["Teacher"]
 
-    # insert into database
-    homework_id = await db_operations.add_homework(
-        classroom_conn,
-        classroom_id,
-        cleaned_body["subject"],
-        cleaned_body["teacher"],
-        cleaned_body["title"],
-        cleaned_body["description"],
-        cleaned_body["assigned_date"],
-        cleaned_body["due_date"],
-    )
+    # insert into database, together with other requests when batching is on
+    if homework_batcher.enabled:
+        try:
+            homework_id = await homework_batcher.add(
+                classroom_id,
+                {
+                    "subject": cleaned_body["subject"],
+                    "teacher": cleaned_body["teacher"],
+                    "title": cleaned_body["title"],
+                    "description": cleaned_body["description"],
+                    "assigned_date": cleaned_body["assigned_date"],
+                    "due_date": cleaned_body["due_date"],
+                },
+            )
+        except asyncio.QueueFull:
+            return ErrorResponse.SERVER_BUSY.response
+    else:
+        homework_id = await db_operations.add_homework(
+            classroom_conn,
+            classroom_id,
+            cleaned_body["subject"],
+            cleaned_body["teacher"],
+            cleaned_body["title"],
+            cleaned_body["description"],
+            cleaned_body["assigned_date"],
+            cleaned_body["due_date"],
+        )
+
+    await response_cache.invalidate(classroom_id)
 
     # _RETURN
-    return {
-        "response_code": 201,
-        "response": {
-            "context": {
-                "homework_id": homework_id,
+    return serialization.api_response(
+        {
+            "response_code": 201,
+            "response": {
+                "context": {
+                    "homework_id": homework_id,
+                },
+                "error": None,
+                "message": "Homework created successfully",
             },
-            "error": None,
-            "message": "Homework created successfully",
-        },
+        }
+    )
+
+
+async def fill_teachers(classroom_id, homeworks, latest_teachers):
+    # missing teachers come from earlier homeworks first, then from the
+    # latest homework of the subject, fetched for all subjects at once.
+    # homeworks whose teacher cannot be found are left with None
+    missing_subjects = {
+        homework["subject"]
+        for homework in homeworks
+        if homework["teacher"] is None and homework["subject"] not in latest_teachers
+    }
+
+    if missing_subjects:
+        teacher_checks = await db_operations.get_teachers(
+            classroom_conn, classroom_id, sorted(missing_subjects)
+        )
+        latest_teachers.update(
+            {
+                teacher_check["Subject"]: teacher_check["Teacher"]
+                for teacher_check in teacher_checks
+            }
+        )
+
+    for homework in homeworks:
+        if homework["teacher"] is None:
+            homework["teacher"] = latest_teachers.get(homework["subject"])
+
+        if homework["teacher"] is not None:
+            latest_teachers[homework["subject"]] = homework["teacher"]
+
+
+@router.post("/add_bulk", response_model=basemodels.apiResponse)
+async def add_homeworks_bulk(
+    body: basemodels.addHomeworksBulk, authorization: Union[str, None] = Header(None)
+):
+    cleaned_body = body.model_dump(exclude={"homeworks"})
+
+    if not 0 < len(body.homeworks) <= config.BULK_MAX_HOMEWORKS:
+        return ErrorResponse.TOO_MANY_HOMEWORKS.response
+
+    # authenticate once for the whole batch
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=True
+    )
+
+    if classroom_check is None:
+        return auth_error.response
+
+    classroom_id = classroom_check["ClassroomID"]
+
+    today = time.strftime("%Y-%m-%d")
+
+    results = []
+    valid_homeworks = []
+    for index, homework in enumerate(body.homeworks):
+        cleaned_homework = homework.model_dump()
+
+        cleaned_homework["description"] = cleaned_homework["description"] or ""
+        cleaned_homework["assigned_date"] = cleaned_homework["assigned_date"] or today
+
+        results.append({"index": index, "homework_id": None, "error": None})
+
+        if not utils.check_valid_dates(
+            [cleaned_homework["assigned_date"], cleaned_homework["due_date"]]
+        ):
+            results[index]["error"] = ErrorResponse.DATE_INVALID.name
+            continue
+
+        valid_homeworks.append((index, cleaned_homework))
+
+    await fill_teachers(classroom_id, [homework for _, homework in valid_homeworks], {})
+
+    insert_indexes = []
+    insert_homeworks = []
+    for index, homework in valid_homeworks:
+        if homework["teacher"] is None:
+            results[index]["error"] = ErrorResponse.NO_TEACHER.name
+            continue
+
+        insert_indexes.append(index)
+        insert_homeworks.append(homework)
+
+    # insert every valid homework in one transaction
+    if insert_homeworks:
+        homework_ids = await db_operations.add_homeworks(
+            classroom_conn, classroom_id, insert_homeworks
+        )
+
+        for index, homework_id in zip(insert_indexes, homework_ids):
+            results[index]["homework_id"] = homework_id
+
+        await response_cache.invalidate(classroom_id)
+
+    context = {
+        "homeworks": results,
+        "created": len(insert_homeworks),
+        "failed": len(results) - len(insert_homeworks),
     }
 
+    # every row failed, the results still say why
+    if not insert_homeworks:
+        return ErrorResponse.NO_HOMEWORKS_CREATED.with_context(context)
+
+    # _RETURN
+    return serialization.api_response(
+        {
+            "response_code": 201,
+            "response": {
+                "context": context,
+                "error": None,
+                "message": "Homeworks created successfully",
+            },
+        }
+    )
+
+
+@router.post("/import", response_model=basemodels.apiResponse)
+async def import_homeworks(
+    file: UploadFile = File(),
+    classroom_secret: Union[str, None] = Form(None),
+    classroom_password: Union[str, None] = Form(None),
+    token: Union[str, None] = Form(None),
+    format: Union[str, None] = Form(None),
+    authorization: Union[str, None] = Header(None),
+):
+    cleaned_body = utils.cleanse_api_body(
+        {
+            "classroom_secret": classroom_secret,
+            "classroom_password": classroom_password,
+            "token": token,
+            "format": format,
+        }
+    )
+
+    import_format = importer.detect_format(cleaned_body["format"], file.filename)
+
+    if import_format is None:
+        return ErrorResponse.IMPORT_FORMAT_INVALID.response
+
+    # authenticate once for the whole file
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=True
+    )
+
+    if classroom_check is None:
+        return auth_error.response
+
+    classroom_id = classroom_check["ClassroomID"]
+
+    today = time.strftime("%Y-%m-%d")
+
+    records = importer.iter_records(file.file, import_format)
+    report = importer.ImportReport()
+    latest_teachers = {}
+    created = 0
+
+    # a chunk that fails leaves the ones before it committed, cached reads
+    # are dropped as soon as anything was written, whatever happens next
+    try:
+        # parse and insert one chunk at a time, each chunk in its own transaction
+        while True:
+            chunk = await run_in_threadpool(
+                importer.read_chunk, records, config.IMPORT_CHUNK_SIZE
+            )
+
+            if not chunk:
+                break
+
+            valid_homeworks = []
+            for row_number, record, error in chunk:
+                if error is not None:
+                    report.add(row_number, error)
+                    continue
+
+                try:
+                    homework = basemodels.bulkHomework.model_validate(record)
+                except ValidationError:
+                    report.add(row_number, ErrorResponse.ROW_INVALID.name)
+                    continue
+
+                cleaned_homework = homework.model_dump()
+
+                cleaned_homework["description"] = cleaned_homework["description"] or ""
+                cleaned_homework["assigned_date"] = (
+                    cleaned_homework["assigned_date"] or today
+                )
+
+                if not utils.check_valid_dates(
+                    [cleaned_homework["assigned_date"], cleaned_homework["due_date"]]
+                ):
+                    report.add(row_number, ErrorResponse.DATE_INVALID.name)
+                    continue
+
+                valid_homeworks.append((row_number, cleaned_homework))
+
+            await fill_teachers(
+                classroom_id,
+                [homework for _, homework in valid_homeworks],
+                latest_teachers,
+            )
+
+            insert_homeworks = []
+            for row_number, homework in valid_homeworks:
+                if homework["teacher"] is None:
+                    report.add(row_number, ErrorResponse.NO_TEACHER.name)
+                    continue
+
+                insert_homeworks.append(homework)
+
+            if insert_homeworks:
+                await db_operations.add_homeworks(
+                    classroom_conn, classroom_id, insert_homeworks
+                )
+
+                created += len(insert_homeworks)
+    finally:
+        if created:
+            await response_cache.invalidate(classroom_id)
+
+    # failed rows can be downloaded from /homework/import/report
+    report_token = None
+    if report.failed:
+        report_token = secrets.token_urlsafe(16)
+        importer.import_reports.set(report_token, (classroom_id, report))
+
+    # _RETURN
+    return serialization.api_response(
+        {
+            "response_code": 201,
+            "response": {
+                "context": {
+                    "created": created,
+                    "failed": report.failed,
+                    "report_token": report_token,
+                },
+                "error": None,
+                "message": "Homeworks imported successfully",
+            },
+        }
+    )
+
+
+@router.post("/import/report")
+async def import_report(
+    body: basemodels.importReport, authorization: Union[str, None] = Header(None)
+):
+    cleaned_body = body.model_dump()
+
+    # check if the session token or classroom secret and password is correct
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=True
+    )
+
+    if classroom_check is None:
+        return auth_error.response
 
-@router.post("/remove")
-async def remove_homework(body: basemodels.removeHomework):
-    cleaned_body = utils.cleanse_api_body(body.model_dump())
+    stored_report = importer.import_reports.get(cleaned_body["report_token"])
 
-    encrypted_password = hashlib.sha256(
-        cleaned_body["classroom_password"].encode("utf8")
-    ).hexdigest()
+    # reports of other classrooms look exactly like expired ones
+    if stored_report is None or stored_report[0] != classroom_check["ClassroomID"]:
+        return ErrorResponse.REPORT_NOT_FOUND.response
 
-    # check if classroom secret and password is correct
-    classroom_check = await db_operations.get_classroom_password(
-        classroom_conn, cleaned_body["classroom_secret"], encrypted_password
+    # _RETURN
+    return StreamingResponse(
+        stored_report[1].iter_chunks(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="import_report.csv"'},
+    )
+
+
+@router.post("/remove", response_model=basemodels.apiResponse)
+async def remove_homework(
+    body: basemodels.removeHomework, authorization: Union[str, None] = Header(None)
+):
+    cleaned_body = body.model_dump()
+
+    # check if the session token or classroom secret and password is correct
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=True
     )
 
     if classroom_check is None:
-        return ErrorResponse.SECRET_OR_PASSWORD_INVALID.value
+        return auth_error.response
 
     classroom_id = classroom_check["ClassroomID"]
 
     # check if homework exists
-    homework_check = await db_operations.get_homework(
-        classroom_conn, classroom_id, cleaned_body["homework_id"]
+    homework_check = (
+        await db_operations.get_homework(
+            classroom_conn, classroom_id, cleaned_body["homework_id"]
+        )
+        if utils.is_valid_id(cleaned_body["homework_id"])
+        else None
     )
 
     if homework_check is None:
-        return ErrorResponse.HOMEWORK_NOT_FOUND.value
+        return ErrorResponse.HOMEWORK_NOT_FOUND.response
 
     await db_operations.remove_homework(
         classroom_conn, classroom_id, cleaned_body["homework_id"]
     )
 
+    await response_cache.invalidate(classroom_id)
+
     # _RETURN
-    return {
-        "response_code": 200,
-        "response": {
-            "context": {
-                "deleted_homework_id": cleaned_body["homework_id"],
+    return serialization.api_response(
+        {
+            "response_code": 200,
+            "response": {
+                "context": {
+                    "deleted_homework_id": cleaned_body["homework_id"],
+                },
+                "error": None,
+                "message": "Homework deleted successfully",
             },
-            "error": None,
-            "message": "Homework deleted successfully",
-        },
+        }
+    )
+
+
+@router.post("/remove_bulk", response_model=basemodels.apiResponse)
+async def remove_homeworks_bulk(
+    body: basemodels.removeHomeworksBulk, authorization: Union[str, None] = Header(None)
+):
+    cleaned_body = body.model_dump()
+
+    # ids that cannot exist are reported as not found without querying them
+    criteria = db_operations.homeworksFilter(
+        homework_ids=[
+            homework_id
+            for homework_id in cleaned_body["homework_ids"]
+            if utils.is_valid_id(homework_id)
+        ]
+        if cleaned_body["homework_ids"] is not None
+        else None,
+        subject=cleaned_body["subject"],
+        assigned_before_date=cleaned_body["assigned_before_date"],
+        assigned_after_date=cleaned_body["assigned_after_date"],
+        due_before_date=cleaned_body["due_before_date"],
+        due_after_date=cleaned_body["due_after_date"],
+    )
+
+    # never delete a whole classroom by accident
+    if all(value is None for value in criteria.__dict__.values()):
+        return ErrorResponse.FILTER_REQUIRED.response
+
+    if (
+        cleaned_body["homework_ids"] is not None
+        and len(cleaned_body["homework_ids"]) > config.BULK_MAX_HOMEWORKS
+    ):
+        return ErrorResponse.TOO_MANY_HOMEWORKS.response
+
+    if not utils.check_valid_dates(
+        [
+            criteria.assigned_before_date,
+            criteria.assigned_after_date,
+            criteria.due_before_date,
+            criteria.due_after_date,
+        ]
+    ):
+        return ErrorResponse.DATE_INVALID.response
+
+    # check if the session token or classroom secret and password is correct
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=True
+    )
+
+    if classroom_check is None:
+        return auth_error.response
+
+    classroom_id = classroom_check["ClassroomID"]
+
+    deleted_homework_ids = await db_operations.remove_homeworks(
+        classroom_conn, classroom_id, criteria
+    )
+
+    if deleted_homework_ids:
+        await response_cache.invalidate(classroom_id)
+
+    # requested ids that did not exist in this classroom
+    not_found_homework_ids = sorted(
+        set(cleaned_body["homework_ids"] or []) - set(deleted_homework_ids)
+    )
+
+    # _RETURN
+    return serialization.api_response(
+        {
+            "response_code": 200,
+            "response": {
+                "context": {
+                    "deleted_homework_ids": deleted_homework_ids,
+                    "not_found_homework_ids": not_found_homework_ids,
+                },
+                "error": None,
+                "message": "Homeworks deleted successfully",
+            },
+        }
+    )
+
+
+@router.post("/update_bulk", response_model=basemodels.apiResponse)
+async def update_homeworks_bulk(
+    body: basemodels.updateHomeworksBulk, authorization: Union[str, None] = Header(None)
+):
+    cleaned_body = body.model_dump()
+
+    # ids that cannot exist are reported as not found without querying them
+    criteria = db_operations.homeworksFilter(
+        homework_ids=[
+            homework_id
+            for homework_id in cleaned_body["homework_ids"]
+            if utils.is_valid_id(homework_id)
+        ]
+        if cleaned_body["homework_ids"] is not None
+        else None,
+        subject=cleaned_body["subject"],
+        assigned_before_date=cleaned_body["assigned_before_date"],
+        assigned_after_date=cleaned_body["assigned_after_date"],
+        due_before_date=cleaned_body["due_before_date"],
+        due_after_date=cleaned_body["due_after_date"],
+    )
+
+    if all(value is None for value in criteria.__dict__.values()):
+        return ErrorResponse.FILTER_REQUIRED.response
+
+    if (
+        cleaned_body["homework_ids"] is not None
+        and len(cleaned_body["homework_ids"]) > config.BULK_MAX_HOMEWORKS
+    ):
+        return ErrorResponse.TOO_MANY_HOMEWORKS.response
+
+    changes = {
+        column: cleaned_body[field]
+        for column, field in [
+            ("Subject", "new_subject"),
+            ("Teacher", "new_teacher"),
+            ("DueDate", "new_due_date"),
+        ]
+        if cleaned_body[field] is not None
     }
 
+    if not changes:
+        return ErrorResponse.NO_CHANGES.response
+
+    if not utils.check_valid_dates(
+        [
+            criteria.assigned_before_date,
+            criteria.assigned_after_date,
+            criteria.due_before_date,
+            criteria.due_after_date,
+            cleaned_body["new_due_date"],
+        ]
+    ):
+        return ErrorResponse.DATE_INVALID.response
+
+    # check if the session token or classroom secret and password is correct
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=True
+    )
+
+    if classroom_check is None:
+        return auth_error.response
+
+    classroom_id = classroom_check["ClassroomID"]
+
+    updated_homework_ids = await db_operations.update_homeworks(
+        classroom_conn, classroom_id, criteria, changes
+    )
+
+    if updated_homework_ids:
+        await response_cache.invalidate(classroom_id)
+
+    # _RETURN
+    return serialization.api_response(
+        {
+            "response_code": 200,
+            "response": {
+                "context": {
+                    "updated_homework_ids": updated_homework_ids,
+                },
+                "error": None,
+                "message": "Homeworks updated successfully",
+            },
+        }
+    )
+
 
-@router.post("/list")
-async def list_homeworks(body: basemodels.listHomeworks):
-    cleaned_body = utils.cleanse_api_body(body.model_dump())
+@router.post("/list", response_model=basemodels.apiResponse)
+async def list_homeworks(
+    body: basemodels.listHomeworks,
+    if_none_match: Union[str, None] = Header(None),
+    authorization: Union[str, None] = Header(None),
+):
+    cleaned_body = body.model_dump()
 
     cleaned_body["count"] = cleaned_body["count"] or 10
     cleaned_body["page"] = cleaned_body["page"] or 1
+    cleaned_body["include_total"] = cleaned_body["include_total"] is not False
 
     if cleaned_body["count"] > 50:
-        return ErrorResponse.TOO_MUCH_COUNT.value
+        return ErrorResponse.TOO_MUCH_COUNT.response
 
     # Check if assigned_date and due_date is in the correct format
     if not utils.check_valid_dates(
@@ -138,50 +716,191 @@ async def list_homeworks(body: basemodels.listHomeworks):
             cleaned_body["due_after_date"],
         ]
     ):
-        return ErrorResponse.DATE_INVALID.value
+        return ErrorResponse.DATE_INVALID.response
 
-    # check if classroom secret is correct
-    classroom_check = await db_operations.get_classroom_no_password(
-        classroom_conn, cleaned_body["classroom_secret"]
+    # cursors are only valid for the filters they were issued with
+    filter_hash = utils.make_filter_hash(
+        {
+            "assigned_before_date": cleaned_body["assigned_before_date"],
+            "assigned_after_date": cleaned_body["assigned_after_date"],
+            "due_before_date": cleaned_body["due_before_date"],
+            "due_after_date": cleaned_body["due_after_date"],
+        }
+    )
+
+    before_homework_id = None
+    if cleaned_body["cursor"] is not None:
+        decoded_cursor = utils.decode_cursor(cleaned_body["cursor"])
+
+        if decoded_cursor is None or decoded_cursor[1] != filter_hash:
+            return ErrorResponse.CURSOR_INVALID.response
+
+        before_homework_id = decoded_cursor[0]
+
+    # check if the session token or classroom secret is correct
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=False
     )
 
     if classroom_check is None:
-        return ErrorResponse.SECRET_INVALID.value
+        return auth_error.response
 
     classroom_id = classroom_check["ClassroomID"]
 
-    # get homeworks
+    # conditional requests only need the classroom version, not the homeworks
+    etag = None
+    if if_none_match is not None:
+        etag = await get_etag(classroom_id, "list", cleaned_body)
+
+        if utils.etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    # serve repeated reads without touching the database
+    cache_key, cached_response = await response_cache.lookup(
+        classroom_id, "list", cleaned_body
+    )
+
+    if cached_response is not None:
+        return cached_response
+
+    # get homeworks, by cursor (seek) or by page (offset)
     homeworks = await db_operations.get_homeworks(
         classroom_conn,
         classroom_id,
         db_operations.getHomeworksCriteria(
             count=cleaned_body["count"],
-            offset=(cleaned_body["page"] - 1) * cleaned_body["count"],
+            offset=0
+            if before_homework_id is not None
+            else (cleaned_body["page"] - 1) * cleaned_body["count"],
             assigned_before_date=cleaned_body["assigned_before_date"],
             assigned_after_date=cleaned_body["assigned_after_date"],
             due_before_date=cleaned_body["due_before_date"],
             due_after_date=cleaned_body["due_after_date"],
+            before_homework_id=before_homework_id,
+            include_total=cleaned_body["include_total"],
         ),
     )
 
-    homeworks_formatted = [
+    etag = etag or await get_etag(classroom_id, "list", cleaned_body, homeworks)
+
+    homeworks_formatted = [format_homework(homework) for homework in homeworks]
+
+    # the total rides along on every row, only query it separately when
+    # the page is empty and we cannot tell "no rows" from "past the end"
+    max_page = None
+    if cleaned_body["include_total"]:
+        if homeworks:
+            homework_count = homeworks[0]["TotalCount"]
+        elif before_homework_id is None and cleaned_body["page"] == 1:
+            homework_count = 0
+        else:
+            homework_count_check = await db_operations.get_homeworks_count(
+                classroom_conn,
+                classroom_id,
+                db_operations.getHomeworksCountCriteria(
+                    assigned_before_date=cleaned_body["assigned_before_date"],
+                    assigned_after_date=cleaned_body["assigned_after_date"],
+                    due_before_date=cleaned_body["due_before_date"],
+                    due_after_date=cleaned_body["due_after_date"],
+                ),
+            )
+            homework_count = homework_count_check["HomeworkCount"]
+
+        max_page = math.ceil(homework_count / cleaned_body["count"])
+
+    # a full page means there may be more rows after it
+    next_cursor = (
+        utils.encode_cursor(homeworks[-1]["HomeworkID"], filter_hash)
+        if len(homeworks) == cleaned_body["count"]
+        else None
+    )
+
+    # _RETURN
+    return await response_cache.store(
+        cache_key,
         {
-            "homework_id": homework["HomeworkID"],
-            "subject": homework["Subject"],
-            "teacher": homework["Teacher"],
-            "title": homework["Title"],
-            "description": homework["Description"],
-            "assigned_date": homework["AssignedDate"],
-            "due_date": homework["DueDate"],
-        }
-        for homework in homeworks
-    ]
+            "response_code": 200,
+            "response": {
+                "context": {
+                    "homeworks": homeworks_formatted,
+                    "page": cleaned_body["page"]
+                    if before_homework_id is None
+                    else None,
+                    "max_page": max_page,
+                    "next_cursor": next_cursor,
+                },
+                "error": None,
+                "message": "Homeworks retrieved successfully",
+            },
+        },
+        etag,
+    )
+
+
+@router.post("/search", response_model=basemodels.apiResponse)
+async def search_homeworks(
+    body: basemodels.searchHomeworks,
+    if_none_match: Union[str, None] = Header(None),
+    authorization: Union[str, None] = Header(None),
+):
+    cleaned_body = body.model_dump()
+
+    cleaned_body["count"] = cleaned_body["count"] or 10
+    cleaned_body["page"] = cleaned_body["page"] or 1
+
+    # a negative count would reach the query as LIMIT -1, which sqlite takes
+    # as no limit at all, and a negative page as a negative offset
+    if not 0 < cleaned_body["count"] <= 50 or cleaned_body["page"] < 1:
+        return ErrorResponse.TOO_MUCH_COUNT.response
+
+    if not cleaned_body["query"].strip():
+        return ErrorResponse.QUERY_INVALID.response
+
+    # Check if assigned_date and due_date is in the correct format
+    if not utils.check_valid_dates(
+        [
+            cleaned_body["assigned_before_date"],
+            cleaned_body["assigned_after_date"],
+            cleaned_body["due_before_date"],
+            cleaned_body["due_after_date"],
+        ]
+    ):
+        return ErrorResponse.DATE_INVALID.response
+
+    # check if the session token or classroom secret is correct
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=False
+    )
+
+    if classroom_check is None:
+        return auth_error.response
+
+    classroom_id = classroom_check["ClassroomID"]
+
+    # conditional requests only need the classroom version, not the homeworks
+    etag = None
+    if if_none_match is not None:
+        etag = await get_etag(classroom_id, "search", cleaned_body)
+
+        if utils.etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    # serve repeated reads without touching the database
+    cache_key, cached_response = await response_cache.lookup(
+        classroom_id, "search", cleaned_body
+    )
+
+    if cached_response is not None:
+        return cached_response
 
-    # get count of homeworks
-    homework_count = await db_operations.get_homeworks_count(
+    # best matches first
+    homeworks = await db_operations.search_homeworks(
         classroom_conn,
         classroom_id,
-        db_operations.getHomeworksCountCriteria(
+        db_operations.searchHomeworksCriteria(
+            query=cleaned_body["query"],
+            count=cleaned_body["count"],
+            offset=(cleaned_body["page"] - 1) * cleaned_body["count"],
             assigned_before_date=cleaned_body["assigned_before_date"],
             assigned_after_date=cleaned_body["assigned_after_date"],
             due_before_date=cleaned_body["due_before_date"],
@@ -189,99 +908,217 @@ async def list_homeworks(body: basemodels.listHomeworks):
         ),
     )
 
-    max_page = math.ceil(homework_count["COUNT(HomeworkID)"] / cleaned_body["count"])
+    etag = etag or await get_etag(classroom_id, "search", cleaned_body, homeworks)
+
+    homeworks_formatted = [format_homework(homework) for homework in homeworks]
 
     # _RETURN
-    return {
-        "response_code": 200,
-        "response": {
-            "context": {
-                "homeworks": homeworks_formatted,
-                "page": cleaned_body["page"],
-                "max_page": max_page,
+    return await response_cache.store(
+        cache_key,
+        {
+            "response_code": 200,
+            "response": {
+                "context": {
+                    "homeworks": homeworks_formatted,
+                    "page": cleaned_body["page"],
+                },
+                "error": None,
+                "message": "Homeworks retrieved successfully",
             },
-            "error": None,
-            "message": "Homeworks retrieved successfully",
         },
-    }
+        etag,
+    )
 
 
-@router.post("/get")
-async def get_homework(body: basemodels.getHomework):
-    cleaned_body = utils.cleanse_api_body(body.model_dump())
+@router.post("/export")
+async def export_homeworks(
+    body: basemodels.exportHomeworks, authorization: Union[str, None] = Header(None)
+):
+    cleaned_body = body.model_dump()
 
-    classroom_check = await db_operations.get_classroom_no_password(
-        classroom_conn, cleaned_body["classroom_secret"]
+    cleaned_body["format"] = cleaned_body["format"] or "ndjson"
+
+    if cleaned_body["format"] not in EXPORT_MEDIA_TYPES:
+        return ErrorResponse.EXPORT_FORMAT_INVALID.response
+
+    # Check if assigned_date and due_date is in the correct format
+    if not utils.check_valid_dates(
+        [
+            cleaned_body["assigned_before_date"],
+            cleaned_body["assigned_after_date"],
+            cleaned_body["due_before_date"],
+            cleaned_body["due_after_date"],
+        ]
+    ):
+        return ErrorResponse.DATE_INVALID.response
+
+    # check if the session token or classroom secret is correct
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=False
     )
 
     if classroom_check is None:
-        return ErrorResponse.SECRET_INVALID.value
+        return auth_error.response
 
     classroom_id = classroom_check["ClassroomID"]
 
-    homework = await db_operations.get_homework(
-        classroom_conn, classroom_id, cleaned_body["homework_id"]
+    # _RETURN
+    return StreamingResponse(
+        stream_homeworks(classroom_id, cleaned_body, cleaned_body["format"]),
+        media_type=EXPORT_MEDIA_TYPES[cleaned_body["format"]],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="homeworks.{cleaned_body["format"]}"'
+            )
+        },
+    )
+
+
+@router.post("/get", response_model=basemodels.apiResponse)
+async def get_homework(
+    body: basemodels.getHomework,
+    if_none_match: Union[str, None] = Header(None),
+    authorization: Union[str, None] = Header(None),
+):
+    cleaned_body = body.model_dump()
+
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=False
+    )
+
+    if classroom_check is None:
+        return auth_error.response
+
+    classroom_id = classroom_check["ClassroomID"]
+
+    # conditional requests only need the classroom version, not the homeworks
+    etag = None
+    if if_none_match is not None:
+        etag = await get_etag(classroom_id, "get", cleaned_body)
+
+        if utils.etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    # serve repeated reads without touching the database
+    cache_key, cached_response = await response_cache.lookup(
+        classroom_id, "get", cleaned_body
+    )
+
+    if cached_response is not None:
+        return cached_response
+
+    # homework ids are integers on every backend, anything else cannot match
+    homework_id = utils.parse_homework_id(cleaned_body["homework_id"])
+    homework = (
+        await db_operations.get_homework(classroom_conn, classroom_id, homework_id)
+        if homework_id is not None
+        else None
+    )
+
+    etag = etag or await get_etag(
+        classroom_id, "get", cleaned_body, [homework] if homework else ()
     )
 
     if homework is None:
-        return ErrorResponse.HOMEWORK_NOT_FOUND.value
-
-    return {
-        "response_code": 200,
-        "response": {
-            "context": {
-                "homework_id": homework["HomeworkID"],
-                "subject": homework["Subject"],
-                "teacher": homework["Teacher"],
-                "title": homework["Title"],
-                "description": homework["Description"],
-                "assigned_date": homework["AssignedDate"],
-                "due_date": homework["DueDate"],
+        return await response_cache.store(
+            cache_key, ErrorResponse.HOMEWORK_NOT_FOUND.value, etag
+        )
+
+    return await response_cache.store(
+        cache_key,
+        {
+            "response_code": 200,
+            "response": {
+                "context": format_homework(homework),
+                "error": None,
+                "message": "Homework retrieved successfully",
             },
-            "error": None,
-            "message": "Homework retrieved successfully",
         },
-    }
+        etag,
+    )
 
 
-@router.post("/statistics")
-async def statistics_homework(body: basemodels.statisticsHomework):
-    cleaned_body = utils.cleanse_api_body(body.model_dump())
+@router.post("/statistics", response_model=basemodels.apiResponse)
+async def statistics_homework(
+    body: basemodels.statisticsHomework,
+    if_none_match: Union[str, None] = Header(None),
+    authorization: Union[str, None] = Header(None),
+):
+    cleaned_body = body.model_dump()
 
     if not utils.check_valid_dates(
         [cleaned_body["assigned_before_date"], cleaned_body["assigned_after_date"]]
     ):
-        return ErrorResponse.DATE_INVALID.value
+        return ErrorResponse.DATE_INVALID.response
 
-    classroom_check = await db_operations.get_classroom_no_password(
-        classroom_conn, cleaned_body["classroom_secret"]
+    cleaned_body["bucket"] = cleaned_body["bucket"] or "day"
+
+    if cleaned_body["bucket"] not in ("day", "week", "month") or cleaned_body[
+        "group_by"
+    ] not in (None, "subject", "teacher"):
+        return ErrorResponse.STATISTICS_INVALID.response
+
+    classroom_check, auth_error = await authenticate(
+        cleaned_body, authorization, with_password=False
     )
 
     if classroom_check is None:
-        return ErrorResponse.SECRET_INVALID.value
+        return auth_error.response
 
     classroom_id = classroom_check["ClassroomID"]
 
-    assigned_dates = await db_operations.get_statistics(
+    # conditional requests only need the classroom version, not the homeworks
+    etag = None
+    if if_none_match is not None:
+        etag = await get_etag(classroom_id, "statistics", cleaned_body)
+
+        if utils.etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    # serve repeated reads without touching the database
+    cache_key, cached_response = await response_cache.lookup(
+        classroom_id, "statistics", cleaned_body
+    )
+
+    if cached_response is not None:
+        return cached_response
+
+    # counting happens in sql, only one row per bucket (and group) comes back
+    statistics = await db_operations.get_statistics(
         classroom_conn,
         classroom_id,
         cleaned_body["assigned_before_date"],
         cleaned_body["assigned_after_date"],
         cleaned_body["subject"],
+        cleaned_body["bucket"],
+        cleaned_body["group_by"],
     )
 
-    if assigned_dates is None:
-        return ErrorResponse.NO_STATISTICS.value
+    if statistics is None:
+        return ErrorResponse.NO_STATISTICS.response
 
-    formatted_dates = [date["AssignedDate"] for date in assigned_dates]
+    etag = etag or await get_etag(classroom_id, "statistics", cleaned_body, statistics)
 
-    print(dict(Counter(formatted_dates)))
+    if cleaned_body["group_by"] is None:
+        formatted_statistics = {
+            statistic["Bucket"]: statistic["HomeworkCount"] for statistic in statistics
+        }
+    else:
+        formatted_statistics = {}
+        for statistic in statistics:
+            formatted_statistics.setdefault(statistic["Bucket"], {})[
+                statistic["Group"]
+            ] = statistic["HomeworkCount"]
 
-    return {
-        "response_code": 200,
-        "response": {
-            "context": dict(Counter(formatted_dates)),
-            "error": None,
-            "message": "Statistics retrieved successfully",
+    return await response_cache.store(
+        cache_key,
+        {
+            "response_code": 200,
+            "response": {
+                "context": formatted_statistics,
+                "error": None,
+                "message": "Statistics retrieved successfully",
+            },
         },
-    }
+        etag,
+    )
@@ -0,0 +1,51 @@
+import json
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+from homework_api import config
+
+# orjson is optional (pip install homework-api[speedups]), both encoders give
+# the same compact utf-8 output for the payloads sent by the api
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(payload: Any):
+    if orjson is not None:
+        return orjson.dumps(payload)
+
+    return json.dumps(
+        payload,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class CompactJSONResponse(JSONResponse):
+    def render(self, content: Any):
+        return dumps(content)
+
+
+def json_response(
+    content: bytes, status_code: int = 200, headers: Optional[dict] = None
+):
+    # already serialized bodies skip fastapi's encoder entirely
+    return Response(
+        content=content,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def http_status(response_code: int):
+    return response_code if config.HTTP_STATUS_CODES else 200
+
+
+def api_response(payload: dict, headers: Optional[dict] = None):
+    return json_response(dumps(payload), http_status(payload["response_code"]), headers)
@@ -1,27 +1,140 @@
-from datetime import datetime
-from typing import Dict, List, Union
+import base64
+import hashlib
+import json
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
 
 from markupsafe import Markup
 
 
+def cleanse_string(value: str):
+    # without markup characters striptags could only collapse whitespace,
+    # so skip building the Markup for the common case
+    if "<" not in value and "&" not in value:
+        return " ".join(value.split())
+
+    return Markup(value).striptags()
+
+
 def cleanse_api_body(values: Dict[str, any]):
     return {
-        key: Markup(value).striptags() if isinstance(value, str) else value
+        key: cleanse_string(value) if isinstance(value, str) else value
         for key, value in values.items()
     }
 
 
+# [0-9] rather than \d, which also matches other scripts' digits such as "٢"
+DATE_PATTERN = re.compile(r"([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})")
+
+
+def check_valid_date(value: str):
+    # YYYY-M-D with ascii digits and a real calendar date
+    match = DATE_PATTERN.fullmatch(value)
+
+    if match is None:
+        return False
+
+    try:
+        date(int(match[1]), int(match[2]), int(match[3]))
+    except ValueError:
+        return False
+
+    return True
+
+
+def normalize_date(value: str):
+    # dates are stored and compared as text, so "2024-1-5" is written as
+    # "2024-01-05"; anything that is not a date is left for validation
+    match = DATE_PATTERN.fullmatch(value)
+
+    if match is None:
+        return value
+
+    return f"{match[1]}-{int(match[2]):02d}-{int(match[3]):02d}"
+
+
 def check_valid_dates(dates: List[Union[str, None]]):
-    valids = []
-    for date in dates:
-        if date is None:
-            valids.append(True)
-            continue
-
-        try:
-            datetime.strptime(date, "%Y-%m-%d")
-            valids.append(True)
-        except ValueError:
-            valids.append(False)
-
-    return all(valids)
+    return all(value is None or check_valid_date(value) for value in dates)
+
+
+# ids are INTEGER columns, 32 bit on postgres, anything larger cannot exist
+# and would be rejected by the driver instead of simply not matching
+MAX_ID = 2**31 - 1
+
+HOMEWORK_ID_PATTERN = re.compile(r"[0-9]{1,10}")
+
+
+def is_valid_id(value: int):
+    return 0 < value <= MAX_ID
+
+
+def parse_homework_id(value: str) -> Optional[int]:
+    # str.isdigit also accepts digits int() cannot parse, such as "²"
+    if HOMEWORK_ID_PATTERN.fullmatch(value) is None:
+        return None
+
+    homework_id = int(value)
+
+    return homework_id if is_valid_id(homework_id) else None
+
+
+def make_filter_hash(filters: Dict[str, any]):
+    return hashlib.sha256(
+        json.dumps(filters, sort_keys=True).encode("utf8")
+    ).hexdigest()[:16]
+
+
+def encode_cursor(last_homework_id: int, filter_hash: str):
+    return (
+        base64.urlsafe_b64encode(f"{last_homework_id}:{filter_hash}".encode("utf8"))
+        .decode("ascii")
+        .rstrip("=")
+    )
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[int, str]]:
+    try:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_homework_id, filter_hash = decoded.decode("utf8").split(":", 1)
+        last_homework_id = int(last_homework_id)
+    except ValueError:
+        return None
+
+    if not is_valid_id(last_homework_id):
+        return None
+
+    return last_homework_id, filter_hash
+
+
+# request fields that identify the caller rather than the data
+IGNORED_BODY_KEYS = ("classroom_secret", "classroom_password", "token")
+
+
+def hash_request_body(body: Dict[str, any]):
+    normalized_body = json.dumps(
+        {key: value for key, value in body.items() if key not in IGNORED_BODY_KEYS},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+    return hashlib.sha256(normalized_body.encode("utf8")).hexdigest()
+
+
+def make_etag(classroom_id: int, classroom_version: int, endpoint: str, body):
+    return f'"{classroom_id}-{classroom_version}-{endpoint}-{hash_request_body(body)[:16]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str):
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # weak comparison, W/ prefixes added by proxies still match
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == etag
+        for candidate in candidates
+    )
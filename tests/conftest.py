@@ -0,0 +1,142 @@
+import os
+import tempfile
+
+import pytest
+
+# the app reads its configuration on import, so the test settings have to be
+# in place before anything from homework_api is imported
+TEST_DIRECTORY = tempfile.mkdtemp(prefix="homework_api_tests_")
+os.environ.setdefault(
+    "HOMEWORK_API_DATABASE_URL", f"sqlite:///{TEST_DIRECTORY}/homework_api.db"
+)
+os.environ.setdefault("HOMEWORK_API_PASSWORD_SCRYPT_N", str(2**10))
+os.environ.setdefault("HOMEWORK_API_SESSION_SECRET", "test session secret")
+os.environ.setdefault("SQLALCHEMY_SILENCE_UBER_WARNING", "1")
+
+from homework_api import db_operations  # noqa: E402
+from homework_api.database import run_migrations  # noqa: E402
+from homework_api.database.database_manager import DB  # noqa: E402
+
+# e.g. postgresql://postgres@localhost/homework_test, every table in it is
+# dropped before each test, without it a throwaway server is started locally
+POSTGRES_URL = os.environ.get("HOMEWORK_API_TEST_POSTGRES_URL")
+
+TABLES = ["homework_daily_stats", "homeworks", "classrooms", "schema_migrations"]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def postgres_url(tmp_path_factory):
+    if POSTGRES_URL is not None:
+        yield POSTGRES_URL
+        return
+
+    # pgserver ships the postgres binaries as a wheel, so no system install
+    # or docker is needed (both are in the dev dependencies)
+    pgserver = pytest.importorskip("pgserver")
+    pytest.importorskip("asyncpg")
+
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"), cleanup_mode="stop")
+    try:
+        yield server.get_uri()
+    finally:
+        server.cleanup()
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+async def db(request, tmp_path):
+    if request.param == "sqlite":
+        url = f"sqlite:///{tmp_path / 'homework_api.db'}"
+    else:
+        # only started when a postgres test actually runs
+        url = request.getfixturevalue("postgres_url")
+
+    database = DB(url, read_pool_size=2)
+    await database.connect()
+
+    if database.dialect != "sqlite":
+        for table in TABLES:
+            await database.execute(f"DROP TABLE IF EXISTS {table}")
+
+    await db_operations.create_table(database)
+    await run_migrations(database)
+
+    yield database
+
+    await database.disconnect()
+
+
+@pytest.fixture
+async def sqlite_db(tmp_path):
+    database = DB(f"sqlite:///{tmp_path / 'homework_api.db'}", read_pool_size=2)
+    await database.connect()
+
+    await db_operations.create_table(database)
+    await run_migrations(database)
+
+    yield database
+
+    await database.disconnect()
+
+
+async def add_classroom(db, name="4/5"):
+    return await db_operations.add_classroom(
+        db, os.urandom(16).hex(), "not a real hash", name
+    )
+
+
+def make_homework(title, subject="Mathematics", assigned_date="2024-01-15"):
+    return {
+        "subject": subject,
+        "teacher": "Somchai",
+        "title": title,
+        "description": "",
+        "assigned_date": assigned_date,
+        "due_date": "2024-02-01",
+    }
+
+
+@pytest.fixture
+async def client():
+    import httpx
+
+    from homework_api.main import app, shutdown, startup
+
+    # ASGITransport does not send lifespan events
+    await startup()
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as test_client:
+            yield test_client
+    finally:
+        await shutdown()
+
+
+async def create_classroom(client, password="hunter22"):
+    response = await client.post(
+        "/classroom/new",
+        json={"classroom_name": "4/5", "classroom_password": password},
+    )
+
+    return response.json()["response"]["context"]["classroom_secret"]
+
+
+async def add_homeworks(client, classroom_secret, homeworks, password="hunter22"):
+    response = await client.post(
+        "/homework/add_bulk",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": password,
+            "homeworks": homeworks,
+        },
+    )
+
+    return [
+        result["homework_id"]
+        for result in response.json()["response"]["context"]["homeworks"]
+    ]
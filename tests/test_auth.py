@@ -0,0 +1,76 @@
+import logging
+
+import pytest
+
+from homework_api import auth, config
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+def test_token_roundtrip():
+    token, expires_at = auth.issue_token(42)
+
+    assert auth.verify_token(token) == {"ClassroomID": 42}
+
+
+def test_expired_token(monkeypatch):
+    monkeypatch.setattr(config, "SESSION_TTL", -1)
+    token, _ = auth.issue_token(42)
+
+    assert auth.verify_token(token) is None
+
+
+@pytest.mark.parametrize(
+    "tamper",
+    [
+        # another classroom with the signature of the original
+        lambda token: "43" + token[2:],
+        # a later expiry
+        lambda token: token.replace(".", ".9", 1),
+        lambda token: token[:-1] + ("A" if token[-1] != "A" else "B"),
+        lambda token: token.rsplit(".", 1)[0],
+        lambda token: token + ".extra",
+        lambda token: token[:-1] + "é",
+        lambda token: token.rsplit(".", 1)[0] + ".☃☃☃",
+        lambda token: "",
+    ],
+)
+def test_tampered_tokens(tamper):
+    token, _ = auth.issue_token(42)
+
+    assert auth.verify_token(tamper(token)) is None
+
+
+async def test_token_authenticates_requests(client):
+    classroom_secret = await create_classroom(client)
+    await add_homeworks(client, classroom_secret, [make_homework("worksheet")])
+
+    login = await client.post(
+        "/classroom/login",
+        json={"classroom_secret": classroom_secret, "classroom_password": "hunter22"},
+    )
+    token = login.json()["response"]["context"]["token"]
+
+    listed = await client.post(
+        "/homework/list", json={}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert len(listed.json()["response"]["context"]["homeworks"]) == 1
+
+    rejected = await client.post(
+        "/homework/list", json={"token": token.rsplit(".", 1)[0] + ".ü"}
+    )
+    assert rejected.json()["response"]["error"] == "TOKEN_INVALID"
+
+
+async def test_random_session_secret_is_logged(monkeypatch, caplog):
+    from homework_api.main import shutdown, startup
+
+    monkeypatch.setattr(config, "SESSION_SECRET_IS_RANDOM", True)
+
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"):
+        await startup()
+        await shutdown()
+
+    assert "HOMEWORK_API_SESSION_SECRET is not set" in caplog.text
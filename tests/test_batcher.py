@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from homework_api import db_operations, metrics
+from homework_api.batcher import HomeworkBatcher, homework_batcher
+
+from .conftest import add_classroom, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def written_batches(monkeypatch):
+    batches = []
+    add_homeworks_batch = db_operations.add_homeworks_batch
+
+    async def recording_add_homeworks_batch(db, homeworks):
+        batches.append([homework["title"] for _, homework in homeworks])
+        return await add_homeworks_batch(db, homeworks)
+
+    monkeypatch.setattr(
+        db_operations, "add_homeworks_batch", recording_add_homeworks_batch
+    )
+
+    return batches
+
+
+async def get_title(db, classroom_id, homework_id):
+    return (await db_operations.get_homework(db, classroom_id, homework_id))["Title"]
+
+
+async def test_concurrent_adds_share_a_transaction(sqlite_db, written_batches):
+    classroom_id = await add_classroom(sqlite_db)
+    other_classroom_id = await add_classroom(sqlite_db)
+
+    batcher = HomeworkBatcher(sqlite_db, max_size=8, max_delay=1, queue_size=100)
+    await batcher.start()
+
+    titles = [f"worksheet {index}" for index in range(8)]
+    classroom_ids = [classroom_id, other_classroom_id] * 4
+    homework_ids = await asyncio.gather(
+        *(
+            batcher.add(homework_classroom_id, make_homework(title))
+            for homework_classroom_id, title in zip(classroom_ids, titles)
+        )
+    )
+
+    await batcher.stop()
+
+    # a full batch is written at once, without waiting for the delay
+    assert written_batches == [titles]
+
+    # every caller gets the id of its own homework
+    assert [
+        await get_title(sqlite_db, homework_classroom_id, homework_id)
+        for homework_classroom_id, homework_id in zip(classroom_ids, homework_ids)
+    ] == titles
+
+
+async def test_partial_batch_waits_for_the_delay(sqlite_db, written_batches):
+    classroom_id = await add_classroom(sqlite_db)
+
+    batcher = HomeworkBatcher(sqlite_db, max_size=8, max_delay=0.01, queue_size=100)
+    await batcher.start()
+
+    homework_ids = await asyncio.gather(
+        *(batcher.add(classroom_id, make_homework(title)) for title in "abc")
+    )
+
+    await batcher.stop()
+
+    assert written_batches == [["a", "b", "c"]]
+    assert len(set(homework_ids)) == 3
+
+
+async def test_failing_row_does_not_fail_the_batch(sqlite_db, written_batches):
+    classroom_id = await add_classroom(sqlite_db)
+
+    batcher = HomeworkBatcher(sqlite_db, max_size=3, max_delay=1, queue_size=100)
+    await batcher.start()
+
+    results = await asyncio.gather(
+        batcher.add(classroom_id, make_homework("first")),
+        # Title is NOT NULL
+        batcher.add(classroom_id, make_homework(None)),
+        batcher.add(classroom_id, make_homework("third")),
+        return_exceptions=True,
+    )
+
+    await batcher.stop()
+
+    # the whole batch, then every row on its own
+    assert written_batches == [["first", None, "third"], ["first"], [None], ["third"]]
+
+    assert isinstance(results[1], Exception)
+    assert await get_title(sqlite_db, classroom_id, results[0]) == "first"
+    assert await get_title(sqlite_db, classroom_id, results[2]) == "third"
+
+
+async def test_full_queue_rejects(sqlite_db):
+    classroom_id = await add_classroom(sqlite_db)
+
+    batcher = HomeworkBatcher(sqlite_db, max_size=100, max_delay=0.05, queue_size=1)
+    await batcher.start()
+
+    rejected = metrics.add_batch_rejected.values[()]
+
+    # the first is taken by the writer, the second fills the queue
+    first = asyncio.create_task(batcher.add(classroom_id, make_homework("first")))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(batcher.add(classroom_id, make_homework("second")))
+    await asyncio.sleep(0)
+
+    with pytest.raises(asyncio.QueueFull):
+        await batcher.add(classroom_id, make_homework("third"))
+
+    assert metrics.add_batch_rejected.values[()] == rejected + 1
+
+    await batcher.stop()
+    assert len(set(await asyncio.gather(first, second))) == 2
+
+
+async def test_stop_writes_everything_queued(sqlite_db):
+    classroom_id = await add_classroom(sqlite_db)
+
+    batcher = HomeworkBatcher(sqlite_db, max_size=4, max_delay=10, queue_size=100)
+    await batcher.start()
+
+    adds = [
+        asyncio.create_task(
+            batcher.add(classroom_id, make_homework(f"worksheet {index}"))
+        )
+        for index in range(6)
+    ]
+    await asyncio.sleep(0)
+
+    # the second batch is only half full, stop does not wait for its delay
+    await asyncio.wait_for(batcher.stop(), 5)
+
+    homework_ids = [add.result() for add in adds]
+    assert [
+        await get_title(sqlite_db, classroom_id, homework_id)
+        for homework_id in homework_ids
+    ] == [f"worksheet {index}" for index in range(6)]
+
+
+async def test_busy_batcher_answers_server_busy(client, monkeypatch):
+    classroom_secret = await create_classroom(client)
+
+    async def full_add(classroom_id, homework):
+        raise asyncio.QueueFull
+
+    monkeypatch.setattr(homework_batcher, "max_size", 8)
+    monkeypatch.setattr(homework_batcher, "add", full_add)
+
+    response = await client.post(
+        "/homework/add",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": "hunter22",
+            **make_homework("worksheet"),
+        },
+    )
+
+    assert response.json()["response"]["error"] == "SERVER_BUSY"
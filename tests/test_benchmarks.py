@@ -0,0 +1,128 @@
+import datetime
+import json
+import random
+
+import pytest
+
+from benchmarks import compare, runner, seed
+from benchmarks.scenarios import SCENARIOS
+
+from .conftest import add_homeworks, create_classroom
+
+pytestmark = pytest.mark.anyio
+
+
+def test_summarize():
+    summary = runner.summarize([0.004, 0.001, 0.003, 0.002], 2.0, 1)
+
+    assert summary == {
+        "requests": 4,
+        "errors": 1,
+        "seconds": 2.0,
+        "requests_per_second": 2.0,
+        "mean_ms": 2.5,
+        "p50_ms": 3.0,
+        "p90_ms": 4.0,
+        "p99_ms": 4.0,
+        "max_ms": 4.0,
+    }
+
+    assert runner.summarize([], 0, 0)["p50_ms"] is None
+
+
+def test_make_homeworks_is_repeatable():
+    homeworks = seed.make_homeworks(random.Random(7), 200)
+
+    assert homeworks == seed.make_homeworks(random.Random(7), 200)
+    assert len(homeworks) == 200
+
+    assigned_dates = [homework["assigned_date"] for homework in homeworks]
+    assert assigned_dates == sorted(assigned_dates)
+
+    for homework in homeworks:
+        assigned_date = datetime.date.fromisoformat(homework["assigned_date"])
+        due_date = datetime.date.fromisoformat(homework["due_date"])
+
+        assert assigned_date.weekday() < 5
+        assert due_date > assigned_date
+        assert homework["teacher"] in seed.SUBJECTS[homework["subject"]][1]
+
+
+def write_report(path, commit, **scenarios):
+    with open(path, "w", encoding="utf8") as report_file:
+        json.dump({"meta": {"commit": commit}, "scenarios": scenarios}, report_file)
+
+    return str(path)
+
+
+def result(p50_ms, requests_per_second):
+    return {
+        "p50_ms": p50_ms,
+        "p99_ms": p50_ms * 3,
+        "requests_per_second": requests_per_second,
+    }
+
+
+def test_compare(tmp_path, capsys):
+    base = write_report(
+        tmp_path / "base.json",
+        "aaaaaaa",
+        get=result(1.0, 1000.0),
+        list_deep=result(10.0, 100.0),
+    )
+    head = write_report(
+        tmp_path / "head.json",
+        "bbbbbbb",
+        get=result(1.05, 990.0),
+        list_deep=result(10.0, 80.0),
+        add=result(2.0, 500.0),
+    )
+
+    assert compare.compare(base, head) is True
+    assert compare.compare(base, head, fail_above=10) is False
+
+    output = capsys.readouterr().out
+    assert "base aaaaaaa  head bbbbbbb" in output
+    assert "add              (not in base)" in output
+    assert "regressed by more than 10%: list_deep" in output
+
+    # within the threshold on both latency and throughput
+    assert compare.compare(base, head, fail_above=25) is True
+
+
+async def test_scenarios_run_against_the_app(client):
+    classroom_secret = await create_classroom(client, password=seed.PASSWORD)
+    homework_ids = await add_homeworks(
+        client,
+        classroom_secret,
+        seed.make_homeworks(random.Random(1), 120),
+        password=seed.PASSWORD,
+    )
+    manifest = {
+        "password": seed.PASSWORD,
+        "classrooms": [
+            {
+                "classroom_id": None,
+                "classroom_secret": classroom_secret,
+                "homeworks": len(homework_ids),
+                "first_homework_id": min(homework_ids),
+                "last_homework_id": max(homework_ids),
+            }
+        ],
+    }
+
+    for name, scenario in SCENARIOS.items():
+        rng = random.Random(f"0-{name}")
+        requests = [scenario(rng, manifest) for _ in range(12)]
+
+        summary = await runner.run_scenario(client, requests, 4, 2)
+
+        assert (summary["requests"], summary["errors"]) == (10, 0), name
+
+
+async def test_errors_are_counted(client):
+    requests = [("/homework/list", {"classroom_secret": "0" * 64})] * 3
+
+    summary = await runner.run_scenario(client, requests, 2, 0)
+
+    assert (summary["requests"], summary["errors"]) == (3, 3)
@@ -0,0 +1,228 @@
+import pytest
+
+from homework_api import config
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+async def post(client, path, classroom_secret, **body):
+    response = await client.post(
+        path,
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": "hunter22",
+            **body,
+        },
+    )
+
+    return response.json()["response"]
+
+
+async def get_homework(client, classroom_secret, homework_id):
+    response = await client.post(
+        "/homework/get",
+        json={"classroom_secret": classroom_secret, "homework_id": str(homework_id)},
+    )
+
+    return response.json()["response"]["context"]
+
+
+async def test_add_bulk_reports_every_row(client):
+    classroom_secret = await create_classroom(client)
+
+    response = await post(
+        client,
+        "/homework/add_bulk",
+        classroom_secret,
+        homeworks=[
+            make_homework("first"),
+            {**make_homework("bad date"), "due_date": "2024-02-30"},
+            # no teacher and no earlier homework of the subject
+            {**make_homework("unknown teacher", "Art"), "teacher": None},
+            # takes the teacher of the row before it
+            {**make_homework("second"), "teacher": None},
+        ],
+    )
+    context = response["context"]
+
+    assert (context["created"], context["failed"]) == (2, 2)
+    assert [homework["error"] for homework in context["homeworks"]] == [
+        None,
+        "DATE_INVALID",
+        "NO_TEACHER",
+        None,
+    ]
+
+    first_id, second_id = (
+        context["homeworks"][0]["homework_id"],
+        context["homeworks"][3]["homework_id"],
+    )
+    assert (await get_homework(client, classroom_secret, first_id))["title"] == "first"
+    second = await get_homework(client, classroom_secret, second_id)
+    assert (second["title"], second["teacher"]) == ("second", "Somchai")
+
+
+async def test_add_bulk_limits(client, monkeypatch):
+    classroom_secret = await create_classroom(client)
+    monkeypatch.setattr(config, "BULK_MAX_HOMEWORKS", 2)
+
+    for homeworks in ([], [make_homework(f"worksheet {index}") for index in range(3)]):
+        response = await post(
+            client, "/homework/add_bulk", classroom_secret, homeworks=homeworks
+        )
+        assert response["error"] == "TOO_MANY_HOMEWORKS"
+
+
+async def test_add_bulk_needs_the_password(client):
+    classroom_secret = await create_classroom(client)
+
+    response = await client.post(
+        "/homework/add_bulk",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": "wrong",
+            "homeworks": [make_homework("first")],
+        },
+    )
+
+    assert response.json()["response"]["error"] == "SECRET_OR_PASSWORD_INVALID"
+
+
+async def test_remove_bulk_by_ids(client):
+    classroom_secret = await create_classroom(client)
+    other_secret = await create_classroom(client)
+
+    kept_id, *removed_ids = await add_homeworks(
+        client,
+        classroom_secret,
+        [make_homework(f"worksheet {index}") for index in range(3)],
+    )
+    (other_id,) = await add_homeworks(client, other_secret, [make_homework("other")])
+
+    response = await post(
+        client,
+        "/homework/remove_bulk",
+        classroom_secret,
+        # another classroom's homework and an id out of range are not found
+        homework_ids=[*removed_ids, other_id, 99999999999],
+    )
+
+    assert response["context"] == {
+        "deleted_homework_ids": sorted(removed_ids),
+        "not_found_homework_ids": sorted([other_id, 99999999999]),
+    }
+    assert (await get_homework(client, classroom_secret, kept_id))[
+        "homework_id"
+    ] == kept_id
+    assert (await get_homework(client, other_secret, other_id))[
+        "homework_id"
+    ] == other_id
+
+    for homework_id in removed_ids:
+        response = await client.post(
+            "/homework/get",
+            json={
+                "classroom_secret": classroom_secret,
+                "homework_id": str(homework_id),
+            },
+        )
+        assert response.json()["response"]["error"] == "HOMEWORK_NOT_FOUND"
+
+
+async def test_remove_bulk_by_filter(client):
+    classroom_secret = await create_classroom(client)
+
+    old_id, new_id, art_id = await add_homeworks(
+        client,
+        classroom_secret,
+        [
+            make_homework("last term", assigned_date="2023-11-01"),
+            make_homework("this term", assigned_date="2024-01-15"),
+            make_homework("last term art", "Art", assigned_date="2023-11-01"),
+        ],
+    )
+
+    response = await post(
+        client,
+        "/homework/remove_bulk",
+        classroom_secret,
+        subject="Mathematics",
+        assigned_before_date="2024-01-01",
+    )
+
+    assert response["context"] == {
+        "deleted_homework_ids": [old_id],
+        "not_found_homework_ids": [],
+    }
+    for homework_id in (new_id, art_id):
+        homework = await get_homework(client, classroom_secret, homework_id)
+        assert homework["homework_id"] == homework_id
+
+
+async def test_bulk_needs_a_filter(client):
+    classroom_secret = await create_classroom(client)
+    await add_homeworks(client, classroom_secret, [make_homework("first")])
+
+    response = await post(client, "/homework/remove_bulk", classroom_secret)
+    assert response["error"] == "FILTER_REQUIRED"
+
+    response = await post(
+        client, "/homework/update_bulk", classroom_secret, new_teacher="Malee"
+    )
+    assert response["error"] == "FILTER_REQUIRED"
+
+
+async def test_update_bulk_renames_a_teacher(client):
+    classroom_secret = await create_classroom(client)
+
+    math_ids = await add_homeworks(
+        client,
+        classroom_secret,
+        [make_homework("first"), make_homework("second")],
+    )
+    (art_id,) = await add_homeworks(
+        client, classroom_secret, [make_homework("drawing", "Art")]
+    )
+
+    response = await post(
+        client,
+        "/homework/update_bulk",
+        classroom_secret,
+        subject="Mathematics",
+        new_teacher="Malee",
+        new_subject="Maths",
+    )
+
+    assert sorted(response["context"]["updated_homework_ids"]) == sorted(math_ids)
+    for homework_id in math_ids:
+        homework = await get_homework(client, classroom_secret, homework_id)
+        assert (homework["subject"], homework["teacher"]) == ("Maths", "Malee")
+
+    art = await get_homework(client, classroom_secret, art_id)
+    assert (art["subject"], art["teacher"]) == ("Art", "Somchai")
+
+
+async def test_update_bulk_rejects_bad_changes(client):
+    classroom_secret = await create_classroom(client)
+    (homework_id,) = await add_homeworks(
+        client, classroom_secret, [make_homework("first")]
+    )
+
+    response = await post(
+        client, "/homework/update_bulk", classroom_secret, homework_ids=[homework_id]
+    )
+    assert response["error"] == "NO_CHANGES"
+
+    response = await post(
+        client,
+        "/homework/update_bulk",
+        classroom_secret,
+        homework_ids=[homework_id],
+        new_due_date="2024-13-01",
+    )
+    assert response["error"] == "DATE_INVALID"
+
+    homework = await get_homework(client, classroom_secret, homework_id)
+    assert homework["due_date"] == "2024-02-01"
@@ -0,0 +1,107 @@
+import pytest
+
+from homework_api import auth, db_operations
+from homework_api.cache import LRUCache
+
+pytestmark = pytest.mark.anyio
+
+
+def test_least_recently_used_is_evicted():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    # reading "a" makes "b" the oldest
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("homework_api.cache.time.monotonic", lambda: now)
+
+    cache = LRUCache(10, ttl=5)
+    cache.set("a", 1)
+
+    now += 4.9
+    assert cache.get("a") == 1
+
+    now += 0.2
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidate_where():
+    cache = LRUCache(10)
+    cache.set(("secret", "first password"), 1)
+    cache.set(("secret", "second password"), 2)
+    cache.set(("other secret", "first password"), 3)
+
+    cache.invalidate_where(lambda key: key[0] == "secret")
+
+    assert len(cache) == 1
+    assert cache.get(("other secret", "first password")) == 3
+
+
+@pytest.fixture
+def classroom_lookups(monkeypatch):
+    calls = []
+    get_classroom = db_operations.get_classroom
+
+    async def counting_get_classroom(db, classroom_secret):
+        calls.append(classroom_secret)
+        return await get_classroom(db, classroom_secret)
+
+    monkeypatch.setattr(db_operations, "get_classroom", counting_get_classroom)
+    monkeypatch.setattr(auth, "classroom_cache", LRUCache(10, 60))
+
+    return calls
+
+
+async def test_classroom_lookups_are_cached(sqlite_db, classroom_lookups):
+    classroom_id = await db_operations.add_classroom(sqlite_db, "secret", "hash", "4/5")
+
+    for _ in range(3):
+        classroom = await auth.get_classroom(sqlite_db, "secret")
+        assert classroom["ClassroomID"] == classroom_id
+
+    assert classroom_lookups == ["secret"]
+
+    auth.invalidate_classroom("secret")
+    await auth.get_classroom(sqlite_db, "secret")
+    assert classroom_lookups == ["secret", "secret"]
+
+
+async def test_unknown_secrets_are_not_cached(sqlite_db, classroom_lookups):
+    assert await auth.get_classroom(sqlite_db, "secret") is None
+
+    # created right after the miss, and found
+    classroom_id = await db_operations.add_classroom(sqlite_db, "secret", "hash", "4/5")
+
+    assert (await auth.get_classroom(sqlite_db, "secret"))[
+        "ClassroomID"
+    ] == classroom_id
+
+
+async def test_credentials_are_not_cached_in_plain_text(sqlite_db, monkeypatch):
+    monkeypatch.setattr(auth, "classroom_cache", LRUCache(10, 60))
+    monkeypatch.setattr(auth, "credential_cache", LRUCache(10, 60))
+    await db_operations.add_classroom(
+        sqlite_db, "secret", auth.hash_password_sync("hunter22"), "4/5"
+    )
+
+    assert await auth.verify_classroom(sqlite_db, "secret", "hunter22")
+
+    ((classroom_secret, password_key),) = list(auth.credential_cache._entries)
+    assert classroom_secret == "secret"
+    assert b"hunter22" not in password_key
+    assert password_key != auth.credential_key("secret", "hunter23")[1]
+
+    # found again by the same password, and dropped with the classroom
+    assert auth.credential_cache.get(auth.credential_key("secret", "hunter22"))
+    auth.invalidate_classroom("secret")
+    assert len(auth.credential_cache) == 0
@@ -0,0 +1,153 @@
+import itertools
+import secrets
+
+import pytest
+
+from homework_api import auth, config
+from homework_api.routers import classroom
+
+pytestmark = pytest.mark.anyio
+
+
+async def new_classroom(client, classroom_name="4/5", classroom_password="hunter22"):
+    response = await client.post(
+        "/classroom/new",
+        json={
+            "classroom_name": classroom_name,
+            "classroom_password": classroom_password,
+        },
+    )
+
+    return response.json()["response"]
+
+
+async def login(client, classroom_secret, classroom_password="hunter22"):
+    response = await client.post(
+        "/classroom/login",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": classroom_password,
+        },
+    )
+
+    return response.json()["response"]
+
+
+@pytest.mark.parametrize(
+    "classroom_name, classroom_password, error",
+    [
+        ("4/5", "hunter22", None),
+        ("class 6/12", "hunter22", None),
+        ("45", "hunter22", "CLASSROOM_INVALID"),
+        ("7/1", "hunter22", "CLASSROOM_INVALID"),
+        ("4/", "hunter22", "CLASSROOM_INVALID"),
+        ("classroom 4/5", "hunter22", "CLASSROOM_INVALID"),
+        ("4/5", "abcd", "PASSWORD_INVALID"),
+        ("4/5", "hunter 22", "PASSWORD_INVALID"),
+    ],
+)
+def test_check_classroom(classroom_name, classroom_password, error):
+    classroom_error = classroom.check_classroom(
+        {"classroom_name": classroom_name, "classroom_password": classroom_password}
+    )
+
+    assert (classroom_error.name if classroom_error else None) == error
+
+
+async def test_new_classroom_secrets(client):
+    classroom_secrets = [
+        (await new_classroom(client))["context"]["classroom_secret"] for _ in range(5)
+    ]
+
+    # same name and password within the same second still gives distinct secrets
+    assert len(set(classroom_secrets)) == 5
+    for classroom_secret in classroom_secrets:
+        assert len(classroom_secret) == 64
+        int(classroom_secret, 16)
+
+        assert (await login(client, classroom_secret))["error"] is None
+        assert (await login(client, classroom_secret, "hunter23"))[
+            "error"
+        ] == "SECRET_OR_PASSWORD_INVALID"
+
+
+async def test_new_classroom_rejects_invalid(client):
+    response = await new_classroom(client, classroom_name="45")
+    assert response["error"] == "CLASSROOM_INVALID"
+
+    response = await new_classroom(client, classroom_password="abcd")
+    assert response["error"] == "PASSWORD_INVALID"
+
+
+async def test_taken_secret_is_drawn_again(client, monkeypatch):
+    taken_secret, fresh_secret = secrets.token_hex(32), secrets.token_hex(32)
+    drawn_secrets = iter([taken_secret, taken_secret, fresh_secret])
+    monkeypatch.setattr(auth, "new_classroom_secret", lambda: next(drawn_secrets))
+
+    first = await new_classroom(client, classroom_password="first1")
+    second = await new_classroom(client, classroom_password="second2")
+
+    assert first["context"]["classroom_secret"] == taken_secret
+    assert second["context"]["classroom_secret"] == fresh_secret
+
+    # the collision did not overwrite the first classroom
+    auth.classroom_cache.clear()
+    auth.credential_cache.clear()
+    assert (await login(client, taken_secret, "first1"))["error"] is None
+    assert (await login(client, fresh_secret, "second2"))["error"] is None
+
+
+async def test_secret_attempts_are_bounded(client, monkeypatch):
+    taken_secret = secrets.token_hex(32)
+    monkeypatch.setattr(auth, "new_classroom_secret", lambda: taken_secret)
+
+    await classroom.create_classrooms(
+        [{"classroom_name": "4/5", "classroom_password": "hunter22"}]
+    )
+
+    with pytest.raises(RuntimeError):
+        await classroom.create_classrooms(
+            [{"classroom_name": "4/5", "classroom_password": "hunter22"}]
+        )
+
+
+async def test_new_bulk(client, monkeypatch):
+    response = await client.post(
+        "/classroom/new_bulk",
+        json={
+            "classrooms": [
+                {"classroom_name": "1/1", "classroom_password": "first1"},
+                {"classroom_name": "bad", "classroom_password": "first1"},
+                {"classroom_name": "1/2", "classroom_password": "no"},
+                {"classroom_name": "1/3", "classroom_password": "third3"},
+            ]
+        },
+    )
+    context = response.json()["response"]["context"]
+
+    assert (context["created"], context["failed"]) == (2, 2)
+    assert [result["index"] for result in context["classrooms"]] == [0, 1, 2, 3]
+    assert [result["error"] for result in context["classrooms"]] == [
+        None,
+        "CLASSROOM_INVALID",
+        "PASSWORD_INVALID",
+        None,
+    ]
+    assert context["classrooms"][1]["classroom_secret"] is None
+
+    for result, classroom_password in zip(
+        itertools.compress(context["classrooms"], [1, 0, 0, 1]), ["first1", "third3"]
+    ):
+        assert (await login(client, result["classroom_secret"], classroom_password))[
+            "error"
+        ] is None
+
+    monkeypatch.setattr(config, "BULK_MAX_CLASSROOMS", 1)
+    for classrooms in (
+        [],
+        [{"classroom_name": "1/1", "classroom_password": "a1b2c3"}] * 2,
+    ):
+        response = await client.post(
+            "/classroom/new_bulk", json={"classrooms": classrooms}
+        )
+        assert response.json()["response"]["error"] == "TOO_MANY_CLASSROOMS"
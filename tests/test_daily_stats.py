@@ -0,0 +1,122 @@
+import pytest
+
+from homework_api import db_operations
+
+from .conftest import add_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+async def get_counters(db):
+    rows = await db.fetch_all(
+        """
+        SELECT 
+            ClassroomID AS "ClassroomID", 
+            Subject AS "Subject", 
+            AssignedDate AS "AssignedDate", 
+            HomeworkCount AS "HomeworkCount" 
+        FROM homework_daily_stats
+        """
+    )
+
+    return sorted(
+        (row["ClassroomID"], row["Subject"], row["AssignedDate"], row["HomeworkCount"])
+        for row in rows
+    )
+
+
+async def count_homeworks(db):
+    rows = await db.fetch_all(
+        """
+        SELECT 
+            ClassroomID AS "ClassroomID", 
+            Subject AS "Subject", 
+            AssignedDate AS "AssignedDate", 
+            COUNT(*) AS "HomeworkCount" 
+        FROM homeworks 
+        GROUP BY ClassroomID, Subject, AssignedDate
+        """
+    )
+
+    return sorted(
+        (row["ClassroomID"], row["Subject"], row["AssignedDate"], row["HomeworkCount"])
+        for row in rows
+    )
+
+
+async def test_counters_follow_every_write(db):
+    classroom_id = await add_classroom(db)
+    other_classroom_id = await add_classroom(db)
+
+    homework_id = await db_operations.add_homework(
+        db, classroom_id, "Science", "Suda", "lab", "", "2024-01-10", "2024-01-20"
+    )
+    homework_ids = await db_operations.add_homeworks(
+        db,
+        classroom_id,
+        [
+            make_homework("a", assigned_date="2024-01-10"),
+            make_homework("b", assigned_date="2024-01-10"),
+            make_homework("c", "Science", assigned_date="2024-01-11"),
+            make_homework("d", assigned_date="2024-01-12"),
+        ],
+    )
+    await db_operations.add_homeworks_batch(
+        db,
+        [
+            (classroom_id, make_homework("e", assigned_date="2024-01-12")),
+            (other_classroom_id, make_homework("f", assigned_date="2024-01-12")),
+        ],
+    )
+    assert await get_counters(db) == await count_homeworks(db)
+    assert (classroom_id, "Mathematics", "2024-01-12", 2) in await get_counters(db)
+
+    await db_operations.remove_homework(db, classroom_id, homework_id)
+    await db_operations.remove_homeworks(
+        db, classroom_id, db_operations.homeworksFilter(homework_ids=homework_ids[:1])
+    )
+    assert await get_counters(db) == await count_homeworks(db)
+
+    # moved from one subject to another
+    await db_operations.update_homeworks(
+        db,
+        classroom_id,
+        db_operations.homeworksFilter(subject="Mathematics"),
+        {"Subject": "Thai"},
+    )
+    assert await get_counters(db) == await count_homeworks(db)
+
+    # days without homeworks leave no counter behind
+    await db_operations.remove_homeworks(
+        db, classroom_id, db_operations.homeworksFilter(subject="Thai")
+    )
+    assert await get_counters(db) == await count_homeworks(db)
+    assert all(count > 0 for *_, count in await get_counters(db))
+
+
+async def test_statistics_sum_the_counters(db):
+    classroom_id = await add_classroom(db)
+    await db_operations.add_homeworks(
+        db,
+        classroom_id,
+        [
+            make_homework("a", assigned_date="2024-01-10"),
+            make_homework("b", "Science", assigned_date="2024-01-10"),
+            make_homework("c", assigned_date="2024-01-11"),
+        ],
+    )
+
+    statistics = await db_operations.get_statistics(
+        db, classroom_id, "2024-12-31", "2024-01-01"
+    )
+    assert [(row["Bucket"], row["HomeworkCount"]) for row in statistics] == [
+        ("2024-01-10", 2),
+        ("2024-01-11", 1),
+    ]
+
+    by_subject = await db_operations.get_statistics(
+        db, classroom_id, "2024-12-31", "2024-01-01", "Science"
+    )
+    assert [(row["Bucket"], row["HomeworkCount"]) for row in by_subject] == [
+        ("2024-01-10", 1)
+    ]
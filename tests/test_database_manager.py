@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from homework_api import db_operations
+from homework_api.database.database_manager import DB
+
+from .conftest import add_classroom
+
+pytestmark = pytest.mark.anyio
+
+
+async def get_names(db):
+    rows = await db.fetch_all(
+        'SELECT ClassroomName AS "ClassroomName" FROM classrooms ORDER BY ClassroomID'
+    )
+
+    return [row["ClassroomName"] for row in rows]
+
+
+async def test_readers_are_read_only(sqlite_db):
+    async with sqlite_db.reader() as reader:
+        with pytest.raises(Exception, match="readonly"):
+            await reader.execute("DELETE FROM classrooms")
+
+
+async def test_transactions_read_their_own_writes(sqlite_db):
+    async with sqlite_db.transaction():
+        await add_classroom(sqlite_db, "4/5")
+
+        # served by the writer, the readers cannot see this yet
+        assert await get_names(sqlite_db) == ["4/5"]
+
+        async with sqlite_db.reader() as reader:
+            assert await reader.fetch_all("SELECT * FROM classrooms") == []
+
+    assert await get_names(sqlite_db) == ["4/5"]
+
+
+async def test_nested_transaction_rolls_back_alone(db):
+    async with db.transaction():
+        await add_classroom(db, "kept")
+
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await add_classroom(db, "dropped")
+                raise RuntimeError
+
+    assert await get_names(db) == ["kept"]
+
+
+async def test_failed_transaction_releases_the_writer(sqlite_db):
+    with pytest.raises(RuntimeError):
+        async with sqlite_db.transaction():
+            await add_classroom(sqlite_db, "dropped")
+            raise RuntimeError
+
+    await asyncio.wait_for(add_classroom(sqlite_db, "kept"), 5)
+    assert await get_names(sqlite_db) == ["kept"]
+
+
+async def test_reads_run_concurrently_with_a_write(sqlite_db):
+    await add_classroom(sqlite_db, "4/5")
+    before = sqlite_db.pool_stats()
+    writing = asyncio.Event()
+    release = asyncio.Event()
+
+    async def write():
+        async with sqlite_db.transaction():
+            await db_operations.bump_classroom_version(sqlite_db, 1)
+            writing.set()
+            await release.wait()
+
+    write_task = asyncio.create_task(write())
+    await writing.wait()
+
+    # would time out if reads had to wait for the writer
+    for _ in range(3):
+        assert await asyncio.wait_for(get_names(sqlite_db), 5) == ["4/5"]
+
+    release.set()
+    await write_task
+
+    stats = sqlite_db.pool_stats()
+    assert stats["read_pool_size"] == 2
+    assert stats["read_idle"] == 2
+    assert stats["read_acquisitions"] - before["read_acquisitions"] == 3
+    assert stats["write_acquisitions"] - before["write_acquisitions"] == 1
+
+
+async def test_query_observer_sees_the_calling_function(tmp_path):
+    observed = []
+    database = DB(
+        f"sqlite:///{tmp_path / 'homework_api.db'}",
+        read_pool_size=1,
+        query_observer=lambda caller, method, seconds: observed.append(
+            (caller, method)
+        ),
+    )
+    await database.connect()
+    try:
+        await db_operations.create_table(database)
+        observed.clear()
+
+        await db_operations.get_classroom(database, "secret")
+    finally:
+        await database.disconnect()
+
+    assert observed == [("get_classroom", "fetch_one")]
@@ -0,0 +1,145 @@
+import pytest
+
+from homework_api import db_operations, utils
+from homework_api.database import run_migrations
+from homework_api.database.migrations import MIGRATIONS
+
+from .conftest import add_classroom, add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2024-1-5", "2024-01-05"),
+        ("2024-01-5", "2024-01-05"),
+        ("2024-1-15", "2024-01-15"),
+        ("2024-11-5", "2024-11-05"),
+        ("2024-11-15", "2024-11-15"),
+        ("2024/1/5", "2024/1/5"),
+        ("not a date", "not a date"),
+    ],
+)
+def test_normalize_date(value, expected):
+    assert utils.normalize_date(value) == expected
+
+
+async def test_unpadded_dates_are_stored_padded(client):
+    classroom_secret = await create_classroom(client)
+    [homework_id] = await add_homeworks(
+        client,
+        classroom_secret,
+        [
+            {
+                **make_homework("worksheet", assigned_date="2024-1-5"),
+                "due_date": "2024-2-1",
+            }
+        ],
+    )
+
+    homework = await client.post(
+        "/homework/get",
+        json={"classroom_secret": classroom_secret, "homework_id": str(homework_id)},
+    )
+    context = homework.json()["response"]["context"]
+    assert (context["assigned_date"], context["due_date"]) == (
+        "2024-01-05",
+        "2024-02-01",
+    )
+
+    # filters are padded the same way, so they compare as dates
+    listed = await client.post(
+        "/homework/list",
+        json={"classroom_secret": classroom_secret, "assigned_after_date": "2024-1-5"},
+    )
+    assert len(listed.json()["response"]["context"]["homeworks"]) == 1
+
+    for bucket, key in [
+        ("day", "2024-01-05"),
+        ("week", "2024-01-01"),
+        ("month", "2024-01"),
+    ]:
+        statistics = await client.post(
+            "/homework/statistics",
+            json={
+                "classroom_secret": classroom_secret,
+                "assigned_before_date": "2024-12-31",
+                "assigned_after_date": "2024-1-1",
+                "bucket": bucket,
+            },
+        )
+        assert statistics.json()["response"]["context"] == {key: 1}
+
+
+async def test_migration_pads_stored_dates(db):
+    # a database from before the migration, written without validation
+    await db.execute("DELETE FROM schema_migrations WHERE Version = 5")
+
+    classroom_id = await add_classroom(db)
+    homework_ids = await db_operations.add_homeworks(
+        db,
+        classroom_id,
+        [
+            {**make_homework("a", assigned_date="2024-1-5"), "due_date": "2024-1-15"},
+            {**make_homework("b", assigned_date="2024-01-05"), "due_date": "2024-11-5"},
+        ],
+    )
+
+    assert await run_migrations(db) == [5]
+
+    homeworks = [
+        await db_operations.get_homework(db, classroom_id, homework_id)
+        for homework_id in homework_ids
+    ]
+    assert [(row["AssignedDate"], row["DueDate"]) for row in homeworks] == [
+        ("2024-01-05", "2024-01-15"),
+        ("2024-01-05", "2024-11-05"),
+    ]
+
+    statistics = await db_operations.get_statistics(
+        db, classroom_id, "2024-12-31", "2024-01-01", None, "week"
+    )
+    assert [(row["Bucket"], row["HomeworkCount"]) for row in statistics] == [
+        ("2024-01-01", 2)
+    ]
+
+
+def test_migration_versions_are_unique():
+    versions = [migration.version for migration in MIGRATIONS]
+
+    assert versions == sorted(set(versions))
+
+
+@pytest.mark.parametrize(
+    "value, valid",
+    [
+        ("2024-01-05", True),
+        ("2024-1-5", True),
+        ("2024-02-29", True),
+        ("2023-02-29", False),
+        ("2024-13-01", False),
+        ("24-01-05", False),
+        ("2024-01-05 ", False),
+        ("٢٠٢٤-٠١-٠٥", False),
+        ("２０２４-01-05", False),
+        ("2024-0١-05", False),
+    ],
+)
+def test_check_valid_date(value, valid):
+    assert utils.check_valid_date(value) is valid
+
+
+async def test_non_ascii_digits_are_rejected(client):
+    classroom_secret = await create_classroom(client)
+
+    response = await client.post(
+        "/homework/add",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": "hunter22",
+            **make_homework("worksheet", assigned_date="٢٠٢٤-٠١-٠٥"),
+        },
+    )
+
+    assert response.json()["response"]["error"] == "DATE_INVALID"
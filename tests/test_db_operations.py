@@ -0,0 +1,231 @@
+import asyncio
+
+import pytest
+
+from homework_api import db_operations
+
+from .conftest import add_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_total_ignores_the_seek(db):
+    classroom_id = await add_classroom(db)
+    other_classroom_id = await add_classroom(db)
+
+    homework_ids = await db_operations.add_homeworks(
+        db,
+        classroom_id,
+        [
+            make_homework(f"worksheet {index}", assigned_date=f"2024-01-{index + 10}")
+            for index in range(8)
+        ],
+    )
+    await db_operations.add_homeworks(
+        db, other_classroom_id, [make_homework("elsewhere")]
+    )
+
+    homeworks = await db_operations.get_homeworks(
+        db,
+        classroom_id,
+        db_operations.getHomeworksCriteria(
+            count=3,
+            offset=0,
+            assigned_after_date="2024-01-12",
+            before_homework_id=homework_ids[-2],
+            include_total=True,
+        ),
+    )
+
+    # 2024-01-12 .. 2024-01-17 match, the seek skips the newest two of them
+    assert [homework["HomeworkID"] for homework in homeworks] == homework_ids[-3:-6:-1]
+    assert {homework["TotalCount"] for homework in homeworks} == {6}
+
+
+async def test_reads_carry_the_classroom_version(db):
+    classroom_id = await add_classroom(db)
+    [homework_id] = await db_operations.add_homeworks(
+        db, classroom_id, [make_homework("worksheet")]
+    )
+    await db_operations.bump_classroom_version(db, classroom_id)
+
+    version = (await db_operations.get_classroom_version(db, classroom_id))["Version"]
+    reads = [
+        [await db_operations.get_homework(db, classroom_id, homework_id)],
+        await db_operations.get_homeworks(
+            db,
+            classroom_id,
+            db_operations.getHomeworksCriteria(count=5, offset=0, include_total=True),
+        ),
+        await db_operations.search_homeworks(
+            db,
+            classroom_id,
+            db_operations.searchHomeworksCriteria(query="work", count=5, offset=0),
+        ),
+        await db_operations.get_statistics(
+            db, classroom_id, "2024-12-31", "2024-01-01", None, "month", "subject"
+        ),
+    ]
+
+    assert [rows[0]["Version"] for rows in reads] == [version] * len(reads)
+
+
+async def test_every_query_runs_on_every_dialect(db):
+    from .test_query_plans import exercise
+
+    classroom_id = await add_classroom(db)
+
+    await exercise(db, classroom_id)
+
+
+async def test_statistics_buckets(db):
+    classroom_id = await add_classroom(db)
+    await db_operations.add_homeworks(
+        db,
+        classroom_id,
+        [
+            make_homework("a", assigned_date="2024-01-01"),
+            make_homework("b", assigned_date="2024-01-07"),
+            make_homework("c", "Science", assigned_date="2024-01-08"),
+            make_homework("d", assigned_date="2024-02-29"),
+        ],
+    )
+
+    async def statistics(bucket, group_by=None):
+        rows = await db_operations.get_statistics(
+            db, classroom_id, "2024-12-31", "2024-01-01", None, bucket, group_by
+        )
+        columns = (
+            ["Bucket", "Group", "HomeworkCount"]
+            if group_by
+            else ["Bucket", "HomeworkCount"]
+        )
+
+        return [tuple(row[column] for column in columns) for row in rows]
+
+    assert await statistics("week") == [
+        ("2024-01-01", 2),
+        ("2024-01-08", 1),
+        ("2024-02-26", 1),
+    ]
+    assert await statistics("month", "subject") == [
+        ("2024-01", "Mathematics", 2),
+        ("2024-01", "Science", 1),
+        ("2024-02", "Mathematics", 1),
+    ]
+
+
+async def get_titles(db, classroom_id, homework_ids):
+    return [
+        (await db_operations.get_homework(db, classroom_id, homework_id))["Title"]
+        for homework_id in homework_ids
+    ]
+
+
+class InterleavingDB:
+    # runs another coroutine, in its own task and so on its own connection,
+    # right after the first statement sent through it
+    def __init__(self, db, interleaved):
+        self.db = db
+        self.interleaved = interleaved
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    async def interleave(self):
+        if self.interleaved is not None:
+            interleaved, self.interleaved = self.interleaved, None
+            await asyncio.create_task(interleaved)
+
+    async def execute(self, query, values=None):
+        result = await self.db.execute(query, values)
+        await self.interleave()
+        return result
+
+    async def execute_many(self, query, values):
+        await self.db.execute_many(query, values)
+        await self.interleave()
+
+    async def fetch_all(self, query, values=None):
+        result = await self.db.fetch_all(query, values)
+        await self.interleave()
+        return result
+
+
+async def test_bulk_ids_ignore_rows_committed_meanwhile(db):
+    if db.dialect == "sqlite":
+        pytest.skip("sqlite has a single writer, nothing can commit in between")
+
+    classroom_id = await add_classroom(db)
+
+    titles = [f"worksheet {index}" for index in range(5)]
+    homework_ids = await db_operations.add_homeworks(
+        InterleavingDB(
+            db,
+            db_operations.add_homeworks(
+                db, classroom_id, [make_homework("meanwhile") for _ in range(3)]
+            ),
+        ),
+        classroom_id,
+        [make_homework(title) for title in titles],
+    )
+
+    assert await get_titles(db, classroom_id, homework_ids) == titles
+
+
+async def test_bulk_insert_is_one_statement(db, monkeypatch):
+    if db.dialect == "sqlite":
+        pytest.skip("sqlite inserts through executemany")
+
+    classroom_id = await add_classroom(db)
+
+    statements = []
+    monkeypatch.setattr(
+        db,
+        "query_observer",
+        lambda function, method, _: statements.append((function, method)),
+    )
+
+    titles = [f"worksheet {index}" for index in range(2500)]
+    homework_ids = await db_operations.add_homeworks(
+        db, classroom_id, [make_homework(title) for title in titles]
+    )
+
+    assert statements.count(("add_homeworks", "fetch_all")) == 1
+    assert ("add_homeworks", "execute") not in statements
+    assert await get_titles(db, classroom_id, homework_ids) == titles
+
+
+async def test_bulk_ids_match_their_homeworks_under_concurrency(db):
+    classroom_id = await add_classroom(db)
+
+    async def add(writer):
+        titles = [f"{writer} {index}" for index in range(20)]
+        homework_ids = await db_operations.add_homeworks(
+            db, classroom_id, [make_homework(title) for title in titles]
+        )
+        return titles, homework_ids
+
+    # concurrent writers into the same classroom
+    results = await asyncio.gather(*(add(writer) for writer in "abcd"))
+
+    for titles, homework_ids in results:
+        assert await get_titles(db, classroom_id, homework_ids) == titles
+
+
+async def test_batch_ids_follow_the_input_order(db):
+    first_classroom_id = await add_classroom(db)
+    second_classroom_id = await add_classroom(db)
+
+    pairs = [
+        (first_classroom_id, make_homework("first a")),
+        (second_classroom_id, make_homework("second a")),
+        (first_classroom_id, make_homework("first b")),
+        (second_classroom_id, make_homework("second b")),
+    ]
+    homework_ids = await db_operations.add_homeworks_batch(db, pairs)
+
+    assert [
+        (await get_titles(db, classroom_id, [homework_id]))[0]
+        for (classroom_id, _), homework_id in zip(pairs, homework_ids)
+    ] == [homework["title"] for _, homework in pairs]
@@ -0,0 +1,91 @@
+import pytest
+
+from homework_api import db_operations
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def version_queries(monkeypatch):
+    calls = []
+    get_classroom_version = db_operations.get_classroom_version
+
+    async def counting_get_classroom_version(db, classroom_id):
+        calls.append(classroom_id)
+        return await get_classroom_version(db, classroom_id)
+
+    monkeypatch.setattr(
+        db_operations, "get_classroom_version", counting_get_classroom_version
+    )
+
+    return calls
+
+
+READS = [
+    ("/homework/list", {"count": 5}),
+    ("/homework/search", {"query": "worksheet"}),
+    ("/homework/statistics", {"assigned_after_date": "2024-01-01"}),
+]
+
+
+@pytest.mark.parametrize("path, body", READS)
+async def test_cache_miss_reads_the_version_with_the_rows(
+    client, version_queries, path, body
+):
+    classroom_secret = await create_classroom(client)
+    await add_homeworks(client, classroom_secret, [make_homework("worksheet")])
+
+    response = await client.post(
+        path,
+        json={
+            "classroom_secret": classroom_secret,
+            "assigned_before_date": "2024-12-31",
+            **body,
+        },
+    )
+    assert response.json()["response"]["error"] is None
+    assert version_queries == []
+
+    # the etag of the rows is the one a conditional request compares with
+    conditional = await client.post(
+        path,
+        json={
+            "classroom_secret": classroom_secret,
+            "assigned_before_date": "2024-12-31",
+            **body,
+        },
+        headers={"If-None-Match": response.headers["ETag"]},
+    )
+    assert conditional.status_code == 304
+
+
+async def test_single_homework_etag(client, version_queries):
+    classroom_secret = await create_classroom(client)
+    [homework_id] = await add_homeworks(
+        client, classroom_secret, [make_homework("worksheet")]
+    )
+
+    found = await client.post(
+        "/homework/get",
+        json={"classroom_secret": classroom_secret, "homework_id": str(homework_id)},
+    )
+    assert version_queries == []
+
+    # nothing to read the version from, so it is asked for
+    missing = await client.post(
+        "/homework/get",
+        json={"classroom_secret": classroom_secret, "homework_id": "999999"},
+    )
+    assert missing.json()["response"]["error"] == "HOMEWORK_NOT_FOUND"
+    assert len(version_queries) == 1
+
+    await add_homeworks(client, classroom_secret, [make_homework("another")])
+    conditional = await client.post(
+        "/homework/get",
+        json={"classroom_secret": classroom_secret, "homework_id": str(homework_id)},
+        headers={"If-None-Match": found.headers["ETag"]},
+    )
+    assert conditional.status_code == 200
+    assert conditional.headers["ETag"] != found.headers["ETag"]
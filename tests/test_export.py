@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+
+import pytest
+
+from homework_api import config
+from homework_api.routers import homework
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+async def export(client, classroom_secret, **body):
+    return await client.post(
+        "/homework/export", json={"classroom_secret": classroom_secret, **body}
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [2, 3, 500])
+async def test_export_ndjson_walks_every_chunk(client, monkeypatch, chunk_size):
+    # 7 rows do not divide evenly into chunks of 2, and fill chunks of 3 twice
+    monkeypatch.setattr(config, "EXPORT_CHUNK_SIZE", chunk_size)
+
+    classroom_secret = await create_classroom(client)
+    homework_ids = await add_homeworks(
+        client,
+        classroom_secret,
+        [make_homework(f"worksheet {index}") for index in range(7)],
+    )
+    other_secret = await create_classroom(client)
+    await add_homeworks(client, other_secret, [make_homework("other")])
+
+    response = await export(client, classroom_secret)
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["homework_id"] for row in rows] == sorted(homework_ids, reverse=True)
+    assert list(rows[0]) == list(homework.EXPORT_FIELDS)
+    assert rows[-1]["title"] == "worksheet 0"
+
+
+async def test_export_csv(client, monkeypatch):
+    monkeypatch.setattr(config, "EXPORT_CHUNK_SIZE", 2)
+
+    classroom_secret = await create_classroom(client)
+    homework_ids = await add_homeworks(
+        client,
+        classroom_secret,
+        [
+            make_homework("old", assigned_date="2023-11-01"),
+            {**make_homework("comma, and quote"), "description": 'say "hi", then go'},
+            make_homework("new"),
+        ],
+    )
+
+    response = await export(
+        client, classroom_secret, format="csv", assigned_after_date="2024-01-01"
+    )
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="homeworks.csv"' in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["homework_id"]) for row in rows] == homework_ids[:0:-1]
+    assert rows[1]["title"] == "comma, and quote"
+    assert rows[1]["description"] == 'say "hi", then go'
+
+
+async def test_export_empty_csv_has_a_header(client):
+    classroom_secret = await create_classroom(client)
+
+    response = await export(client, classroom_secret, format="csv")
+
+    assert response.text.splitlines() == [",".join(homework.EXPORT_FIELDS)]
+
+
+async def test_export_rejects_bad_requests(client):
+    classroom_secret = await create_classroom(client)
+
+    response = await export(client, classroom_secret, format="xml")
+    assert response.json()["response"]["error"] == "EXPORT_FORMAT_INVALID"
+
+    response = await export(client, classroom_secret, due_before_date="2024-02-30")
+    assert response.json()["response"]["error"] == "DATE_INVALID"
+
+    response = await export(client, "0" * 64)
+    assert response.json()["response"]["error"] is not None
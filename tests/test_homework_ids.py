@@ -0,0 +1,76 @@
+import pytest
+
+from homework_api import utils
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("42", 42),
+        ("0042", 42),
+        ("²", None),
+        ("٤٢", None),
+        ("-1", None),
+        ("0", None),
+        (" 42", None),
+        ("", None),
+        (str(utils.MAX_ID), utils.MAX_ID),
+        (str(utils.MAX_ID + 1), None),
+        ("9" * 40, None),
+    ],
+)
+def test_parse_homework_id(value, expected):
+    assert utils.parse_homework_id(value) == expected
+
+
+def test_cursor_ids_stay_in_range():
+    filter_hash = "hash"
+
+    assert utils.decode_cursor(utils.encode_cursor(7, filter_hash)) == (7, filter_hash)
+    assert utils.decode_cursor(utils.encode_cursor(2**40, filter_hash)) is None
+
+
+@pytest.mark.parametrize("homework_id", ["²", "9" * 40, "abc"])
+async def test_get_unknown_homework_id(client, homework_id):
+    classroom_secret = await create_classroom(client)
+
+    response = await client.post(
+        "/homework/get",
+        json={"classroom_secret": classroom_secret, "homework_id": homework_id},
+    )
+
+    assert response.json()["response"]["error"] == "HOMEWORK_NOT_FOUND"
+
+
+async def test_out_of_range_ids_are_not_found(client):
+    classroom_secret = await create_classroom(client)
+    [homework_id] = await add_homeworks(
+        client, classroom_secret, [make_homework("worksheet")]
+    )
+
+    removed = await client.post(
+        "/homework/remove",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": "hunter22",
+            "homework_id": 2**40,
+        },
+    )
+    assert removed.json()["response"]["error"] == "HOMEWORK_NOT_FOUND"
+
+    removed = await client.post(
+        "/homework/remove_bulk",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": "hunter22",
+            "homework_ids": [homework_id, 2**40],
+        },
+    )
+    assert removed.json()["response"]["context"] == {
+        "deleted_homework_ids": [homework_id],
+        "not_found_homework_ids": [2**40],
+    }
@@ -0,0 +1,120 @@
+import io
+
+import pytest
+
+from homework_api import config, db_operations, importer
+
+from .conftest import create_classroom
+
+pytestmark = pytest.mark.anyio
+
+HEADER = "subject,teacher,title,description,assigned_date,due_date\n"
+
+
+def read(content, import_format="csv"):
+    return list(
+        importer.iter_records(io.BytesIO(content.encode("utf8")), import_format)
+    )
+
+
+def test_oversized_csv_field_fails_only_its_row():
+    records = read(
+        HEADER
+        + "Mathematics,Somchai,first,,2024-01-15,2024-02-01\n"
+        + f"Mathematics,Somchai,{'x' * 200 * 1024},,2024-01-15,2024-02-01\n"
+        + "Mathematics,Somchai,third,,2024-01-15,2024-02-01\n"
+    )
+
+    assert [(row_number, error) for row_number, _, error in records] == [
+        (1, None),
+        (2, "ROW_INVALID"),
+        (3, None),
+    ]
+    assert records[2][1]["title"] == "third"
+
+
+def test_unparsable_csv_header():
+    assert read(f"{'x' * 200 * 1024}\nMathematics\n") == [(1, None, "ROW_INVALID")]
+
+
+def test_invalid_ndjson_line():
+    records = read('{"title": "first"}\nnot json\n\n{"title": "third"}\n', "ndjson")
+
+    assert [(row_number, error) for row_number, _, error in records] == [
+        (1, None),
+        (2, "ROW_INVALID"),
+        (3, None),
+    ]
+
+
+async def test_import_reports_oversized_rows(client):
+    classroom_secret = await create_classroom(client)
+
+    content = (
+        HEADER
+        + "Mathematics,Somchai,first,,2024-01-15,2024-02-01\n"
+        + f"Mathematics,Somchai,{'x' * 200 * 1024},,2024-01-15,2024-02-01\n"
+        + "Mathematics,Somchai,third,,2024-01-15,2024-02-01\n"
+    )
+    response = await client.post(
+        "/homework/import",
+        data={"classroom_secret": classroom_secret, "classroom_password": "hunter22"},
+        files={"file": ("homeworks.csv", content.encode("utf8"), "text/csv")},
+    )
+    context = response.json()["response"]["context"]
+    assert (context["created"], context["failed"]) == (2, 1)
+
+    report = await client.post(
+        "/homework/import/report",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": "hunter22",
+            "report_token": context["report_token"],
+        },
+    )
+    assert report.text.splitlines() == ["row,error", "2,ROW_INVALID"]
+
+
+async def test_failed_import_drops_cached_reads(client, monkeypatch):
+    classroom_secret = await create_classroom(client)
+
+    async def listed_titles():
+        response = await client.post(
+            "/homework/list", json={"classroom_secret": classroom_secret}
+        )
+        return [
+            homework["title"]
+            for homework in response.json()["response"]["context"]["homeworks"]
+        ]
+
+    # cached while the classroom is still empty
+    assert await listed_titles() == []
+
+    monkeypatch.setattr(config, "IMPORT_CHUNK_SIZE", 2)
+    add_homeworks = db_operations.add_homeworks
+    calls = []
+
+    async def failing_add_homeworks(db, classroom_id, homeworks):
+        calls.append(len(homeworks))
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        return await add_homeworks(db, classroom_id, homeworks)
+
+    monkeypatch.setattr(db_operations, "add_homeworks", failing_add_homeworks)
+
+    content = HEADER + "".join(
+        f"Mathematics,Somchai,worksheet {index},,2024-01-15,2024-02-01\n"
+        for index in range(4)
+    )
+    with pytest.raises(RuntimeError):
+        await client.post(
+            "/homework/import",
+            data={
+                "classroom_secret": classroom_secret,
+                "classroom_password": "hunter22",
+            },
+            files={"file": ("homeworks.csv", content.encode("utf8"), "text/csv")},
+        )
+
+    # the first chunk was committed and is visible right away
+    assert await listed_titles() == ["worksheet 1", "worksheet 0"]
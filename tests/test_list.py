@@ -0,0 +1,97 @@
+import pytest
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+async def list_homeworks(client, classroom_secret, **body):
+    response = await client.post(
+        "/homework/list", json={"classroom_secret": classroom_secret, **body}
+    )
+
+    return response.json()
+
+
+async def test_cursor_walks_every_homework_once(client):
+    classroom_secret = await create_classroom(client)
+    homework_ids = await add_homeworks(
+        client,
+        classroom_secret,
+        [make_homework(f"worksheet {index}") for index in range(25)],
+    )
+
+    seen = []
+    pages = 0
+    cursor = None
+    while True:
+        body = await list_homeworks(
+            client, classroom_secret, count=10, **({"cursor": cursor} if cursor else {})
+        )
+        context = body["response"]["context"]
+        seen += [homework["homework_id"] for homework in context["homeworks"]]
+        pages += 1
+
+        # rows added while paging do not shift the following pages
+        if pages == 1:
+            await add_homeworks(client, classroom_secret, [make_homework("late")])
+
+        # pages reached by cursor have no page number
+        assert context["page"] == (1 if cursor is None else None)
+        assert context["max_page"] == 3
+
+        cursor = context["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == sorted(homework_ids, reverse=True)
+
+
+async def test_cursor_and_page_agree(client):
+    classroom_secret = await create_classroom(client)
+    await add_homeworks(
+        client,
+        classroom_secret,
+        [make_homework(f"worksheet {index}") for index in range(12)],
+    )
+
+    first_page = await list_homeworks(client, classroom_secret, count=5, page=1)
+    second_page = await list_homeworks(client, classroom_secret, count=5, page=2)
+    second_by_cursor = await list_homeworks(
+        client,
+        classroom_secret,
+        count=5,
+        cursor=first_page["response"]["context"]["next_cursor"],
+    )
+
+    assert (
+        second_by_cursor["response"]["context"]["homeworks"]
+        == second_page["response"]["context"]["homeworks"]
+    )
+    assert first_page["response"]["context"]["max_page"] == 3
+    assert second_by_cursor["response"]["context"]["max_page"] == 3
+
+
+async def test_cursor_is_bound_to_its_filters(client):
+    classroom_secret = await create_classroom(client)
+    await add_homeworks(
+        client,
+        classroom_secret,
+        [make_homework(f"worksheet {index}") for index in range(3)],
+    )
+
+    first_page = await list_homeworks(client, classroom_secret, count=2)
+    cursor = first_page["response"]["context"]["next_cursor"]
+
+    filtered = await list_homeworks(
+        client,
+        classroom_secret,
+        count=2,
+        cursor=cursor,
+        assigned_after_date="2024-01-01",
+    )
+    assert filtered["response"]["error"] == "CURSOR_INVALID"
+
+    garbage = await list_homeworks(client, classroom_secret, count=2, cursor="%%%")
+    assert garbage["response"]["error"] == "CURSOR_INVALID"
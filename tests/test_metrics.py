@@ -0,0 +1,120 @@
+import pytest
+
+from homework_api import config, db_operations, metrics
+from homework_api.database.database_manager import DB
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+def sample(text, name, **labels):
+    # value of one exposed sample, 0 when it has not been exported yet
+    prefix = name + metrics.format_labels(tuple(labels), tuple(labels.values()))
+
+    for line in text.splitlines():
+        if line.startswith(prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+
+    return 0
+
+
+def test_histogram_render():
+    histogram = metrics.HistogramMetric(
+        "test_seconds", "Test.", ("route",), buckets=(0.1, 1.0)
+    )
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.1, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(3.0, "/a")
+
+    assert histogram.render() == [
+        "# HELP test_seconds Test.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_seconds_bucket{route="/a",le="1.0"} 3',
+        'test_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_seconds_sum{route="/a"} 3.65',
+        'test_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = metrics.CounterMetric("test_total", "Test.", ("route",))
+    counter.inc('/a"b\\c\nd')
+
+    assert counter.render()[-1] == 'test_total{route="/a\\"b\\\\c\\nd"} 1'
+
+
+async def test_metrics_endpoint(client, monkeypatch):
+    # the unauthenticated list below is counted as a 200 only in the default mode
+    monkeypatch.setattr(config, "HTTP_STATUS_CODES", False)
+
+    classroom_secret = await create_classroom(client)
+    await add_homeworks(client, classroom_secret, [make_homework("worksheet")])
+
+    before = (await client.get("/metrics")).text
+
+    for _ in range(2):
+        await client.post("/homework/list", json={"classroom_secret": classroom_secret})
+    await client.post("/homework/list", json={})
+    await client.get("/no/such/route")
+
+    response = await client.get("/metrics")
+    after = response.text
+
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+
+    def delta(name, **labels):
+        return sample(after, name, **labels) - sample(before, name, **labels)
+
+    list_labels = {"method": "POST", "route": "/homework/list"}
+    assert delta("homework_api_http_requests_total", **list_labels, status="200") == 3
+    assert delta("homework_api_http_request_duration_seconds_count", **list_labels) == 3
+    assert (
+        delta(
+            "homework_api_http_requests_total",
+            method="GET",
+            route="unmatched",
+            status="404",
+        )
+        == 1
+    )
+
+    # only the scrape itself is in flight
+    assert sample(after, "homework_api_http_requests_in_flight") == 1
+
+    # the repeated list may be answered by the response cache
+    assert (
+        delta(
+            "homework_api_db_query_duration_seconds_count",
+            function="get_homeworks",
+            method="fetch_all",
+        )
+        >= 1
+    )
+
+    # pool and cache stats are read when scraped
+    assert "homework_api_db_pool_read_acquisitions" in after
+    assert sample(after, "homework_api_cache_hits", cache="classroom") > 0
+
+
+async def test_queries_are_labelled_by_caller(tmp_path):
+    observed = []
+
+    database = DB(
+        f"sqlite:///{tmp_path / 'homework_api.db'}",
+        read_pool_size=1,
+        query_observer=lambda *args: observed.append(args),
+    )
+    await database.connect()
+    try:
+        await db_operations.create_table(database)
+        await db_operations.get_classroom(database, "missing")
+    finally:
+        await database.disconnect()
+
+    assert ("create_table", "execute") in [entry[:2] for entry in observed]
+    function, method, seconds = observed[-1]
+    assert (function, method) == ("get_classroom", "fetch_one")
+    assert seconds >= 0
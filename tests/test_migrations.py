@@ -0,0 +1,108 @@
+import logging
+
+import pytest
+
+from homework_api import db_operations
+from homework_api.database import migrations
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_migrations_are_idempotent(db):
+    # the fixture has already migrated the database once
+    assert await migrations.run_migrations(db) == []
+    assert await migrations.get_applied_versions(db) == {
+        migration.version for migration in migrations.MIGRATIONS
+    }
+
+
+async def test_lookup_indexes_exist(sqlite_db):
+    rows = await sqlite_db.fetch_all(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+    )
+
+    assert {row[0] for row in rows} >= {
+        "idx_classrooms_secret",
+        "idx_homeworks_classroom_homework",
+        "idx_homeworks_classroom_assigned",
+        "idx_homeworks_classroom_due",
+        "idx_homeworks_classroom_subject",
+    }
+
+
+async def test_failed_migration_is_not_recorded(db):
+    broken = migrations.Migration(
+        version=1000,
+        description="broken",
+        statements=[
+            "CREATE TABLE migration_test (Value INTEGER)",
+            "THIS IS NOT SQL",
+        ],
+    )
+
+    with pytest.raises(Exception):
+        await migrations.run_migrations(db, [broken])
+
+    assert 1000 not in await migrations.get_applied_versions(db)
+
+    # the statement before the failure was rolled back with it
+    fixed = migrations.Migration(
+        version=1000,
+        description="fixed",
+        statements=["CREATE TABLE migration_test (Value INTEGER)"],
+    )
+    assert await migrations.run_migrations(db, [fixed]) == [1000]
+    await db.execute("DROP TABLE migration_test")
+
+
+async def test_other_dialects_only_record_the_version(db):
+    skipped = migrations.Migration(
+        version=1001,
+        description="for another dialect",
+        statements=["THIS IS NOT SQL"],
+        dialects=["mysql"],
+    )
+
+    assert await migrations.run_migrations(db, [skipped]) == [1001]
+    assert 1001 in await migrations.get_applied_versions(db)
+
+
+async def test_duplicate_secrets_are_reissued(db, caplog):
+    # a database from before migration 1, when secrets could collide
+    await db.execute("DROP INDEX idx_classrooms_secret")
+    await db.execute("DELETE FROM schema_migrations WHERE Version = 1")
+
+    classroom_ids = []
+    for classroom_secret in ["shared", "shared", "unique", "shared"]:
+        await db.execute(
+            """
+            INSERT INTO classrooms(ClassroomSecret, ClassroomPassword, ClassroomName)
+            VALUES (:secret, 'hash', '4/5')
+            """,
+            {"secret": classroom_secret},
+        )
+        classroom_ids.append(
+            (await db.fetch_one('SELECT MAX(ClassroomID) AS "ID" FROM classrooms'))[
+                "ID"
+            ]
+        )
+
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"):
+        assert await migrations.run_migrations(db) == [1]
+
+    rows = await db.fetch_all(
+        """
+        SELECT ClassroomID AS "ClassroomID", ClassroomSecret AS "ClassroomSecret"
+        FROM classrooms ORDER BY ClassroomID
+        """
+    )
+    secrets = [row["ClassroomSecret"] for row in rows]
+
+    assert secrets[0] == "shared"
+    assert secrets[2] == "unique"
+    assert len(set(secrets)) == 4
+    assert f"ClassroomID {classroom_ids[1]}, {classroom_ids[3]}" in caplog.text
+
+    # the oldest classroom is still found by its secret
+    classroom = await db_operations.get_classroom(db, "shared")
+    assert classroom["ClassroomID"] == classroom_ids[0]
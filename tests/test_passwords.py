@@ -0,0 +1,118 @@
+import hashlib
+import secrets
+import threading
+
+import pytest
+
+from homework_api import auth, config, db_operations
+
+pytestmark = pytest.mark.anyio
+
+
+def legacy_hash(classroom_password):
+    return hashlib.sha256(classroom_password.encode("utf8")).hexdigest()
+
+
+def test_scrypt_hash_roundtrip():
+    encrypted_password = auth.hash_password_sync("hunter22")
+
+    assert encrypted_password.split("$")[:4] == [
+        "scrypt",
+        str(config.PASSWORD_SCRYPT_N),
+        str(config.PASSWORD_SCRYPT_R),
+        str(config.PASSWORD_SCRYPT_P),
+    ]
+    assert auth.verify_password_sync(encrypted_password, "hunter22") == (True, False)
+    assert auth.verify_password_sync(encrypted_password, "hunter23") == (False, False)
+
+    # salted, the same password never hashes the same twice
+    assert auth.hash_password_sync("hunter22") != encrypted_password
+
+
+def test_legacy_hash_needs_rehash():
+    assert auth.verify_password_sync(legacy_hash("hunter22"), "hunter22") == (
+        True,
+        True,
+    )
+    assert auth.verify_password_sync(legacy_hash("hunter22"), "hunter23") == (
+        False,
+        False,
+    )
+
+
+def test_outdated_parameters_need_rehash(monkeypatch):
+    encrypted_password = auth.hash_password_sync("hunter22")
+    monkeypatch.setattr(config, "PASSWORD_SCRYPT_N", config.PASSWORD_SCRYPT_N * 2)
+
+    assert auth.verify_password_sync(encrypted_password, "hunter22") == (True, True)
+    assert auth.verify_password_sync(encrypted_password, "hunter23") == (False, False)
+
+
+async def test_hashing_runs_on_the_password_threads(monkeypatch):
+    thread_names = []
+
+    def hash_password_sync(classroom_password):
+        thread_names.append(threading.current_thread().name)
+        return "hashed"
+
+    monkeypatch.setattr(auth, "hash_password_sync", hash_password_sync)
+
+    assert await auth.hash_password("hunter22") == "hashed"
+    assert thread_names[0].startswith("password")
+    assert thread_names[0] != threading.current_thread().name
+
+
+async def add_classroom(db, encrypted_password):
+    classroom_secret = secrets.token_hex(32)
+    await db_operations.add_classroom(db, classroom_secret, encrypted_password, "4/5")
+
+    return classroom_secret
+
+
+async def test_legacy_password_is_rehashed_on_login(db):
+    classroom_secret = await add_classroom(db, legacy_hash("hunter22"))
+
+    assert await auth.verify_classroom(db, classroom_secret, "hunter23") is None
+    stored = await db_operations.get_classroom(db, classroom_secret)
+    assert stored["ClassroomPassword"] == legacy_hash("hunter22")
+
+    classroom = await auth.verify_classroom(db, classroom_secret, "hunter22")
+    assert classroom["ClassroomID"] == stored["ClassroomID"]
+
+    stored = await db_operations.get_classroom(db, classroom_secret)
+    assert stored["ClassroomPassword"].startswith("scrypt$")
+    assert auth.verify_password_sync(stored["ClassroomPassword"], "hunter22") == (
+        True,
+        False,
+    )
+
+    # the new hash is what the caches and later logins see
+    auth.invalidate_classroom(classroom_secret)
+    classroom = await auth.verify_classroom(db, classroom_secret, "hunter22")
+    assert classroom["ClassroomPassword"] == stored["ClassroomPassword"]
+    assert await auth.verify_classroom(db, classroom_secret, "hunter23") is None
+
+
+async def test_verified_credentials_are_cached(db, monkeypatch):
+    classroom_secret = await add_classroom(db, auth.hash_password_sync("hunter22"))
+
+    verified = []
+    verify_password = auth.verify_password
+
+    async def counting_verify_password(encrypted_password, classroom_password):
+        verified.append(classroom_password)
+        return await verify_password(encrypted_password, classroom_password)
+
+    monkeypatch.setattr(auth, "verify_password", counting_verify_password)
+
+    for _ in range(3):
+        assert await auth.verify_classroom(db, classroom_secret, "hunter22")
+        # failures are never cached
+        assert await auth.verify_classroom(db, classroom_secret, "hunter23") is None
+
+    assert verified == ["hunter22", "hunter23", "hunter23", "hunter23"]
+
+    # a changed password must not be answered from the cache
+    auth.invalidate_classroom(classroom_secret)
+    assert await auth.verify_classroom(db, classroom_secret, "hunter22")
+    assert verified[-1] == "hunter22"
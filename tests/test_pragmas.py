@@ -0,0 +1,51 @@
+import pytest
+
+from homework_api.database.database_manager import DB
+from homework_api.database.pragmas import get_pragmas, parse_pragma_overrides
+
+pytestmark = pytest.mark.anyio
+
+
+def test_overrides_replace_profile_values():
+    pragmas = get_pragmas("balanced", "synchronous=FULL, cache_size=-4000")
+
+    assert pragmas["synchronous"] == "FULL"
+    assert pragmas["cache_size"] == -4000
+    assert pragmas["journal_mode"] == "WAL"
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    ["synchronous", "synchronous=FULL; DROP TABLE homeworks", "cache size=1", "a=²"],
+)
+def test_invalid_overrides(overrides):
+    with pytest.raises(ValueError):
+        parse_pragma_overrides(overrides)
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError, match="unknown sqlite profile"):
+        get_pragmas("turbo")
+
+
+async def test_every_connection_gets_the_pragmas(tmp_path):
+    database = DB(
+        f"sqlite:///{tmp_path / 'homework_api.db'}",
+        read_pool_size=2,
+        pragmas=get_pragmas("durable", "cache_size=-4000"),
+    )
+    await database.connect()
+
+    try:
+        effective = await database.get_pragmas()
+
+        async with database.reader() as reader:
+            reader_synchronous = (await reader.fetch_one("PRAGMA synchronous"))[0]
+    finally:
+        await database.disconnect()
+
+    assert effective["journal_mode"] == "wal"
+    # FULL
+    assert effective["synchronous"] == 2
+    assert effective["cache_size"] == -4000
+    assert reader_synchronous == 2
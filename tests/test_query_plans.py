@@ -0,0 +1,251 @@
+import inspect
+import re
+import sys
+
+import pytest
+
+from homework_api import db_operations
+
+from .conftest import add_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+# a full scan of one of our tables in an EXPLAIN QUERY PLAN detail line
+FULL_SCAN = re.compile(
+    r"^SCAN (TABLE )?(classrooms|homeworks|homework_daily_stats)( |$)"
+)
+
+# schema statements are not queries
+NOT_QUERIES = {"create_table", "create_search_index"}
+
+
+class RecordingDB:
+    # passes everything on to the real database and keeps every statement
+    # sent by db_operations
+    def __init__(self, db):
+        self.db = db
+        self.statements = []
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def record(self, query, values):
+        self.statements.append((sys._getframe(2).f_code.co_name, query, values))
+
+    async def execute(self, query, values=None):
+        self.record(query, values)
+        return await self.db.execute(query, values)
+
+    async def execute_many(self, query, values):
+        self.record(query, values[0])
+        return await self.db.execute_many(query, values)
+
+    async def fetch_one(self, query, values=None):
+        self.record(query, values)
+        return await self.db.fetch_one(query, values)
+
+    async def fetch_all(self, query, values=None):
+        self.record(query, values)
+        return await self.db.fetch_all(query, values)
+
+
+def is_planned(query):
+    # plain inserts of literal values never read a table
+    statement = " ".join(query.split()).upper()
+    return not statement.startswith("INSERT") or " SELECT " in statement
+
+
+async def get_plan(db, query, values):
+    rows = await db.fetch_all(f"EXPLAIN QUERY PLAN {query}", values)
+
+    return [row[3] for row in rows]
+
+
+async def exercise(db, classroom_id):
+    criteria = dict(
+        assigned_before_date="2024-12-31",
+        assigned_after_date="2024-01-01",
+        due_before_date="2024-12-31",
+        due_after_date="2024-01-01",
+    )
+
+    homework_id = await db_operations.add_homework(
+        db, classroom_id, "Science", "Suda", "lab", "", "2024-01-10", "2024-01-20"
+    )
+    homework_ids = await db_operations.add_homeworks(
+        db, classroom_id, [make_homework(f"worksheet {index}") for index in range(5)]
+    )
+    await db_operations.add_homeworks_batch(
+        db, [(classroom_id, make_homework("batched"))]
+    )
+    await db_operations.add_classrooms(
+        db,
+        [
+            {
+                "classroom_secret": "secret",
+                "encrypted_password": "hash",
+                "classroom_name": "4/6",
+            }
+        ],
+    )
+
+    calls = {
+        "add_classroom": lambda: db_operations.add_classroom(
+            db, "another secret", "hash", "4/8"
+        ),
+        "update_classroom_password": lambda: db_operations.update_classroom_password(
+            db, classroom_id, "new hash"
+        ),
+        "get_classroom": lambda: db_operations.get_classroom(db, "secret"),
+        "get_teacher": lambda: db_operations.get_teacher(
+            db, classroom_id, "Mathematics"
+        ),
+        "get_teachers": lambda: db_operations.get_teachers(
+            db, classroom_id, ["Mathematics", "Science"]
+        ),
+        "get_homework": lambda: db_operations.get_homework(
+            db, classroom_id, homework_id
+        ),
+        "get_homeworks": lambda: db_operations.get_homeworks(
+            db,
+            classroom_id,
+            db_operations.getHomeworksCriteria(count=10, offset=0, **criteria),
+        ),
+        "get_homeworks_count": lambda: db_operations.get_homeworks_count(
+            db,
+            classroom_id,
+            db_operations.getHomeworksCountCriteria(**criteria),
+        ),
+        "search_homeworks": lambda: db_operations.search_homeworks(
+            db,
+            classroom_id,
+            db_operations.searchHomeworksCriteria(
+                query="work", count=10, offset=0, **criteria
+            ),
+        ),
+        "get_classroom_version": lambda: db_operations.get_classroom_version(
+            db, classroom_id
+        ),
+        "bump_classroom_version": lambda: db_operations.bump_classroom_version(
+            db, classroom_id
+        ),
+        "adjust_daily_stats": lambda: db_operations.adjust_daily_stats(
+            db, classroom_id, [("Mathematics", "2024-01-15")], -1
+        ),
+        "rebuild_daily_stats": lambda: db_operations.rebuild_daily_stats(
+            db, classroom_id
+        ),
+        "update_homeworks": lambda: db_operations.update_homeworks(
+            db,
+            classroom_id,
+            db_operations.homeworksFilter(subject="Mathematics", **criteria),
+            {"Subject": "Thai", "DueDate": "2024-03-01"},
+        ),
+        "get_statistics": lambda: db_operations.get_statistics(
+            db, classroom_id, "2024-12-31", "2024-01-01", "Thai", "week", "subject"
+        ),
+        "remove_homework": lambda: db_operations.remove_homework(
+            db, classroom_id, homework_id
+        ),
+        "remove_homeworks": lambda: db_operations.remove_homeworks(
+            db,
+            classroom_id,
+            db_operations.homeworksFilter(homework_ids=homework_ids[:2]),
+        ),
+    }
+
+    for call in calls.values():
+        await call()
+
+    # every variant of the dynamic queries
+    for extra in [
+        dict(before_homework_id=homework_ids[-1]),
+        dict(include_total=True),
+        dict(include_total=True, before_homework_id=homework_ids[-1]),
+    ]:
+        await db_operations.get_homeworks(
+            db,
+            classroom_id,
+            db_operations.getHomeworksCriteria(count=10, offset=0, **extra),
+        )
+
+    for bucket in db_operations.STATISTICS_BUCKETS["sqlite"]:
+        for group_by in [None, *db_operations.STATISTICS_GROUPS]:
+            await db_operations.get_statistics(
+                db, classroom_id, "2024-12-31", "2024-01-01", None, bucket, group_by
+            )
+
+    await db_operations.remove_homeworks(
+        db,
+        classroom_id,
+        db_operations.homeworksFilter(subject="Thai", **criteria),
+    )
+
+    return set(calls) | {
+        "insert_classroom",
+        "add_homework",
+        "add_homeworks",
+        "add_homeworks_batch",
+        "add_classrooms",
+    }
+
+
+async def test_every_query_uses_an_index(sqlite_db):
+    recording_db = RecordingDB(sqlite_db)
+    classroom_id = await add_classroom(sqlite_db)
+
+    # a second classroom, so a scan would have rows to skip
+    other_classroom_id = await add_classroom(sqlite_db)
+    await db_operations.add_homeworks(
+        sqlite_db,
+        other_classroom_id,
+        [make_homework(f"worksheet {index}") for index in range(50)],
+    )
+
+    exercised = await exercise(recording_db, classroom_id)
+
+    queries = {
+        name
+        for name, function in inspect.getmembers(
+            db_operations, inspect.iscoroutinefunction
+        )
+    }
+    assert exercised == queries - NOT_QUERIES
+
+    checked = 0
+    for caller, query, values in recording_db.statements:
+        if not is_planned(query):
+            continue
+
+        plan = await get_plan(sqlite_db, query, values)
+        checked += 1
+
+        full_scans = [detail for detail in plan if FULL_SCAN.match(detail)]
+        assert not full_scans, f"{caller} scans a table: {plan}\n{query}"
+
+    assert checked > 20
+
+
+async def test_list_total_keeps_the_index_order(sqlite_db):
+    recording_db = RecordingDB(sqlite_db)
+    classroom_id = await add_classroom(sqlite_db)
+
+    await db_operations.get_homeworks(
+        recording_db,
+        classroom_id,
+        db_operations.getHomeworksCriteria(
+            count=10,
+            offset=0,
+            assigned_after_date="2024-01-01",
+            before_homework_id=100,
+            include_total=True,
+        ),
+    )
+
+    [(_, query, values)] = recording_db.statements
+    plan = await get_plan(sqlite_db, query, values)
+
+    # the page is read straight off the index, never materialized and sorted
+    assert not [
+        detail for detail in plan if "TEMP B-TREE" in detail or "CO-ROUTINE" in detail
+    ], plan
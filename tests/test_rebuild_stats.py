@@ -0,0 +1,51 @@
+import pytest
+
+from homework_api import db_operations
+from homework_api.database import classroom_conn
+from homework_api.rebuild_stats import rebuild_statistics
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+async def get_statistics(client, classroom_secret):
+    response = await client.post(
+        "/homework/statistics",
+        json={
+            "classroom_secret": classroom_secret,
+            "assigned_before_date": "2024-12-31",
+            "assigned_after_date": "2024-01-01",
+        },
+    )
+
+    return response.json()["response"]["context"]
+
+
+async def test_rebuild_replaces_cached_statistics(client):
+    classroom_secret = await create_classroom(client)
+    await add_homeworks(client, classroom_secret, [make_homework("worksheet")])
+    classroom_id = (
+        await db_operations.get_classroom(classroom_conn, classroom_secret)
+    )["ClassroomID"]
+
+    # counters that drifted from the homeworks, and a response cached from them
+    await db_operations.adjust_daily_stats(
+        classroom_conn, classroom_id, [("Mathematics", "2024-01-15")], 4
+    )
+    assert await get_statistics(client, classroom_secret) == {"2024-01-15": 5}
+
+    assert await rebuild_statistics(classroom_conn, classroom_id) == 1
+
+    assert await get_statistics(client, classroom_secret) == {"2024-01-15": 1}
+
+
+async def test_rebuild_every_classroom(db):
+    classroom_ids = [
+        await db_operations.add_classroom(db, secret, "hash", "4/5")
+        for secret in ("first", "second")
+    ]
+
+    rebuilt = await db_operations.rebuild_daily_stats(db)
+
+    assert sorted(row["ClassroomID"] for row in rebuilt) == classroom_ids
@@ -0,0 +1,46 @@
+import pytest
+
+from homework_api.response_cache import (
+    KeyValueBackend,
+    LocalKeyValueStore,
+    MemoryBackend,
+    ResponseCache,
+)
+
+pytestmark = pytest.mark.anyio
+
+BODY = {"classroom_secret": "secret", "count": 10}
+
+PAYLOAD = {"response_code": 200, "response": {"context": {}, "error": None}}
+
+
+async def store(cache, classroom_id):
+    key, cached_response = await cache.lookup(classroom_id, "list", BODY)
+    assert cached_response is None
+
+    await cache.store(key, PAYLOAD, '"etag"')
+
+
+async def test_invalidation_reaches_every_worker_on_a_shared_store():
+    # two workers, one store
+    store_client = LocalKeyValueStore()
+    first_worker = ResponseCache(KeyValueBackend(store_client))
+    second_worker = ResponseCache(KeyValueBackend(store_client))
+
+    await store(first_worker, 1)
+    _, cached_response = await second_worker.lookup(1, "list", BODY)
+    assert cached_response is not None
+    assert cached_response.headers["ETag"] == '"etag"'
+
+    await first_worker.invalidate(1)
+    _, cached_response = await second_worker.lookup(1, "list", BODY)
+    assert cached_response is None
+
+
+async def test_memory_backend_is_per_process():
+    first_worker = ResponseCache(MemoryBackend(10))
+    second_worker = ResponseCache(MemoryBackend(10))
+
+    await store(first_worker, 1)
+    _, cached_response = await second_worker.lookup(1, "list", BODY)
+    assert cached_response is None
@@ -0,0 +1,135 @@
+import pytest
+
+from homework_api import db_operations
+from homework_api.database import run_migrations
+
+from .conftest import add_classroom, add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+# the search index as it was before migration 6
+OLD_SEARCH_INDEX = [
+    """CREATE VIRTUAL TABLE homeworks_fts USING fts5(
+           Title, Description, Subject, Teacher,
+           content='homeworks', content_rowid='HomeworkID', prefix='2 3'
+       )""",
+    """CREATE TRIGGER homeworks_fts_insert AFTER INSERT ON homeworks
+       BEGIN
+           INSERT INTO homeworks_fts(rowid, Title, Description, Subject, Teacher)
+           VALUES (new.HomeworkID, new.Title, new.Description, new.Subject, new.Teacher);
+       END""",
+]
+
+
+async def search(db, classroom_id, query):
+    homeworks = await db_operations.search_homeworks(
+        db,
+        classroom_id,
+        db_operations.searchHomeworksCriteria(query=query, count=50, offset=0),
+    )
+
+    return [homework["Title"] for homework in homeworks]
+
+
+async def test_search_stays_in_its_classroom(db):
+    classroom_id = await add_classroom(db)
+    other_classroom_id = await add_classroom(db)
+
+    await db_operations.add_homeworks(
+        db, classroom_id, [make_homework("fractions worksheet")]
+    )
+    await db_operations.add_homeworks(
+        db,
+        other_classroom_id,
+        [make_homework(f"fractions quiz {index}") for index in range(5)],
+    )
+
+    assert await search(db, classroom_id, "fract") == ["fractions worksheet"]
+    assert len(await search(db, other_classroom_id, "fract")) == 5
+
+
+async def test_search_does_not_match_the_classroom_id(sqlite_db):
+    classroom_ids = [await add_classroom(sqlite_db) for _ in range(12)]
+    classroom_id = classroom_ids[-1]
+
+    await db_operations.add_homeworks(
+        sqlite_db, classroom_id, [make_homework("fractions worksheet")]
+    )
+
+    # neither the id itself nor a prefix of it is searchable text
+    assert await search(sqlite_db, classroom_id, str(classroom_id)) == []
+    assert await search(sqlite_db, classroom_id, str(classroom_id)[0]) == []
+
+
+async def test_migration_rebuilds_an_unscoped_index(sqlite_db):
+    for statement in [
+        "DROP TRIGGER homeworks_fts_insert",
+        "DROP TRIGGER homeworks_fts_delete",
+        "DROP TRIGGER homeworks_fts_update",
+        "DROP TABLE homeworks_fts",
+        *OLD_SEARCH_INDEX,
+        "DELETE FROM schema_migrations WHERE Version = 6",
+    ]:
+        await sqlite_db.execute(statement)
+
+    classroom_id = await add_classroom(sqlite_db)
+    other_classroom_id = await add_classroom(sqlite_db)
+    await db_operations.add_homeworks(
+        sqlite_db, classroom_id, [make_homework("fractions worksheet")]
+    )
+    await db_operations.add_homeworks(
+        sqlite_db, other_classroom_id, [make_homework("fractions quiz")]
+    )
+
+    assert await run_migrations(sqlite_db) == [6]
+
+    assert await search(sqlite_db, classroom_id, "fract") == ["fractions worksheet"]
+
+    # the triggers were replaced too
+    await db_operations.add_homeworks(
+        sqlite_db, classroom_id, [make_homework("fractions test")]
+    )
+    assert sorted(await search(sqlite_db, classroom_id, "fract")) == [
+        "fractions test",
+        "fractions worksheet",
+    ]
+
+
+async def test_match_is_scoped_before_the_join(sqlite_db):
+    classroom_id = await add_classroom(sqlite_db)
+    other_classroom_id = await add_classroom(sqlite_db)
+
+    homework_ids = await db_operations.add_homeworks(
+        sqlite_db, classroom_id, [make_homework("fractions worksheet")]
+    )
+    await db_operations.add_homeworks(
+        sqlite_db,
+        other_classroom_id,
+        [make_homework(f"fractions quiz {index}") for index in range(5)],
+    )
+
+    # the full text index alone already leaves the other classroom out
+    matches = await sqlite_db.fetch_all(
+        "SELECT rowid FROM homeworks_fts WHERE homeworks_fts MATCH :match",
+        {"match": db_operations.build_search_match(classroom_id, "fract")},
+    )
+    assert [row[0] for row in matches] == homework_ids
+
+
+@pytest.mark.parametrize(
+    "paging", [{"count": -1}, {"count": 51}, {"page": -1}, {"count": 5, "page": -3}]
+)
+async def test_search_rejects_bad_paging(client, paging):
+    classroom_secret = await create_classroom(client)
+    await add_homeworks(
+        client,
+        classroom_secret,
+        [make_homework(f"worksheet {index}") for index in range(12)],
+    )
+
+    response = await client.post(
+        "/homework/search",
+        json={"classroom_secret": classroom_secret, "query": "worksheet", **paging},
+    )
+
+    assert response.json()["response"]["error"] == "TOO_MUCH_COUNT"
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from homework_api import db_operations, serialization
+from homework_api.error_response import ERROR_CONTENTS, ErrorResponse
+
+from .conftest import add_homeworks, create_classroom, make_homework
+
+pytestmark = pytest.mark.anyio
+
+PAYLOAD = {
+    "response_code": 200,
+    "response": {
+        "context": {
+            "homeworks": [
+                {"homework_id": 1, "title": 'การบ้าน "คณิต"', "description": None},
+            ],
+            "page": 1,
+            "max_page": 2.5,
+        },
+        "error": None,
+        "message": "Homeworks retrieved successfully",
+    },
+}
+
+
+def stdlib_dumps(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_is_compact_utf8(monkeypatch, use_orjson):
+    if use_orjson and serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+
+    assert serialization.dumps(PAYLOAD) == stdlib_dumps(PAYLOAD)
+
+
+def test_dumps_refuses_nan(monkeypatch):
+    monkeypatch.setattr(serialization, "orjson", None)
+
+    with pytest.raises(ValueError):
+        serialization.dumps({"value": float("nan")})
+
+
+def test_errors_are_serialized_once():
+    for member in ErrorResponse:
+        assert json.loads(ERROR_CONTENTS[member]) == member.value
+
+        response = member.response
+        assert response.body is ERROR_CONTENTS[member]
+        assert response.media_type == "application/json"
+
+
+def test_format_homework():
+    row = (7, 3, "Mathematics", "Somchai", "worksheet", "", "2024-01-15", "2024-02-01")
+
+    assert db_operations.HOMEWORK_FIELDS == (
+        "homework_id",
+        "subject",
+        "teacher",
+        "title",
+        "description",
+        "assigned_date",
+        "due_date",
+    )
+    assert dict(
+        zip(db_operations.HOMEWORK_FIELDS, db_operations.homework_values(row))
+    ) == {
+        "homework_id": 7,
+        "subject": "Mathematics",
+        "teacher": "Somchai",
+        "title": "worksheet",
+        "description": "",
+        "assigned_date": "2024-01-15",
+        "due_date": "2024-02-01",
+    }
+
+
+async def test_list_response_body(client):
+    classroom_secret = await create_classroom(client)
+    homework_ids = await add_homeworks(
+        client,
+        classroom_secret,
+        [make_homework("แบบฝึกหัด 1"), make_homework("worksheet 2", "Art")],
+    )
+
+    response = await client.post(
+        "/homework/list", json={"classroom_secret": classroom_secret}
+    )
+
+    assert response.headers["content-type"] == "application/json"
+    # compact and unescaped, as the encoders promise
+    assert "แบบฝึกหัด 1".encode("utf-8") in response.content
+    assert b'": ' not in response.content
+
+    homeworks = response.json()["response"]["context"]["homeworks"]
+    assert homeworks == [
+        {
+            "homework_id": homework_id,
+            **make_homework(title, subject),
+        }
+        for homework_id, title, subject in [
+            (homework_ids[1], "worksheet 2", "Art"),
+            (homework_ids[0], "แบบฝึกหัด 1", "Mathematics"),
+        ]
+    ]
+    assert list(homeworks[0]) == list(db_operations.HOMEWORK_FIELDS)
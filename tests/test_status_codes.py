@@ -0,0 +1,101 @@
+import pytest
+
+from homework_api import config
+
+from .conftest import add_homeworks, make_homework
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_errors_are_200_by_default(client, monkeypatch):
+    monkeypatch.setattr(config, "HTTP_STATUS_CODES", False)
+
+    response = await client.post("/homework/list", json={"classroom_secret": "0" * 64})
+
+    assert response.status_code == 200
+    assert response.json()["response_code"] == 401
+
+    response = await client.post(
+        "/classroom/new",
+        json={"classroom_name": "4/5", "classroom_password": "hunter22"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["response_code"] == 201
+
+
+async def test_status_codes_when_enabled(client, monkeypatch):
+    monkeypatch.setattr(config, "HTTP_STATUS_CODES", True)
+
+    response = await client.post(
+        "/classroom/new",
+        json={"classroom_name": "4/5", "classroom_password": "hunter22"},
+    )
+    assert response.status_code == 201
+    classroom_secret = response.json()["response"]["context"]["classroom_secret"]
+
+    response = await client.post(
+        "/classroom/new", json={"classroom_name": "45", "classroom_password": "abcdef"}
+    )
+    assert (response.status_code, response.json()["response_code"]) == (400, 400)
+
+    response = await client.post("/homework/list", json={"classroom_secret": "0" * 64})
+    assert (response.status_code, response.json()["response_code"]) == (401, 401)
+
+    response = await client.post(
+        "/homework/get",
+        json={"classroom_secret": classroom_secret, "homework_id": "1x"},
+    )
+    assert response.status_code == 404
+
+    (homework_id,) = await add_homeworks(
+        client, classroom_secret, [make_homework("worksheet")]
+    )
+
+    response = await client.post(
+        "/homework/get",
+        json={"classroom_secret": classroom_secret, "homework_id": str(homework_id)},
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("http_status_codes", [False, True])
+async def test_bulk_requests_that_create_nothing_fail(
+    client, monkeypatch, http_status_codes
+):
+    monkeypatch.setattr(config, "HTTP_STATUS_CODES", http_status_codes)
+    expected_status = 400 if http_status_codes else 200
+
+    response = await client.post(
+        "/classroom/new_bulk",
+        json={"classrooms": [{"classroom_name": "bad", "classroom_password": "no"}]},
+    )
+    body = response.json()
+    assert (response.status_code, body["response_code"]) == (expected_status, 400)
+    assert body["response"]["error"] == "NO_CLASSROOMS_CREATED"
+    assert body["response"]["context"]["classrooms"][0]["error"] == (
+        "CLASSROOM_INVALID"
+    )
+
+    response = await client.post(
+        "/classroom/new",
+        json={"classroom_name": "4/5", "classroom_password": "hunter22"},
+    )
+    classroom_secret = response.json()["response"]["context"]["classroom_secret"]
+
+    response = await client.post(
+        "/homework/add_bulk",
+        json={
+            "classroom_secret": classroom_secret,
+            "classroom_password": "hunter22",
+            "homeworks": [{**make_homework("bad date"), "due_date": "2024-02-30"}],
+        },
+    )
+    body = response.json()
+    assert (response.status_code, body["response_code"]) == (expected_status, 400)
+    assert body["response"]["error"] == "NO_HOMEWORKS_CREATED"
+    assert body["response"]["context"] == {
+        "homeworks": [{"index": 0, "homework_id": None, "error": "DATE_INVALID"}],
+        "created": 0,
+        "failed": 1,
+    }